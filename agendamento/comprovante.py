@@ -0,0 +1,195 @@
+import logging
+
+from django.utils import timezone
+
+from clinica_core.pdf import DocumentoPdf
+from configuracoes.models import DadosClinica
+from profissionais.models import ProfissionalEspecialidade
+
+
+logger = logging.getLogger(__name__)
+
+DIAS_SEMANA = ['Segunda-feira', 'Terca-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sabado', 'Domingo']
+DOCUMENTOS_IMPRESSAO = ('guia', 'ficha')
+LOGO = 'Logo'
+
+
+def _formatar_registro(vinculo):
+    if not vinculo:
+        return "Não informado"
+    return f"{vinculo.sigla_conselho}: {vinculo.registro_conselho}/{vinculo.uf_conselho}"
+
+
+def registro_profissional(agendamento):
+    vinculo = ProfissionalEspecialidade.objects.filter(
+        profissional_id=agendamento.profissional_id,
+        especialidade_id=agendamento.especialidade_id
+    ).first()
+    return _formatar_registro(vinculo)
+
+
+def registros_profissionais(agendamentos):
+    """Registro no conselho por (profissional, especialidade), em uma unica consulta."""
+    profissionais = {agendamento.profissional_id for agendamento in agendamentos}
+    vinculos = ProfissionalEspecialidade.objects.filter(profissional_id__in=profissionais)
+    return {
+        (vinculo.profissional_id, vinculo.especialidade_id): _formatar_registro(vinculo)
+        for vinculo in vinculos
+    }
+
+
+def montar_detalhes_pdf(agendamento, clinica, registro, logo_url=""):
+    """Dados de impressao do agendamento (campo detalhes_pdf do AgendamentoSerializer)."""
+    paciente = agendamento.paciente
+    return {
+        "clinica_logo": logo_url,
+        "paciente_cpf": paciente.cpf,
+        "paciente_email": paciente.email,
+        "paciente_nascimento": paciente.data_nascimento,
+        "paciente_sexo": paciente.sexo,
+        "paciente_mae": paciente.nome_mae,
+        "paciente_prioridade": paciente.prioridade,
+        "paciente_endereco": f"{paciente.logradouro}, {paciente.numero} - {paciente.bairro}",
+        "paciente_cidade": f"{paciente.cidade}/{paciente.estado}",
+        "profissional_registro": registro,
+        "clinica_nome": clinica.nome_fantasia,
+        "clinica_endereco": f"{clinica.logradouro}, {clinica.numero}",
+        "clinica_bairro": f"{clinica.bairro} - {clinica.cidade}",
+        "clinica_telefone": clinica.telefone
+    }
+
+
+def _endereco_clinica(clinica):
+    partes = [
+        clinica.logradouro,
+        f"no {clinica.numero}" if clinica.numero else None,
+        f"({clinica.complemento})" if clinica.complemento else None,
+        f"- {clinica.bairro}" if clinica.bairro else None,
+        f"- {clinica.cidade}/{clinica.estado}" if clinica.cidade else None,
+    ]
+    return " ".join(p for p in partes if p)
+
+
+def _registrar_logo(doc, clinica):
+    if not clinica.logo:
+        return False
+    try:
+        with clinica.logo.open('rb') as arquivo:
+            return doc.registrar_imagem(LOGO, arquivo.read())
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Logo da clinica indisponivel para o PDF: {exc}")
+        return False
+
+
+def cabecalho_clinica(doc, clinica):
+    """
+    Blocos do cabecalho da clinica, montados uma vez e repetidos em cada pagina;
+    o logo e registrado no documento e gravado uma unica vez no arquivo.
+    """
+    modelo = DocumentoPdf()
+    if _registrar_logo(doc, clinica):
+        modelo.imagens = doc.imagens
+        modelo.imagem(LOGO, 48)
+    modelo.titulo((clinica.nome_fantasia or "THECLINIC").upper(), tamanho=16)
+    endereco = _endereco_clinica(clinica)
+    if endereco:
+        modelo.paragrafo(endereco, tamanho=9)
+    if clinica.telefone:
+        modelo.paragrafo(f"Tel: {clinica.telefone}", tamanho=9)
+    return modelo.blocos
+
+
+def _data_consulta(agendamento):
+    dia_semana = DIAS_SEMANA[agendamento.data.weekday()]
+    return f"{dia_semana} - {agendamento.data:%d/%m/%Y} - HORARIO: {agendamento.horario:%H:%M}".upper()
+
+
+def _nascimento(detalhes):
+    nascimento = detalhes.get("paciente_nascimento")
+    return f"{nascimento:%d/%m/%Y}" if nascimento else None
+
+
+def adicionar_comprovante(doc, agendamento, detalhes, cabecalho):
+    """Guia/comprovante de agendamento (mesmo conteudo do antigo comprovante do navegador)."""
+    doc.blocos.extend(cabecalho)
+    doc.espaco(4)
+    doc.subtitulo("COMPROVANTE DE AGENDAMENTO", tamanho=9)
+    doc.linha_horizontal()
+
+    doc.subtitulo("DETALHES DA CONSULTA")
+    doc.paragrafo(_data_consulta(agendamento), tamanho=12, negrito=True)
+    doc.espaco()
+
+    doc.subtitulo("INFORMACOES DO PACIENTE")
+    doc.campo("Nome completo", agendamento.paciente.nome)
+    doc.campo("CPF / Documento", detalhes["paciente_cpf"])
+    doc.campo("Data de nascimento", _nascimento(detalhes))
+    doc.campo("Sexo", detalhes["paciente_sexo"])
+    doc.campo("Telefone de contato", agendamento.paciente.telefone)
+    doc.campo("Convenio / Plano", agendamento.convenio.nome if agendamento.convenio else "PARTICULAR")
+    doc.campo("Endereco", f"{detalhes['paciente_endereco']}, {detalhes['paciente_cidade']}")
+    doc.espaco()
+
+    doc.subtitulo("CORPO CLINICO E LOCAL")
+    doc.campo("Profissional", agendamento.profissional.nome)
+    doc.campo("Especialidade (CBO)", agendamento.especialidade.nome)
+    doc.campo("Registro profissional", detalhes["profissional_registro"])
+    doc.campo("Unidade de atendimento", detalhes["clinica_nome"] or "CONSULTORIO CENTRAL")
+    doc.linha_horizontal()
+
+    doc.paragrafo(
+        "Este documento e um comprovante oficial de agendamento gerado pelo sistema TheClinic.", tamanho=7
+    )
+    doc.paragrafo(f"Emitido em: {timezone.localtime():%d/%m/%Y %H:%M}", tamanho=7)
+    doc.paragrafo("VIA DO PACIENTE", tamanho=7, negrito=True)
+
+
+def adicionar_ficha(doc, agendamento, detalhes, cabecalho):
+    """Ficha de atendimento em branco, identificada, para preenchimento no consultorio."""
+    doc.blocos.extend(cabecalho)
+    doc.espaco(4)
+    doc.subtitulo("FICHA DE ATENDIMENTO", tamanho=12)
+    doc.linha_horizontal()
+    doc.campo("Paciente", agendamento.paciente.nome)
+    doc.campo("Nascimento", _nascimento(detalhes))
+    doc.campo("CPF", detalhes["paciente_cpf"])
+    doc.campo("Nome da mae", detalhes["paciente_mae"])
+    doc.campo("Convenio", agendamento.convenio.nome if agendamento.convenio else "PARTICULAR")
+    doc.campo("Consulta", _data_consulta(agendamento))
+    doc.campo("Profissional", f"{agendamento.profissional.nome} ({detalhes['profissional_registro']})")
+    doc.linha_horizontal()
+    for secao, linhas in [("Queixa principal / HDA", 6), ("Exame fisico", 5), ("Diagnostico / CID", 2), ("Conduta", 5)]:
+        doc.espaco(4)
+        doc.subtitulo(secao.upper(), tamanho=9)
+        for _ in range(linhas):
+            doc.espaco(10)
+            doc.linha_horizontal()
+
+
+def gerar_comprovantes_pdf(agendamentos, documentos=('guia',)):
+    """
+    DocumentoPdf com uma pagina por documento de cada agendamento. Os agendamentos
+    devem vir com select_related de paciente, profissional, especialidade e convenio:
+    alem deles, sao feitas apenas as consultas da clinica e dos registros profissionais.
+    """
+    agendamentos = list(agendamentos)
+    clinica = DadosClinica.cached()
+    registros = registros_profissionais(agendamentos)
+
+    doc = DocumentoPdf()
+    cabecalho = cabecalho_clinica(doc, clinica)
+    primeira = True
+    for agendamento in agendamentos:
+        registro = registros.get(
+            (agendamento.profissional_id, agendamento.especialidade_id), _formatar_registro(None)
+        )
+        detalhes = montar_detalhes_pdf(agendamento, clinica, registro)
+        for documento in documentos:
+            if not primeira:
+                doc.quebra_pagina()
+            primeira = False
+            if documento == 'ficha':
+                adicionar_ficha(doc, agendamento, detalhes, cabecalho)
+            else:
+                adicionar_comprovante(doc, agendamento, detalhes, cabecalho)
+    return doc
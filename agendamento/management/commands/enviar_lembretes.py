@@ -2,6 +2,8 @@ from django.core.management.base import BaseCommand
 from datetime import datetime, timedelta, date, time
 from django.utils import timezone
 
+from auditoria.writer import audit_batch
+
 class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         from configuracoes.models import ConfiguracaoSistema
@@ -51,11 +53,12 @@ class Command(BaseCommand):
             return
 
         enviados = 0
-        for ag in pendentes:
-            if enviar_lembrete_24h(ag):
-                ag.lembrete_enviado = True
-                ag.save()
-                enviados += 1
+        with audit_batch():
+            for ag in pendentes:
+                if enviar_lembrete_24h(ag):
+                    ag.lembrete_enviado = True
+                    ag.save()
+                    enviados += 1
         
         # CRÍTICO: Marca que hoje está pago!
         if enviados > 0:
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import Agendamento, BloqueioAgenda
+from .comprovante import montar_detalhes_pdf, registro_profissional
 from configuracoes.models import DadosClinica
-from profissionais.models import ProfissionalEspecialidade
 from agendas.models import AgendaConfig
 from pacientes.models import Paciente  # Certifique-se que o import do model Paciente está correto
 
@@ -113,41 +113,14 @@ class AgendamentoSerializer(serializers.ModelSerializer):
         except: return None
 
     def get_detalhes_pdf(self, obj):
-        clinica = DadosClinica.load()
+        clinica = DadosClinica.cached()
         logo_url = ""
         if clinica.logo:
             request = self.context.get('request')
             if request: logo_url = request.build_absolute_uri(clinica.logo.url)
             else: logo_url = clinica.logo.url
-        
-        registro = ""
-        try:
-            vinculo = ProfissionalEspecialidade.objects.get(
-                profissional=obj.profissional, 
-                especialidade=obj.especialidade
-            )
-            registro = f"{vinculo.sigla_conselho}: {vinculo.registro_conselho}/{vinculo.uf_conselho}"
-        except: registro = "Não informado"
-
-        return {
-            "clinica_logo": logo_url,
-            "paciente_cpf": obj.paciente.cpf,
-            "paciente_email": obj.paciente.email,
-            "paciente_nascimento": obj.paciente.data_nascimento,
-            "paciente_sexo": obj.paciente.sexo,
-            "paciente_mae": obj.paciente.nome_mae,
-            
-            # Adicionado aqui também para garantir consistência
-            "paciente_prioridade": obj.paciente.prioridade,
-            
-            "paciente_endereco": f"{obj.paciente.logradouro}, {obj.paciente.numero} - {obj.paciente.bairro}",
-            "paciente_cidade": f"{obj.paciente.cidade}/{obj.paciente.estado}",
-            "profissional_registro": registro,
-            "clinica_nome": clinica.nome_fantasia,
-            "clinica_endereco": f"{clinica.logradouro}, {clinica.numero}",
-            "clinica_bairro": f"{clinica.bairro} - {clinica.cidade}",
-            "clinica_telefone": clinica.telefone
-        }
+
+        return montar_detalhes_pdf(obj, clinica, registro_profissional(obj), logo_url)
 
     def _get_triagem(self, obj):
         return getattr(obj, 'triagem', None)
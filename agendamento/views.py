@@ -2,18 +2,21 @@ from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from usuarios.authentication import CachedJWTAuthentication
 from django.db.models import Case, When, Value, IntegerField
 from django.db import transaction 
+from django.http import StreamingHttpResponse
 from datetime import date
 from django.conf import settings
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 import requests
 import threading
 
 # Imports locais (Ajuste se o caminho for diferente)
 from .models import BloqueioAgenda, Agendamento
 from .serializers import BloqueioAgendaSerializer, AgendamentoSerializer
+from .comprovante import DOCUMENTOS_IMPRESSAO, gerar_comprovantes_pdf
 from .whatsapp import enviar_mensagem_agendamento, enviar_mensagem_cancelamento_bloqueio
 from clinica_core.filters import AccentInsensitiveSearchFilter
 
@@ -145,7 +148,7 @@ class BloqueioAgendaViewSet(viewsets.ModelViewSet):
 class AgendamentoViewSet(viewsets.ModelViewSet):
     queryset = Agendamento.objects.all()
     serializer_class = AgendamentoSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     
     filter_backends = [AccentInsensitiveSearchFilter]
@@ -214,6 +217,8 @@ class AgendamentoViewSet(viewsets.ModelViewSet):
 
         # 🔥 QUALQUER ROTA COM PK (detail=True) IGNORA FILTROS DE LISTAGEM
         if self.kwargs.get('pk'):
+            if self.action == 'comprovante_pdf':
+                queryset = queryset.select_related('paciente', 'profissional', 'especialidade', 'convenio')
             return queryset
 
         queryset = queryset.exclude(status='cancelado')
@@ -255,6 +260,45 @@ class AgendamentoViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @action(detail=False, methods=['get'])
+    def impressao_dia(self, request):
+        """PDF unico com guia e/ou ficha de todos os agendamentos do dia de um profissional."""
+        try:
+            data = parse_date(request.query_params.get('data') or '')
+        except ValueError:
+            data = None
+        profissional_id = request.query_params.get('profissional')
+        if not data or not str(profissional_id or '').isdigit():
+            return Response({'error': 'Informe data e profissional.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        documentos = [
+            doc for doc in (request.query_params.get('documentos') or 'guia,ficha').split(',')
+            if doc in DOCUMENTOS_IMPRESSAO
+        ]
+        if not documentos:
+            return Response({'error': 'Documentos invalidos.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        agendamentos = list(
+            Agendamento.objects.filter(data=data, profissional_id=profissional_id)
+            .exclude(status='cancelado')
+            .select_related('paciente', 'profissional', 'especialidade', 'convenio')
+            .order_by('horario', 'id')
+        )
+        if not agendamentos:
+            return Response({'error': 'Nenhum agendamento para imprimir.'}, status=status.HTTP_404_NOT_FOUND)
+
+        doc = gerar_comprovantes_pdf(agendamentos, documentos)
+        response = StreamingHttpResponse(doc.gerar(), content_type='application/pdf')
+        response['Content-Disposition'] = f'inline; filename="agenda_{data}_{profissional_id}.pdf"'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def comprovante_pdf(self, request, pk=None):
+        agendamento = self.get_object()
+        response = StreamingHttpResponse(gerar_comprovantes_pdf([agendamento]).gerar(), content_type='application/pdf')
+        response['Content-Disposition'] = f'inline; filename="comprovante_{agendamento.pk}.pdf"'
+        return response
+
 
     # --- AÇÃO: REVERTER (AGORA INCLUÍDA) ---
     @action(detail=True, methods=['post'])
@@ -334,23 +378,32 @@ class AgendamentoViewSet(viewsets.ModelViewSet):
 
                 if agendamento.status == 'agendado':
                     agendamento.status = 'aguardando'
-                    agendamento.horario_chegada = timezone.now().time()
+                    agendamento.horario_chegada = timezone.localtime().time()
 
                 agendamento.valor = valor_cobrado
                 agendamento.save()
 
                 if Fatura:
-                    Fatura.objects.update_or_create(
-                        agendamento=agendamento,
-                        defaults={
-                            'valor': valor_cobrado,
-                            'forma_pagamento': forma_pagamento,
-                            'pago': ja_pagou,
-                            'data_pagamento': date.today() if ja_pagou else None,
-                            'data_vencimento': date.today(),
-                            'desconto': Decimal('0.00')
-                        }
-                    )
+                    hoje = timezone.localdate()
+                    fatura = Fatura.objects.select_for_update().filter(agendamento=agendamento).first()
+                    if fatura is None:
+                        fatura = Fatura(agendamento=agendamento)
+                    estava_pago = fatura.pago
+
+                    fatura.valor = valor_cobrado
+                    fatura.forma_pagamento = forma_pagamento
+                    fatura.desconto = Decimal('0.00')
+                    fatura.pago = ja_pagou
+                    fatura.data_vencimento = fatura.data_vencimento or hoje
+                    # Data e operador do recebimento so mudam quando a fatura passa a paga:
+                    # editar um check-in ja pago nao leva o valor para o caixa de hoje.
+                    if ja_pagou and not estava_pago:
+                        fatura.data_pagamento = hoje
+                        fatura.recebido_por = request.user
+                    elif not ja_pagou:
+                        fatura.data_pagamento = None
+                        fatura.recebido_por = None
+                    fatura.save()
 
             return Response({'status': 'Check-in realizado!'}, status=200)
 
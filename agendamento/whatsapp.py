@@ -24,7 +24,7 @@ def formatar_telefone(telefone):
 
 def get_dados_clinica():
     try:
-        clinica = DadosClinica.objects.first()
+        clinica = DadosClinica.cached()
         if not clinica:
             return {"nome": "The Clinic", "endereco": "Endereço não cadastrado"}
         
@@ -99,7 +99,7 @@ def _disparar_api(telefone, mensagem):
 # --- FUNÇÃO 1: CONFIRMAÇÃO DE AGENDAMENTO ---
 def enviar_mensagem_agendamento(agendamento):
     try:
-        config = ConfiguracaoSistema.load()
+        config = ConfiguracaoSistema.cached()
         if not config.enviar_whatsapp_global or not config.enviar_wpp_confirmacao:
             return
 
@@ -138,7 +138,7 @@ def enviar_mensagem_agendamento(agendamento):
 # --- FUNÇÃO 2: CANCELAMENTO/BLOQUEIO ---
 def enviar_mensagem_cancelamento_bloqueio(agendamento, motivo_personalizado=""):
     try:
-        config = ConfiguracaoSistema.load()
+        config = ConfiguracaoSistema.cached()
         if not config.enviar_whatsapp_global or not config.enviar_wpp_bloqueio:
             return
 
@@ -175,7 +175,7 @@ def enviar_lembrete_24h(agendamento):
     Função chamada pelo botão manual ou cronjob para lembrar pacientes do dia seguinte.
     """
     try:
-        config = ConfiguracaoSistema.load()
+        config = ConfiguracaoSistema.cached()
         
         # Travas de segurança
         if not config.enviar_whatsapp_global:
@@ -0,0 +1,36 @@
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AgendaConfig
+
+
+def opcoes_filtros(status_param='ativos'):
+    """Profissionais e especialidades com agenda, para os dropdowns de filtro."""
+    qs = AgendaConfig.objects.all()
+    # Filtra apenas o básico para as opções
+    hoje = timezone.now().date()
+    if status_param == 'ativos':
+        qs = qs.filter(Q(situacao=True) | Q(situacao__isnull=True), data_fim__gte=hoje)
+
+    profissionais = qs.values('profissional__id', 'profissional__nome').distinct()
+    especialidades = qs.values(
+        'especialidade__id',
+        'especialidade__nome',
+        'especialidade__codigo_visual',
+        'especialidade__codigo'
+    ).distinct()
+
+    return {
+        'profissionais': [{'id': p['profissional__id'], 'label': p['profissional__nome']} for p in profissionais],
+        'especialidades': [
+            {
+                'id': e['especialidade__id'],
+                'label': (
+                    f"{e['especialidade__nome']} ({e['especialidade__codigo_visual'] or e['especialidade__codigo']})"
+                    if (e['especialidade__codigo_visual'] or e['especialidade__codigo'])
+                    else e['especialidade__nome']
+                )
+            }
+            for e in especialidades
+        ]
+    }
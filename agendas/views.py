@@ -6,8 +6,10 @@ from django.db.models import Q
 from django.apps import apps
 from django.utils import timezone
 from auditoria.models import AuditLog
+from auditoria.writer import pending_entries, record_entry
 from clinica_core.filters import normalize_text
 import uuid
+from .filtros import opcoes_filtros
 from .models import AgendaConfig
 from .serializers import AgendaConfigSerializer
 
@@ -88,7 +90,13 @@ class AgendaConfigViewSet(viewsets.ModelViewSet):
         payload = payload or self._build_group_payload(group_id)
         user = getattr(request, 'user', None)
         if action == 'CREATE':
-            existing = AuditLog.objects.filter(
+            chave = ('CREATE', 'agendas', 'agendaconfig', str(group_id))
+            # A inclusao do grupo pode ainda estar no lote de auditoria, fora do banco.
+            pendentes = [
+                entry for entry in pending_entries()
+                if (entry.action, entry.app_label, entry.model_name, entry.object_id) == chave
+            ]
+            existing = pendentes[-1] if pendentes else AuditLog.objects.filter(
                 action='CREATE',
                 app_label='agendas',
                 model_name='agendaconfig',
@@ -98,10 +106,13 @@ class AgendaConfigViewSet(viewsets.ModelViewSet):
                 existing.summary = summary
                 existing.object_repr = (object_repr or '')[:255]
                 existing.after = payload or existing.after
-                existing.save(update_fields=['summary', 'object_repr', 'after'])
+                if pendentes:
+                    existing.refresh_search_text()
+                else:
+                    existing.save(update_fields=['summary', 'object_repr', 'after', 'search_text'])
                 return
 
-        AuditLog.objects.create(
+        record_entry(
             action=action,
             method=request.method,
             path=request.path,
@@ -190,35 +201,7 @@ class AgendaConfigViewSet(viewsets.ModelViewSet):
     # --- DADOS PARA FILTROS (Dropdowns) ---
     @action(detail=False, methods=['get'])
     def filters_data(self, request):
-        qs = AgendaConfig.objects.all()
-        # Filtra apenas o básico para as opções
-        status_param = request.query_params.get('status', 'ativos')
-        hoje = timezone.now().date()
-        if status_param == 'ativos':
-             qs = qs.filter(Q(situacao=True) | Q(situacao__isnull=True), data_fim__gte=hoje)
-        
-        profissionais = qs.values('profissional__id', 'profissional__nome').distinct()
-        especialidades = qs.values(
-            'especialidade__id',
-            'especialidade__nome',
-            'especialidade__codigo_visual',
-            'especialidade__codigo'
-        ).distinct()
-        
-        return Response({
-            'profissionais': [{'id': p['profissional__id'], 'label': p['profissional__nome']} for p in profissionais],
-            'especialidades': [
-                {
-                    'id': e['especialidade__id'],
-                    'label': (
-                        f"{e['especialidade__nome']} ({e['especialidade__codigo_visual'] or e['especialidade__codigo']})"
-                        if (e['especialidade__codigo_visual'] or e['especialidade__codigo'])
-                        else e['especialidade__nome']
-                    )
-                }
-                for e in especialidades
-            ]
-        })
+        return Response(opcoes_filtros(request.query_params.get('status', 'ativos')))
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from atendimento import pdf_cache
+
+
+class Command(BaseCommand):
+    help = 'Remove do cache de PDFs de atendimento os arquivos expirados (PDF_CACHE_MAX_IDADE) e o excesso de tamanho.'
+
+    def handle(self, *args, **options):
+        removidos = pdf_cache.limpar()
+        self.stdout.write(self.style.SUCCESS(f'{removidos} PDF(s) removido(s) do cache.'))
@@ -0,0 +1,127 @@
+"""
+Cache em disco dos PDFs de atendimento.
+
+A chave combina o id do atendimento, o atualizado_em, os documentos
+escolhidos e o cabecalho impresso (nomes do paciente e do profissional,
+data): qualquer alteracao no atendimento gera uma chave nova e as
+versoes antigas saem do cache.
+
+Os arquivos sao documentos clinicos sem criptografia: o mtime marca a
+geracao e nenhum PDF e servido ou mantido por mais de PDF_CACHE_MAX_IDADE
+segundos (limpar, chamado apos cada gravacao e pelo comando
+limpar_pdf_cache). Dentro desse prazo, os mais antigos saem primeiro quando
+o diretorio passa de PDF_CACHE_MAX_BYTES.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import time
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def _diretorio():
+    return settings.PDF_CACHE_DIR
+
+
+def chave_documentos(atendimento, documentos, cabecalho):
+    base = "\n".join([
+        str(atendimento.pk),
+        atendimento.atualizado_em.isoformat(),
+        '|'.join(documentos),
+        '|'.join(f"{rotulo}={valor}" for rotulo, valor in cabecalho),
+    ])
+    return hashlib.sha1(base.encode('utf-8')).hexdigest()
+
+
+def caminho(chave):
+    return os.path.join(_diretorio(), f"{chave}.pdf")
+
+
+def _expirado(mtime):
+    return time.time() - mtime > settings.PDF_CACHE_MAX_IDADE
+
+
+def obter(chave):
+    """Caminho do PDF em cache ou None (ausente ou expirado)."""
+    destino = caminho(chave)
+    try:
+        mtime = os.stat(destino).st_mtime
+    except OSError:
+        return None
+    if _expirado(mtime):
+        _remover(destino)
+        return None
+    return destino
+
+
+def _remover(destino):
+    try:
+        os.remove(destino)
+    except OSError as exc:
+        logger.warning(f"Falha ao remover {destino} do cache de PDF: {exc}")
+        return False
+    return True
+
+
+def gravar_ao_transmitir(chave, pedacos):
+    """
+    Repassa os pedacos do PDF (para o StreamingHttpResponse) e, ao final,
+    grava o arquivo completo no cache. Se a transmissao for interrompida,
+    nada e gravado.
+    """
+    os.makedirs(_diretorio(), exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=_diretorio(), suffix='.tmp')
+    concluido = False
+    try:
+        with os.fdopen(fd, 'wb') as arquivo:
+            for pedaco in pedacos:
+                arquivo.write(pedaco)
+                yield pedaco
+        os.replace(temporario, caminho(chave))
+        concluido = True
+    finally:
+        if not concluido:
+            try:
+                os.remove(temporario)
+            except OSError:
+                pass
+    limpar()
+
+
+def limpar(limite=None):
+    """Remove os PDFs expirados e, se preciso, os mais antigos ate o diretorio caber no limite."""
+    limite = settings.PDF_CACHE_MAX_BYTES if limite is None else limite
+    try:
+        entradas = [
+            entrada for entrada in os.scandir(_diretorio())
+            if entrada.is_file() and entrada.name.endswith('.pdf')
+        ]
+    except OSError:
+        return 0
+
+    arquivos = []
+    removidos = 0
+    for entrada in entradas:
+        try:
+            info = entrada.stat()
+        except OSError:
+            continue
+        if _expirado(info.st_mtime):
+            removidos += _remover(entrada.path)
+            continue
+        arquivos.append((info.st_mtime, info.st_size, entrada.path))
+
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    for _, tamanho, destino in sorted(arquivos):
+        if total <= limite:
+            break
+        if not _remover(destino):
+            continue
+        total -= tamanho
+        removidos += 1
+    return removidos
@@ -2,21 +2,23 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import PermissionDenied
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.http import HttpResponse
+from usuarios.authentication import CachedJWTAuthentication
+from django.http import FileResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from datetime import datetime, timedelta
 from agendamento.models import Agendamento
 from agendamento.serializers import AgendamentoSerializer
+from clinica_core.pdf import DocumentoPdf
 from .models import Triagem, AtendimentoMedico
 from .serializers import TriagemSerializer, AtendimentoMedicoSerializer
+from . import pdf_cache
 
 
 class TriagemViewSet(viewsets.ModelViewSet):
     queryset = Triagem.objects.all().select_related('agendamento', 'agendamento__paciente')
     serializer_class = TriagemSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -97,7 +99,7 @@ class AtendimentoMedicoViewSet(viewsets.ModelViewSet):
         'agendamento', 'paciente', 'profissional', 'cid_principal', 'cid_secundario'
     )
     serializer_class = AtendimentoMedicoSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -134,7 +136,7 @@ class AtendimentoMedicoViewSet(viewsets.ModelViewSet):
 
 
 class AtendimentoIniciarView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, paciente_id):
@@ -160,7 +162,7 @@ class AtendimentoIniciarView(APIView):
 
 
 class AtendimentoPausarView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, paciente_id):
@@ -183,7 +185,7 @@ class AtendimentoPausarView(APIView):
 
 
 class AtendimentoFinalizarView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, paciente_id):
@@ -209,7 +211,7 @@ class AtendimentoFinalizarView(APIView):
 
 
 class AtendimentoSalvarView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
@@ -254,81 +256,94 @@ class AtendimentoSalvarView(APIView):
         return Response(AtendimentoMedicoSerializer(atendimento).data, status=status.HTTP_200_OK)
 
 
-def _escape_pdf_text(value):
-    if value is None:
-        return ''
-    return str(value).replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
-
-
-def _build_pdf(pages):
-    objects = []
-
-    font_obj = "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
-    objects.append(font_obj)
-
-    page_objects = []
-    content_objects = []
+FICHA_CAMPOS = [
+    ('Queixa principal', 'queixa_principal'),
+    ('Historia da doenca atual', 'historia_doenca_atual'),
+    ('Antecedentes pessoais', 'antecedentes_pessoais'),
+    ('Antecedentes familiares', 'antecedentes_familiares'),
+    ('Alergias', 'alergias_referidas'),
+    ('Medicacoes em uso', 'medicacoes_em_uso'),
+    ('Habitos de vida', 'habitos_vida'),
+    None,
+    ('Exame fisico', 'exame_fisico'),
+    ('Plano terapeutico', 'plano_terapeutico'),
+    ('Orientacoes', 'orientacoes'),
+    ('Encaminhamento', 'encaminhamento'),
+    ('Observacoes gerais', 'observacoes_gerais'),
+    ('Atestado', 'atestado'),
+    ('Diagnostico', 'diagnostico_descricao'),
+    ('CID principal', 'cid_principal_codigo'),
+    ('CID secundario', 'cid_secundario_codigo'),
+]
+
+
+DOCUMENTOS_PDF = (
+    'Requisicao de Medicamentos',
+    'Solicitacao de Exames',
+    'Referencia e Contra-referencia de Encaminhamento',
+    'Ficha de Atendimento da Consulta Atual',
+)
+
+
+def _resposta_pdf(response):
+    # Documentos do paciente: nada fica em cache no navegador ou em proxies.
+    response['Cache-Control'] = 'no-store'
+    response['Content-Disposition'] = 'inline; filename="documentos_atendimento.pdf"'
+    return response
+
+
+def _montar_documentos_pdf(documentos, dados, cabecalho):
+    """Um documento por pagina (os longos continuam nas paginas seguintes)."""
+    secoes = []
+    if 'Requisicao de Medicamentos' in documentos:
+        itens = []
+        for item in (dados.get('prescricao_medicamentos') or []):
+            nome = item.get('nome') or item.get('descricao') or '-'
+            posologia = item.get('posologia') or ''
+            via = item.get('via') or ''
+            itens.append(f"- {nome} | {posologia} | {via}".strip())
+        secoes.append(('REQUISICAO DE MEDICAMENTOS', itens))
+
+    if 'Solicitacao de Exames' in documentos:
+        itens = []
+        for item in (dados.get('exames_solicitados') or []):
+            nome = item.get('nome') or item.get('descricao') or '-'
+            justificativa = item.get('justificativa') or ''
+            itens.append(f"- {nome} | {justificativa}".strip())
+        secoes.append(('SOLICITACAO DE EXAMES', itens))
+
+    if 'Referencia e Contra-referencia de Encaminhamento' in documentos:
+        secoes.append(('REFERENCIA E CONTRA-REFERENCIA', [dados.get('encaminhamento') or '-']))
+
+    if 'Ficha de Atendimento da Consulta Atual' in documentos:
+        secoes.append(('FICHA DE ATENDIMENTO - CONSULTA', FICHA_CAMPOS))
+
+    if not secoes:
+        return None
 
-    for lines in pages:
-        safe_lines = [_escape_pdf_text(line) for line in lines if line is not None]
-        content_lines = []
-        for index, line in enumerate(safe_lines):
-            if index == 0:
-                content_lines.append(f"({line}) Tj")
+    doc = DocumentoPdf(rodape='THECLINIC - Documentos de atendimento')
+    for indice, (titulo, itens) in enumerate(secoes):
+        if indice:
+            doc.quebra_pagina()
+        doc.titulo("THECLINIC - DOCUMENTOS DE ATENDIMENTO")
+        for rotulo, valor in cabecalho:
+            doc.campo(rotulo, valor)
+        doc.linha_horizontal()
+        doc.subtitulo(titulo)
+        doc.espaco(4)
+        for item in itens:
+            if item is None:
+                doc.espaco()
+            elif isinstance(item, tuple):
+                rotulo, chave = item
+                doc.campo(rotulo, dados.get(chave))
             else:
-                content_lines.append(f"0 -14 Td ({line}) Tj")
-        content_stream = "BT /F1 12 Tf 50 760 Td " + " ".join(content_lines) + " ET"
-        content_bytes = content_stream.encode('latin-1', 'replace')
-        content_obj = f"<< /Length {len(content_bytes)} >>\nstream\n{content_stream}\nendstream"
-        content_objects.append(content_obj)
-        page_objects.append("pending")
-
-    pages_kids = []
-    current_obj_number = 2  # catalog will be 1, pages will be 2
-    font_obj_number = 3
-    current_obj_number = font_obj_number + 1
-
-    for index in range(len(pages)):
-        page_obj_number = current_obj_number
-        content_obj_number = current_obj_number + 1
-        pages_kids.append(f"{page_obj_number} 0 R")
-        page_obj = (
-            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
-            f"/Resources << /Font << /F1 {font_obj_number} 0 R >> >> "
-            f"/Contents {content_obj_number} 0 R >>"
-        )
-        page_objects[index] = page_obj
-        current_obj_number += 2
-
-    pages_obj = f"<< /Type /Pages /Kids [{' '.join(pages_kids)}] /Count {len(pages_kids)} >>"
-
-    catalog_obj = "<< /Type /Catalog /Pages 2 0 R >>"
-
-    ordered_objects = [catalog_obj, pages_obj, objects[0]]
-    for page_obj, content_obj in zip(page_objects, content_objects):
-        ordered_objects.append(page_obj)
-        ordered_objects.append(content_obj)
-
-    pdf = b"%PDF-1.4\n"
-    offsets = [0]
-    for i, obj in enumerate(ordered_objects, start=1):
-        offsets.append(len(pdf))
-        pdf += f"{i} 0 obj\n{obj}\nendobj\n".encode('latin-1', 'replace')
-
-    xref_offset = len(pdf)
-    pdf += f"xref\n0 {len(ordered_objects)+1}\n".encode('ascii')
-    pdf += b"0000000000 65535 f \n"
-    for offset in offsets[1:]:
-        pdf += f"{offset:010d} 00000 n \n".encode('ascii')
-    pdf += (
-        f"trailer\n<< /Size {len(ordered_objects)+1} /Root 1 0 R >>\n"
-        f"startxref\n{xref_offset}\n%%EOF"
-    ).encode('ascii')
-    return pdf
+                doc.paragrafo(item)
+    return doc
 
 
 class AtendimentoPdfView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
@@ -356,75 +371,33 @@ class AtendimentoPdfView(APIView):
         if atendimento and request.user.profissional_id and atendimento.agendamento.profissional_id != request.user.profissional_id:
             return Response({'error': 'Agendamento nao pertence ao profissional.'}, status=status.HTTP_403_FORBIDDEN)
 
-        dados = None
+        selecionados = [nome for nome in DOCUMENTOS_PDF if nome in documentos]
+        if not selecionados:
+            return Response({'error': 'Documentos invalidos.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        chave = None
         if atendimento:
+            cabecalho = [
+                ('Paciente', atendimento.paciente.nome),
+                ('Profissional', (atendimento.profissional or atendimento.agendamento.profissional).nome),
+                ('Data', atendimento.agendamento.data),
+            ]
+            # Documentos de um atendimento salvo: servidos do cache enquanto ele nao mudar.
+            chave = pdf_cache.chave_documentos(atendimento, selecionados, cabecalho)
+            arquivo = pdf_cache.obter(chave)
+            if arquivo:
+                return _resposta_pdf(FileResponse(open(arquivo, 'rb'), content_type='application/pdf'))
             dados = AtendimentoMedicoSerializer(atendimento).data
         else:
             dados = request.data.get('atendimento') or {}
-
-        paciente = atendimento.paciente if atendimento else None
-        profissional = atendimento.profissional if atendimento else None
-        agendamento = atendimento.agendamento if atendimento else None
-
-        header = [
-            "THECLINIC - DOCUMENTOS DE ATENDIMENTO",
-            f"Paciente: {paciente.nome if paciente else dados.get('paciente_nome', '-')}",
-            f"Profissional: {profissional.nome if profissional else dados.get('profissional_nome', '-')}",
-            f"Data: {agendamento.data if agendamento else dados.get('data', '-')}",
-            ""
-        ]
-
-        pages = []
-        if 'Requisicao de Medicamentos' in documentos:
-            linhas = header + ["REQUISICAO DE MEDICAMENTOS", ""]
-            for item in (dados.get('prescricao_medicamentos') or []):
-                nome = item.get('nome') or item.get('descricao') or '-'
-                posologia = item.get('posologia') or ''
-                via = item.get('via') or ''
-                linhas.append(f"- {nome} | {posologia} | {via}".strip())
-            pages.append(linhas)
-
-        if 'Solicitacao de Exames' in documentos:
-            linhas = header + ["SOLICITACAO DE EXAMES", ""]
-            for item in (dados.get('exames_solicitados') or []):
-                nome = item.get('nome') or item.get('descricao') or '-'
-                justificativa = item.get('justificativa') or ''
-                linhas.append(f"- {nome} | {justificativa}".strip())
-            pages.append(linhas)
-
-        if 'Referencia e Contra-referencia de Encaminhamento' in documentos:
-            linhas = header + ["REFERENCIA E CONTRA-REFERENCIA", ""]
-            linhas.append(dados.get('encaminhamento') or '-')
-            pages.append(linhas)
-
-        if 'Ficha de Atendimento da Consulta Atual' in documentos:
-            linhas = header + [
-                "FICHA DE ATENDIMENTO - CONSULTA",
-                "",
-                f"Queixa principal: {dados.get('queixa_principal') or '-'}",
-                f"Historia da doenca atual: {dados.get('historia_doenca_atual') or '-'}",
-                f"Antecedentes pessoais: {dados.get('antecedentes_pessoais') or '-'}",
-                f"Antecedentes familiares: {dados.get('antecedentes_familiares') or '-'}",
-                f"Alergias: {dados.get('alergias_referidas') or '-'}",
-                f"Medicacoes em uso: {dados.get('medicacoes_em_uso') or '-'}",
-                f"Habitos de vida: {dados.get('habitos_vida') or '-'}",
-                "",
-                f"Exame fisico: {dados.get('exame_fisico') or '-'}",
-                f"Plano terapeutico: {dados.get('plano_terapeutico') or '-'}",
-                f"Orientacoes: {dados.get('orientacoes') or '-'}",
-                f"Encaminhamento: {dados.get('encaminhamento') or '-'}",
-                f"Observacoes gerais: {dados.get('observacoes_gerais') or '-'}",
-                f"Atestado: {dados.get('atestado') or '-'}",
-                f"Diagnostico: {dados.get('diagnostico_descricao') or '-'}",
-                f"CID principal: {dados.get('cid_principal_codigo') or '-'}",
-                f"CID secundario: {dados.get('cid_secundario_codigo') or '-'}",
+            cabecalho = [
+                ('Paciente', dados.get('paciente_nome', '-')),
+                ('Profissional', dados.get('profissional_nome', '-')),
+                ('Data', dados.get('data', '-')),
             ]
-            pages.append(linhas)
-
-        if not pages:
-            return Response({'error': 'Documentos invalidos.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        pdf_bytes = _build_pdf(pages)
-        response = HttpResponse(pdf_bytes, content_type='application/pdf')
-        response['Content-Disposition'] = 'inline; filename="documentos_atendimento.pdf"'
-        return response
+        doc = _montar_documentos_pdf(selecionados, dados, cabecalho)
+        pedacos = doc.gerar()
+        if chave:
+            pedacos = pdf_cache.gravar_ao_transmitir(chave, pedacos)
+        return _resposta_pdf(StreamingHttpResponse(pedacos, content_type='application/pdf'))
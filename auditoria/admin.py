@@ -11,6 +11,6 @@ class AuditLogAdmin(admin.ModelAdmin):
 
 @admin.register(WebhookEvent)
 class WebhookEventAdmin(admin.ModelAdmin):
-    list_display = ('provider', 'instance_name', 'event_type', 'received_at')
+    list_display = ('provider', 'instance_name', 'event_type', 'payload_size', 'received_at')
     search_fields = ('provider', 'instance_name', 'event_type')
     list_filter = ('provider', 'instance_name', 'event_type')
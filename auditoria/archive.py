@@ -0,0 +1,321 @@
+import base64
+import contextlib
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import BinaryField
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from clinica_core.filters import normalize_text
+
+from .models import AuditLog, WebhookEvent
+
+try:
+    import fcntl
+except ImportError:  # Windows (desenvolvimento): sem lock entre processos
+    fcntl = None
+
+
+# Arquivo morto da auditoria: linhas antigas saem das tabelas quentes e vao para
+# segmentos JSONL comprimidos (gzip), particionados por dia:
+#   <AUDIT_ARCHIVE_DIR>/<tipo>/<AAAA>/<MM>/<AAAA-MM-DD>-<sufixo>.jsonl.gz
+# Cada tipo tem um index.json com o intervalo de datas, a faixa de ids e um
+# filtro de Bloom das chaves (object_id / instance_name) de cada segmento, para
+# que a consulta abra apenas os segmentos que podem conter o que foi pedido.
+# O indice e reescrito sob lock (index.lock) e trocado com os.replace.
+KIND_AUDITLOG = 'auditlog'
+KIND_WEBHOOK = 'webhookevent'
+
+ARCHIVE_KINDS = {
+    KIND_AUDITLOG: {'model': AuditLog, 'timestamp': 'created_at', 'key': 'object_id'},
+    KIND_WEBHOOK: {'model': WebhookEvent, 'timestamp': 'received_at', 'key': 'instance_name'},
+}
+
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+
+# Filtro de Bloom: ~10 bits por chave e 7 hashes (~1% de falso positivo).
+BLOOM_BITS_POR_CHAVE = 10
+BLOOM_HASHES = 7
+
+_indices = {}
+
+
+def get_archive_dir():
+    return str(getattr(settings, 'AUDIT_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'audit_archive')))
+
+
+def _kind_dir(kind):
+    return os.path.join(get_archive_dir(), kind)
+
+
+def _write_atomic(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+@contextlib.contextmanager
+def _index_lock(kind):
+    os.makedirs(_kind_dir(kind), exist_ok=True)
+    with open(os.path.join(_kind_dir(kind), LOCK_FILE), 'a') as fp:
+        if fcntl:
+            fcntl.flock(fp, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fp, fcntl.LOCK_UN)
+
+
+def load_index(kind):
+    """Segmentos do indice; relido do disco apenas quando o arquivo muda."""
+    path = os.path.join(_kind_dir(kind), INDEX_FILE)
+    try:
+        info = os.stat(path)
+    except OSError:
+        return []
+    assinatura = (path, info.st_mtime_ns, info.st_size)
+    atual = _indices.get(kind)
+    if atual and atual[0] == assinatura:
+        return list(atual[1])
+    with open(path, 'r', encoding='utf-8') as fp:
+        segments = json.load(fp).get('segments', [])
+    _indices[kind] = (assinatura, segments)
+    return list(segments)
+
+
+def _save_index(kind, segments):
+    path = os.path.join(_kind_dir(kind), INDEX_FILE)
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as fp:
+            json.dump({'segments': segments}, fp, ensure_ascii=False)
+
+    _write_atomic(path, write)
+
+
+def _bloom_posicoes(chave, bits):
+    digest = hashlib.blake2b(chave.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'big')
+    h2 = int.from_bytes(digest[8:], 'big') | 1
+    return [(h1 + i * h2) % bits for i in range(BLOOM_HASHES)]
+
+
+def _bloom(chaves):
+    bits = max(64, len(chaves) * BLOOM_BITS_POR_CHAVE)
+    bits += -bits % 8
+    filtro = bytearray(bits // 8)
+    for chave in chaves:
+        for posicao in _bloom_posicoes(chave, bits):
+            filtro[posicao // 8] |= 1 << (posicao % 8)
+    return base64.b64encode(bytes(filtro)).decode('ascii')
+
+
+def _bloom_contem(filtro_b64, chave):
+    filtro = base64.b64decode(filtro_b64)
+    bits = len(filtro) * 8
+    return all(filtro[posicao // 8] & (1 << (posicao % 8)) for posicao in _bloom_posicoes(chave, bits))
+
+
+def _row_to_dict(model, obj):
+    data = {}
+    for field in model._meta.concrete_fields:
+        value = getattr(obj, field.attname)
+        if isinstance(value, (bytes, memoryview)):
+            value = base64.b64encode(bytes(value)).decode('ascii')
+        elif isinstance(value, datetime):
+            # isoformat mantem os microssegundos (o DjangoJSONEncoder corta em ms)
+            # e os cursores (created_at, id) continuam batendo com o banco.
+            value = value.isoformat()
+        data[field.attname] = value
+    return data
+
+
+def _dict_to_row(model, data, timestamp_field):
+    data = dict(data)
+    if data.get(timestamp_field):
+        data[timestamp_field] = parse_datetime(data[timestamp_field])
+    for field in model._meta.concrete_fields:
+        if isinstance(field, BinaryField) and data.get(field.attname):
+            data[field.attname] = base64.b64decode(data[field.attname])
+    return model(**data)
+
+
+def write_segment(kind, day, rows):
+    """
+    Grava as linhas de um dia em um novo segmento comprimido e registra o
+    segmento no index.json. Retorna a entrada do indice.
+    """
+    config = ARCHIVE_KINDS[kind]
+    model, ts_field, key_field = config['model'], config['timestamp'], config['key']
+
+    relative = os.path.join(
+        f'{day:%Y}', f'{day:%m}', f"{day.isoformat()}-{timezone.now().strftime('%H%M%S%f')}.jsonl.gz"
+    )
+    path = os.path.join(_kind_dir(kind), relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def write(tmp_path):
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as fp:
+            for obj in rows:
+                fp.write(json.dumps(_row_to_dict(model, obj), cls=DjangoJSONEncoder, ensure_ascii=False))
+                fp.write('\n')
+
+    _write_atomic(path, write)
+
+    timestamps = [getattr(obj, ts_field) for obj in rows]
+    segment = {
+        'file': relative.replace(os.sep, '/'),
+        'day': day.isoformat(),
+        'start': min(timestamps).isoformat(),
+        'end': max(timestamps).isoformat(),
+        'count': len(rows),
+        'min_id': min(obj.pk for obj in rows),
+        'max_id': max(obj.pk for obj in rows),
+        'bloom': _bloom({str(getattr(obj, key_field) or '') for obj in rows} - {''}),
+    }
+    with _index_lock(kind):
+        segments = load_index(kind)
+        segments.append(segment)
+        segments.sort(key=lambda s: (s['day'], s['file']))
+        _save_index(kind, segments)
+    return segment
+
+
+def archive_older_than(kind, cutoff, batch_size=5000, stdout=None):
+    """
+    Move para o arquivo morto as linhas com timestamp anterior a cutoff.
+    Cada lote vira um segmento e so e apagado do banco depois de gravado.
+    """
+    config = ARCHIVE_KINDS[kind]
+    model, ts_field = config['model'], config['timestamp']
+    base_qs = model.objects.filter(**{f'{ts_field}__lt': cutoff})
+    total = 0
+
+    for day_start in base_qs.datetimes(ts_field, 'day'):
+        day_qs = base_qs.filter(**{
+            f'{ts_field}__gte': day_start,
+            f'{ts_field}__lt': day_start + timedelta(days=1),
+        }).order_by(ts_field, 'pk')
+        while True:
+            rows = list(day_qs[:batch_size])
+            if not rows:
+                break
+            write_segment(kind, day_start.date(), rows)
+            with transaction.atomic():
+                model.objects.filter(pk__in=[obj.pk for obj in rows]).delete()
+            total += len(rows)
+            if stdout:
+                stdout.write(f'{kind} {day_start.date().isoformat()}: {len(rows)} registros arquivados.')
+    return total
+
+
+def _read_segment(kind, segment):
+    config = ARCHIVE_KINDS[kind]
+    path = os.path.join(_kind_dir(kind), segment['file'])
+    rows = []
+    with gzip.open(path, 'rt', encoding='utf-8') as fp:
+        for line in fp:
+            line = line.strip()
+            if line:
+                rows.append(_dict_to_row(config['model'], json.loads(line), config['timestamp']))
+    return rows
+
+
+def _segment_may_match(segment, filtros, before):
+    start = parse_datetime(segment['start'])
+    end = parse_datetime(segment['end'])
+    if filtros.get('start') and end < filtros['start']:
+        return False
+    if filtros.get('end') and start >= filtros['end']:
+        return False
+    if before and start > before[0]:
+        return False
+    if filtros.get('object_id'):
+        return _bloom_contem(segment['bloom'], filtros['object_id'])
+    return True
+
+
+def _contains(value, term):
+    return normalize_text(term) in normalize_text(value)
+
+
+def audit_entry_matches(entry, filtros):
+    """Aplica em memoria os mesmos filtros que AuditLogListView aplica no banco."""
+    if filtros.get('action') and entry.action != filtros['action']:
+        return False
+    if filtros.get('operator_id') and str(entry.operator_id) != str(filtros['operator_id']):
+        return False
+    if filtros.get('path') and not _contains(entry.path, filtros['path']):
+        return False
+    if filtros.get('model') and not _contains(entry.model_name, filtros['model']):
+        return False
+    if filtros.get('app') and not _contains(entry.app_label, filtros['app']):
+        return False
+    if filtros.get('object_id') and entry.object_id != filtros['object_id']:
+        return False
+    if filtros.get('method') and entry.method.upper() != filtros['method'].upper():
+        return False
+    if filtros.get('status_code') and str(entry.status_code) != str(filtros['status_code']):
+        return False
+    if filtros.get('start') and entry.created_at < filtros['start']:
+        return False
+    if filtros.get('end') and entry.created_at >= filtros['end']:
+        return False
+    if filtros.get('search'):
+        if not entry.search_text:
+            entry.refresh_search_text()
+        if filtros['search'] not in entry.search_text:
+            return False
+    return True
+
+
+def iter_audit_logs(filtros, before=None):
+    """
+    Entradas de AuditLog do arquivo morto que atendem aos filtros, em ordem
+    decrescente de (created_at, id) e anteriores a before=(timestamp, id).
+    Os segmentos sao lidos por dia, do mais recente para o mais antigo, so
+    quando o consumidor pede a proxima entrada.
+
+    O indice so descarta segmentos por data (start/end/before) e por object_id.
+    Sem end (ou before) e sem object_id, todo segmento posterior a start e
+    descomprimido ate o consumidor parar; os demais filtros (action, path,
+    search...) sao aplicados linha a linha. Buscas amplas no arquivo morto
+    devem informar um intervalo de datas.
+    """
+    segments = [s for s in load_index(KIND_AUDITLOG) if _segment_may_match(s, filtros, before)]
+    by_day = {}
+    for segment in segments:
+        by_day.setdefault(segment['day'], []).append(segment)
+
+    for day in sorted(by_day, reverse=True):
+        entries = {}
+        for segment in by_day[day]:
+            for entry in _read_segment(KIND_AUDITLOG, segment):
+                if before and (entry.created_at, entry.pk) >= before:
+                    continue
+                if audit_entry_matches(entry, filtros):
+                    # Um lote regravado apos falha pode repetir linhas; o id desempata.
+                    entries[entry.pk] = entry
+        yield from sorted(entries.values(), key=lambda e: (e.created_at, e.pk), reverse=True)
+
+
+def search_audit_logs(filtros, before=None, limit=None):
+    """Lista de iter_audit_logs, ate limit entradas (lendo so os dias necessarios)."""
+    return list(itertools.islice(iter_audit_logs(filtros, before=before), limit))
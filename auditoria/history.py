@@ -0,0 +1,165 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+
+from .archive import iter_audit_logs
+from .models import AuditLog
+
+
+# Reconstrucao do estado de um objeto em uma data a partir do AuditLog:
+# parte do ultimo estado completo (CREATE, UPDATE com 'after' ou snapshot
+# periodico) ate a data e reaplica os diffs posteriores. Todas as consultas
+# usam o indice audit_object_idx (app_label, model_name, object_id, created_at).
+
+
+SNAPSHOT_CACHE_TIMEOUT = 7 * 24 * 3600
+# Limite de entradas lidas do arquivo morto na reconstrucao (objetos sem ancora alcancavel).
+REPLAY_MAX = 500
+
+
+def _get_snapshot_interval():
+    try:
+        return max(int(getattr(settings, 'AUDIT_SNAPSHOT_INTERVAL', 20)), 1)
+    except (TypeError, ValueError):
+        return 20
+
+
+def _object_logs(app_label, model_name, object_id):
+    return AuditLog.objects.filter(
+        app_label=app_label,
+        model_name=model_name,
+        object_id=str(object_id),
+    ).exclude(action='REPORT_VIEW')
+
+
+def _chave_contador(model, object_id):
+    return f"audit_snapshot:{model._meta.label_lower}:{object_id}"
+
+
+def needs_snapshot(model, object_id):
+    """
+    True quando esta atualizacao deve levar o estado completo: a cada
+    AUDIT_SNAPSHOT_INTERVAL entradas do objeto, ou sempre que a contagem for
+    incerta.
+
+    A contagem desde o ultimo snapshot fica no cache (compartilhado entre os
+    workers) e e atualizada aqui, no momento da decisao, contando tambem o que
+    ainda esta no buffer ou no spool. Todo desvio vai para o lado seguro:
+    contador ausente (expirado, descartado pelo cache, lacuna de amostragem)
+    ou cache indisponivel forcam o snapshot; uma transacao desfeita deixa o
+    contador maior que o real (snapshot antecipado); e o contador so volta a
+    zero quando o snapshot e confirmado (on_commit).
+    """
+    interval = _get_snapshot_interval()
+    chave = _chave_contador(model, object_id)
+    try:
+        desde = cache.get(chave)
+    except Exception:
+        return True
+    if desde is None or desde + 1 >= interval:
+        def zerar():
+            try:
+                cache.set(chave, 0, timeout=SNAPSHOT_CACHE_TIMEOUT)
+            except Exception:
+                pass
+        transaction.on_commit(zerar)
+        return True
+    try:
+        cache.set(chave, desde + 1, timeout=SNAPSHOT_CACHE_TIMEOUT)
+    except Exception:
+        return True
+    return False
+
+
+def forcar_snapshot(model, object_id):
+    """
+    Faz a proxima atualizacao registrada do objeto levar o estado completo
+    (usado quando um UPDATE deixa de ser gravado). False se o cache falhar.
+    """
+    try:
+        cache.delete(_chave_contador(model, object_id))
+    except Exception:
+        return False
+    return True
+
+
+def _is_anchor(entry):
+    return entry.after is not None or entry.action == 'DELETE'
+
+
+def _apply(state, entry):
+    if entry.action == 'DELETE':
+        return None
+    if entry.after is not None:
+        return dict(entry.after)
+    if state is None:
+        state = {}
+    for campo, valores in (entry.diff or {}).items():
+        if isinstance(valores, dict) and 'after' in valores:
+            state[campo] = valores['after']
+    return state
+
+
+def _archived_entries(app_label, model_name, object_id, at):
+    """
+    Entradas do objeto no arquivo morto ate at, da ultima ancora (estado
+    completo ou DELETE) em diante. Os segmentos sao lidos do mais recente para o
+    mais antigo e a leitura para na primeira ancora ou em REPLAY_MAX entradas.
+    """
+    filtros = {'object_id': str(object_id), 'end': at + timedelta(microseconds=1)}
+    entries = []
+    for entry in iter_audit_logs(filtros):
+        if entry.app_label != app_label or entry.model_name != model_name or entry.action == 'REPORT_VIEW':
+            continue
+        entries.append(entry)
+        if _is_anchor(entry) or len(entries) >= REPLAY_MAX:
+            break
+    entries.reverse()
+    return entries
+
+
+def reconstruct_state(app_label, model_name, object_id, at):
+    """
+    Retorna o estado do objeto no instante at. O banco e consultado primeiro;
+    o arquivo morto so e lido quando nao ha estado completo nas tabelas quentes.
+    """
+    logs = _object_logs(app_label, model_name, object_id).filter(created_at__lte=at)
+    anchor = (
+        logs.filter(Q(after__isnull=False) | Q(action='DELETE'))
+        .order_by('-created_at', '-id')
+        .first()
+    )
+
+    if anchor is not None:
+        posteriores = logs.filter(
+            Q(created_at__gt=anchor.created_at) | Q(created_at=anchor.created_at, id__gt=anchor.id)
+        ).order_by('created_at', 'id')
+        entries = [anchor] + list(posteriores)
+    else:
+        entries = _archived_entries(app_label, model_name, object_id, at) + list(logs.order_by('created_at', 'id'))
+        for index in range(len(entries) - 1, -1, -1):
+            if _is_anchor(entries[index]):
+                entries = entries[index:]
+                break
+
+    state = None
+    for entry in entries:
+        state = _apply(state, entry)
+
+    anchor = entries[0] if entries and _is_anchor(entries[0]) else None
+    return {
+        'app_label': app_label,
+        'model_name': model_name,
+        'object_id': str(object_id),
+        'at': at,
+        'exists': state is not None,
+        # Sem estado completo anterior, o resultado traz apenas os campos alterados.
+        'complete': anchor is not None,
+        'state': state,
+        'snapshot_at': anchor.created_at if anchor else None,
+        'last_change_at': entries[-1].created_at if entries else None,
+        'entries_replayed': len(entries),
+    }
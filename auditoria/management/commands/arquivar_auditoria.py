@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from auditoria.archive import ARCHIVE_KINDS, KIND_AUDITLOG, KIND_WEBHOOK, archive_older_than, get_archive_dir
+from auditoria.webhook_storage import purge_expired_events
+
+
+class Command(BaseCommand):
+    help = (
+        'Move AuditLog e WebhookEvent mais antigos que a retencao para segmentos '
+        'JSONL comprimidos em AUDIT_ARCHIVE_DIR.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=None,
+            help='Retencao do AuditLog em dias (padrao: AUDIT_ARCHIVE_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--dias-webhook', type=int, default=None,
+            help='Retencao do WebhookEvent em dias (padrao: WEBHOOK_ARCHIVE_RETENTION_DAYS)'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Linhas por segmento')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas conta o que seria arquivado')
+
+    def handle(self, *args, **options):
+        retencao = {
+            KIND_AUDITLOG: options['dias'] or getattr(settings, 'AUDIT_ARCHIVE_RETENTION_DAYS', 180),
+            KIND_WEBHOOK: options['dias_webhook'] or getattr(settings, 'WEBHOOK_ARCHIVE_RETENTION_DAYS', 30),
+        }
+        batch_size = max(options['batch_size'], 1)
+        agora = timezone.now()
+
+        # Tipos de evento com retencao propria (WEBHOOK_RETENTION_DAYS) sao
+        # descartados antes do arquivamento.
+        if not options['dry_run']:
+            for event_type, total in purge_expired_events(agora).items():
+                self.stdout.write(f'{KIND_WEBHOOK} {event_type}: {total} eventos removidos.')
+
+        for kind, dias in retencao.items():
+            cutoff = agora - timedelta(days=max(int(dias), 1))
+            config = ARCHIVE_KINDS[kind]
+            if options['dry_run']:
+                total = config['model'].objects.filter(**{f"{config['timestamp']}__lt": cutoff}).count()
+                self.stdout.write(f'{kind}: {total} registros anteriores a {cutoff:%d/%m/%Y %H:%M}.')
+                continue
+            total = archive_older_than(kind, cutoff, batch_size=batch_size, stdout=self.stdout)
+            self.stdout.write(self.style.SUCCESS(f'{kind}: {total} registros arquivados em {get_archive_dir()}.'))
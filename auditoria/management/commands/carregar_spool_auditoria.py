@@ -0,0 +1,57 @@
+import glob
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from auditoria.models import AuditLog
+from auditoria.writer import get_spool_dir, read_spool_file
+
+
+class Command(BaseCommand):
+    help = 'Carrega no AuditLog os lotes gravados em AUDIT_SPOOL_DIR (modo spool).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-files', type=int, default=0, help='0 = todos os arquivos pendentes')
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        arquivos = sorted(glob.glob(os.path.join(get_spool_dir(), '*.jsonl')))
+        if options['max_files']:
+            arquivos = arquivos[:options['max_files']]
+
+        if not arquivos:
+            self.stdout.write("Nenhum lote de auditoria pendente.")
+            return
+
+        total = 0
+        pendentes = []
+        lidos = []
+        for caminho in arquivos:
+            try:
+                entradas = read_spool_file(caminho)
+            except (OSError, ValueError) as exc:
+                self.stderr.write(f"Arquivo ignorado {caminho}: {exc}")
+                continue
+            pendentes.extend(entradas)
+            lidos.append(caminho)
+            if len(pendentes) >= batch_size:
+                total += self._gravar(pendentes, lidos, batch_size)
+                pendentes, lidos = [], []
+
+        total += self._gravar(pendentes, lidos, batch_size)
+        self.stdout.write(self.style.SUCCESS(f"{total} registros de auditoria carregados."))
+
+    def _gravar(self, entradas, arquivos, batch_size):
+        if not arquivos:
+            return 0
+        # Os arquivos so sao removidos depois do commit do lote.
+        with transaction.atomic():
+            AuditLog.objects.bulk_create(entradas, batch_size=batch_size)
+        for caminho in arquivos:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+        return len(entradas)
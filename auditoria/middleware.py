@@ -1,6 +1,6 @@
 import re
-from .models import AuditLog
 from .utils import set_current_request, get_current_request
+from .writer import audit_batch, record_entry
 
 
 REPORT_PATH_RE = re.compile(r'(relatorio|relatorios|report|export|download)', re.IGNORECASE)
@@ -19,27 +19,32 @@ class AuditMiddleware:
 
     def __call__(self, request):
         set_current_request(request)
-        response = self.get_response(request)
-
         try:
-            if request.method == 'GET' and REPORT_PATH_RE.search(request.path):
-                user = getattr(request, 'user', None)
-                if user and user.is_authenticated:
-                    query = request.META.get('QUERY_STRING', '')
-                    suffix = f'?{query}' if query else ''
-                    AuditLog.objects.create(
-                        action='REPORT_VIEW',
-                        method='GET',
-                        path=request.path,
-                        status_code=response.status_code,
-                        operator=user,
-                        operator_username=user.username,
-                        operator_name=user.first_name or user.username,
-                        summary=f'Report view: {request.path}{suffix}'[:255],
-                        ip_address=_get_client_ip(request),
-                        user_agent=request.META.get('HTTP_USER_AGENT', '')[:255]
-                    )
+            with audit_batch():
+                response = self.get_response(request)
+                self._log_report_view(request, response)
         finally:
             set_current_request(None)
 
         return response
+
+    def _log_report_view(self, request, response):
+        if request.method != 'GET' or not REPORT_PATH_RE.search(request.path):
+            return
+        user = getattr(request, 'user', None)
+        if not user or not user.is_authenticated:
+            return
+        query = request.META.get('QUERY_STRING', '')
+        suffix = f'?{query}' if query else ''
+        record_entry(
+            action='REPORT_VIEW',
+            method='GET',
+            path=request.path,
+            status_code=response.status_code,
+            operator=user,
+            operator_username=user.username,
+            operator_name=user.first_name or user.username,
+            summary=f'Report view: {request.path}{suffix}'[:255],
+            ip_address=_get_client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', '')[:255]
+        )
@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-19 13:14
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+SEARCH_FIELDS = ['operator_username', 'operator_name', 'path', 'summary', 'object_repr', 'model_name']
+
+
+def normalize_text(value):
+    # Copia de clinica_core.filters.normalize_text: migracoes nao importam codigo do app.
+    if value is None:
+        return ''
+    normalized = unicodedata.normalize('NFD', str(value))
+    return ''.join(ch for ch in normalized if unicodedata.category(ch) != 'Mn').casefold()
+
+
+def preencher_search_text(apps, schema_editor):
+    AuditLog = apps.get_model('auditoria', 'AuditLog')
+    lote = []
+    for log in AuditLog.objects.only('id', *SEARCH_FIELDS).iterator(chunk_size=2000):
+        partes = [getattr(log, campo, '') or '' for campo in SEARCH_FIELDS]
+        log.search_text = normalize_text(' | '.join(partes))
+        lote.append(log)
+        if len(lote) >= 2000:
+            AuditLog.objects.bulk_update(lote, ['search_text'])
+            lote = []
+    if lote:
+        AuditLog.objects.bulk_update(lote, ['search_text'])
+
+
+def criar_indice_trigram(apps, schema_editor):
+    # LIKE '%termo%' so usa indice no PostgreSQL com pg_trgm; nos demais bancos
+    # a busca continua funcionando sobre a coluna normalizada.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS audit_search_trgm_idx '
+        'ON auditoria_auditlog USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def remover_indice_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS audit_search_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditoria', '0004_auditlog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='search_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(preencher_search_text, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice_trigram, remover_indice_trigram),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['-created_at', '-id'], name='audit_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['app_label', 'model_name', 'object_id', 'created_at'], name='audit_object_idx'),
+        ),
+    ]
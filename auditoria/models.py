@@ -1,5 +1,12 @@
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+from clinica_core.filters import normalize_text
 
 
 class AuditLog(models.Model):
@@ -32,24 +39,67 @@ class AuditLog(models.Model):
     ip_address = models.CharField(max_length=45, blank=True, default='')
     user_agent = models.CharField(max_length=255, blank=True, default='')
 
-    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Texto normalizado (sem acentos, casefold) usado pela busca livre da tela de logs.
+    search_text = models.TextField(blank=True, default='')
+
+    # default (e nao auto_now_add) para preservar o horario do evento
+    # quando o registro e gravado depois, em lote.
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    SEARCH_FIELDS = ['operator_username', 'operator_name', 'path', 'summary', 'object_repr', 'model_name']
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='audit_created_id_idx'),
+            models.Index(fields=['app_label', 'model_name', 'object_id', 'created_at'], name='audit_object_idx'),
+        ]
 
     def __str__(self):
         return f'{self.action} {self.app_label}.{self.model_name} {self.object_id}'
 
+    def refresh_search_text(self):
+        partes = [getattr(self, campo, '') or '' for campo in self.SEARCH_FIELDS]
+        self.search_text = normalize_text(' | '.join(partes))
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_text()
+        super().save(*args, **kwargs)
+
 
 class WebhookEvent(models.Model):
     provider = models.CharField(max_length=50, db_index=True)
     instance_name = models.CharField(max_length=100, db_index=True)
     event_type = models.CharField(max_length=100, blank=True, default='')
     payload = models.JSONField(null=True, blank=True)
+    # Payloads acima de WEBHOOK_COMPRESS_THRESHOLD ficam aqui em JSON+zlib e
+    # payload fica nulo; use get_payload() para ler o conteudo completo.
+    payload_compressed = models.BinaryField(null=True, blank=True, editable=False)
+    payload_size = models.PositiveIntegerField(default=0)
     received_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         ordering = ['-received_at']
+        indexes = [
+            models.Index(fields=['event_type', 'received_at'], name='webhook_type_received_idx'),
+        ]
 
     def __str__(self):
         return f'{self.provider}:{self.instance_name}:{self.event_type}'
+
+    def set_payload(self, data, threshold=None):
+        raw = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.payload_size = len(raw)
+        if threshold is None:
+            threshold = getattr(settings, 'WEBHOOK_COMPRESS_THRESHOLD', 8192)
+        if threshold and len(raw) > threshold:
+            self.payload = None
+            self.payload_compressed = zlib.compress(raw)
+        else:
+            self.payload = data
+            self.payload_compressed = None
+
+    def get_payload(self):
+        if self.payload_compressed is not None:
+            return json.loads(zlib.decompress(bytes(self.payload_compressed)).decode('utf-8'))
+        return self.payload
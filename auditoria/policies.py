@@ -0,0 +1,75 @@
+import random
+
+from django.conf import settings
+
+
+# Politicas de auditoria por model:
+#   full          -> CREATE/UPDATE/DELETE com snapshot before/after e diff
+#   diff          -> CREATE/UPDATE/DELETE gravando apenas o diff nas alteracoes
+#   create_delete -> apenas CREATE e DELETE (alteracoes nao sao auditadas)
+#   off           -> nenhum registro
+POLICY_FULL = 'full'
+POLICY_DIFF = 'diff'
+POLICY_CREATE_DELETE = 'create_delete'
+POLICY_OFF = 'off'
+
+POLICIES = {POLICY_FULL, POLICY_DIFF, POLICY_CREATE_DELETE, POLICY_OFF}
+
+_EXCLUDE_APPS = {'admin', 'auth', 'contenttypes', 'sessions', 'messages', 'staticfiles', 'auditoria'}
+
+# Padroes: cadastros clinicos e financeiros ficam em auditoria completa;
+# o volume gerado pelo webhook do WhatsApp nao e auditado, nem ResumoDiario
+# (tabela derivada, recalculada a cada alteracao de Agendamento/Fatura).
+DEFAULT_POLICIES = {
+    'whatsapp.whatsappcontato': POLICY_OFF,
+    'whatsapp.whatsappconversa': POLICY_OFF,
+    'whatsapp.whatsappmensagem': POLICY_OFF,
+    'configuracoes.importacaojob': POLICY_CREATE_DELETE,
+    'financeiro.resumodiario': POLICY_OFF,
+}
+
+
+def get_policy(model):
+    """
+    Resolve a politica do model: AUDIT_POLICIES (por 'app.model' ou 'app'),
+    depois DEFAULT_POLICIES e por fim AUDIT_DEFAULT_POLICY.
+    """
+    meta = model._meta
+    if meta.app_label in _EXCLUDE_APPS:
+        return POLICY_OFF
+
+    configured = getattr(settings, 'AUDIT_POLICIES', None) or {}
+    for key in (meta.label_lower, meta.app_label):
+        if key in configured:
+            policy = configured[key]
+            break
+    else:
+        policy = DEFAULT_POLICIES.get(meta.label_lower)
+    if policy is None:
+        policy = getattr(settings, 'AUDIT_DEFAULT_POLICY', POLICY_FULL)
+
+    if policy not in POLICIES:
+        return POLICY_FULL
+    return policy
+
+
+def should_sample_update(model):
+    """
+    Amostragem opcional de UPDATEs para models ruidosos (AUDIT_SAMPLE_RATES).
+    CREATE e DELETE nunca sao amostrados. Na politica diff, o UPDATE
+    registrado depois de um descartado leva o estado completo (ver signals).
+    """
+    rates = getattr(settings, 'AUDIT_SAMPLE_RATES', None) or {}
+    meta = model._meta
+    rate = rates.get(meta.label_lower, rates.get(meta.app_label))
+    if rate is None:
+        return True
+    try:
+        rate = float(rate)
+    except (TypeError, ValueError):
+        return True
+    if rate >= 1:
+        return True
+    if rate <= 0:
+        return False
+    return random.random() < rate
@@ -1,33 +1,33 @@
 from django.apps import apps
 from decimal import Decimal
+import copy
 import uuid
+from django.db.models.fields.files import FieldFile
 from django.db.models.signals import pre_save, post_save, post_delete
-from .models import AuditLog
+from .history import forcar_snapshot, needs_snapshot
+from .policies import (
+    POLICY_CREATE_DELETE, POLICY_DIFF, POLICY_FULL, POLICY_OFF,
+    get_policy, should_sample_update,
+)
 from .utils import get_current_request, get_current_user
+from .writer import record_entry
 
 
-_EXCLUDE_APPS = {'admin', 'auth', 'contenttypes', 'sessions', 'messages', 'staticfiles', 'auditoria'}
-
-
-def _serialize_instance(instance):
+def _serialize_values(meta, values):
     data = {}
-    for field in instance._meta.fields:
+    for field in meta.fields:
         name = field.name
         if any(key in name.lower() for key in ['password', 'senha', 'token']):
             data[name] = '***'
             continue
-        try:
-            if field.is_relation:
-                value = getattr(instance, field.attname)
-            else:
-                value = getattr(instance, name)
-        except Exception:
-            value = None
+        value = values.get(field.attname)
 
         if isinstance(value, uuid.UUID):
             value = str(value)
         elif isinstance(value, Decimal):
             value = str(value)
+        elif isinstance(value, FieldFile):
+            value = value.name or None
         elif hasattr(value, 'isoformat'):
             value = value.isoformat()
         elif isinstance(value, (bytes, bytearray)):
@@ -36,6 +36,76 @@ def _serialize_instance(instance):
     return data
 
 
+def _serialize_instance(instance):
+    values = {}
+    for field in instance._meta.fields:
+        try:
+            values[field.attname] = getattr(instance, field.attname)
+        except Exception:
+            values[field.attname] = None
+    return _serialize_values(instance._meta, values)
+
+
+def _capture_loaded_state(instance, update_fields=None):
+    """
+    Guarda os valores crus da instancia como estao no banco. Copia dict/list
+    (JSONField) para que alteracoes in-place nao contaminem o snapshot.
+    Com update_fields, apenas esses campos sao atualizados no snapshot.
+    """
+    state = instance.__dict__
+    loaded = {}
+    if update_fields is not None:
+        loaded = dict(state.get('_audit_loaded') or {})
+    for field in instance._meta.concrete_fields:
+        if field.attname not in state:
+            continue
+        if update_fields is not None and field.name not in update_fields and field.attname not in update_fields:
+            continue
+        value = state[field.attname]
+        if isinstance(value, (dict, list)):
+            value = copy.deepcopy(value)
+        elif isinstance(value, FieldFile):
+            value = value.name
+        loaded[field.attname] = value
+    instance._audit_loaded = loaded
+
+
+def _get_loaded_snapshot(instance):
+    loaded = instance.__dict__.get('_audit_loaded')
+    if loaded is None:
+        return None
+    # Campos adiados (.only/.defer) nao foram carregados: o snapshot nao serve.
+    if any(field.attname not in loaded for field in instance._meta.concrete_fields):
+        return None
+    return _serialize_values(instance._meta, loaded)
+
+
+def _install_from_db_hook(model):
+    """
+    Envolve Model.from_db para capturar o estado carregado do banco, evitando
+    o SELECT extra no pre_save de cada alteracao auditada. refresh_from_db
+    (inclusive o carregamento de campos adiados) tambem atualiza a captura.
+    """
+    original = model.__dict__.get('from_db')
+    if getattr(original, '_audit_snapshot', False):
+        return
+    parent_from_db = super(model, model).from_db
+    parent_refresh = model.refresh_from_db
+
+    def from_db(cls, db, field_names, values):
+        instance = parent_from_db.__func__(cls, db, field_names, values)
+        _capture_loaded_state(instance)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        parent_refresh(self, using=using, fields=fields, from_queryset=from_queryset)
+        _capture_loaded_state(self, update_fields=list(fields) if fields is not None else None)
+
+    from_db._audit_snapshot = True
+    model.from_db = classmethod(from_db)
+    model.refresh_from_db = refresh_from_db
+
+
 def _build_diff(before, after):
     diff = {}
     for key, value in after.items():
@@ -60,7 +130,7 @@ def _log_change(action, instance, before=None, after=None, diff=None):
     path = request.path if request else ''
     method = request.method if request else ''
 
-    AuditLog.objects.create(
+    record_entry(
         action=action,
         method=method,
         path=path,
@@ -86,38 +156,60 @@ def _is_audit_suppressed():
 
 
 def _pre_save(sender, instance, **kwargs):
-    if sender._meta.app_label in _EXCLUDE_APPS:
+    if get_policy(sender) not in (POLICY_FULL, POLICY_DIFF):
         return
     if _is_audit_suppressed():
         return
     if not instance.pk:
         return
-    try:
-        old = sender.objects.get(pk=instance.pk)
-    except sender.DoesNotExist:
-        return
-    instance._audit_before = _serialize_instance(old)
+    before = _get_loaded_snapshot(instance)
+    if before is None:
+        # Instancia nao veio do ORM (ou veio incompleta): unico caso com re-fetch.
+        try:
+            old = sender.objects.get(pk=instance.pk)
+        except sender.DoesNotExist:
+            return
+        before = _serialize_instance(old)
+    instance._audit_before = before
 
 
-def _post_save(sender, instance, created, **kwargs):
-    if sender._meta.app_label in _EXCLUDE_APPS:
+def _post_save(sender, instance, created, update_fields=None, **kwargs):
+    policy = get_policy(sender)
+    if policy == POLICY_OFF:
         return
+    if policy in (POLICY_FULL, POLICY_DIFF):
+        # O estado salvo passa a ser a base do proximo diff desta instancia.
+        _capture_loaded_state(instance, update_fields=update_fields)
     if _is_audit_suppressed():
         return
     after = _serialize_instance(instance)
     if created:
         _log_change('CREATE', instance, before=None, after=after, diff=None)
         return
+    if policy == POLICY_CREATE_DELETE:
+        return
     before = getattr(instance, '_audit_before', None)
     if before is None:
         before = {}
     diff = _build_diff(before, after)
-    if diff:
+    if not diff:
+        return
+    if not should_sample_update(sender):
+        # Um UPDATE descartado deixa um buraco na cadeia de diffs: o proximo
+        # registrado leva o estado completo. Sem cache, grava este mesmo.
+        if policy == POLICY_FULL or forcar_snapshot(sender, instance.pk):
+            return
+    if policy == POLICY_DIFF:
+        # A cada AUDIT_SNAPSHOT_INTERVAL alteracoes o estado completo vai junto,
+        # limitando quantos diffs a reconstrucao do historico precisa reaplicar.
+        snapshot = after if needs_snapshot(sender, instance.pk) else None
+        _log_change('UPDATE', instance, before=None, after=snapshot, diff=diff)
+    else:
         _log_change('UPDATE', instance, before=before, after=after, diff=diff)
 
 
 def _post_delete(sender, instance, **kwargs):
-    if sender._meta.app_label in _EXCLUDE_APPS:
+    if get_policy(sender) == POLICY_OFF:
         return
     if _is_audit_suppressed():
         return
@@ -126,8 +218,10 @@ def _post_delete(sender, instance, **kwargs):
 
 
 for model in apps.get_models():
-    if model._meta.app_label in _EXCLUDE_APPS:
+    if get_policy(model) == POLICY_OFF:
         continue
+    if get_policy(model) in (POLICY_FULL, POLICY_DIFF):
+        _install_from_db_hook(model)
     pre_save.connect(_pre_save, sender=model, dispatch_uid=f'audit_pre_save_{model._meta.label_lower}')
     post_save.connect(_post_save, sender=model, dispatch_uid=f'audit_post_save_{model._meta.label_lower}')
     post_delete.connect(_post_delete, sender=model, dispatch_uid=f'audit_post_delete_{model._meta.label_lower}')
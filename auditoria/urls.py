@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import AuditLogListView
+from .views import AuditLogListView, ObjectHistoryView
 
 urlpatterns = [
     path('logs/', AuditLogListView.as_view(), name='audit-log-list'),
+    path('historico/', ObjectHistoryView.as_view(), name='audit-object-history'),
 ]
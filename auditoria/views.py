@@ -1,73 +1,129 @@
+from datetime import datetime, time, timedelta
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
-from clinica_core.pagination import ConfigurablePageNumberPagination
-from django.db.models import Q
+from rest_framework import status
+from clinica_core.filters import normalize_text
+from clinica_core.pagination import KeysetPagination
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .archive import search_audit_logs
+from .history import reconstruct_state
 from .models import AuditLog
 from .serializers import AuditLogSerializer
 
 
+def _inicio_do_dia(value, dias=0):
+    try:
+        dia = parse_date(str(value)) if value else None
+    except ValueError:
+        dia = None
+    if not dia:
+        return None
+    dia += timedelta(days=dias)
+    return timezone.make_aware(datetime.combine(dia, time.min), timezone.get_current_timezone())
+
+
+def _filtros(request):
+    params = request.query_params
+    filtros = {
+        key: params.get(key)
+        for key in ['action', 'operator_id', 'path', 'model', 'app', 'object_id', 'method', 'status_code']
+        if params.get(key)
+    }
+    if filtros.get('object_id'):
+        filtros['object_id'] = str(filtros['object_id'])
+    # Intervalos de timestamp (sargable) em vez de created_at__date.
+    filtros['start'] = _inicio_do_dia(params.get('date_start'))
+    filtros['end'] = _inicio_do_dia(params.get('date_end'), dias=1)
+    filtros['search'] = normalize_text(params.get('search') or '').strip()
+    return filtros
+
+
+def _aplicar_filtros(qs, filtros):
+    if filtros.get('action'):
+        qs = qs.filter(action=filtros['action'])
+    if filtros.get('operator_id'):
+        qs = qs.filter(operator_id=filtros['operator_id'])
+    if filtros.get('path'):
+        qs = qs.filter(path__icontains=filtros['path'])
+    if filtros.get('model'):
+        qs = qs.filter(model_name__icontains=filtros['model'])
+    if filtros.get('app'):
+        qs = qs.filter(app_label__icontains=filtros['app'])
+    if filtros.get('object_id'):
+        qs = qs.filter(object_id=filtros['object_id'])
+    if filtros.get('method'):
+        qs = qs.filter(method__iexact=filtros['method'])
+    if filtros.get('status_code'):
+        qs = qs.filter(status_code=filtros['status_code'])
+    if filtros.get('start'):
+        qs = qs.filter(created_at__gte=filtros['start'])
+    if filtros.get('end'):
+        qs = qs.filter(created_at__lt=filtros['end'])
+    if filtros.get('search'):
+        qs = qs.filter(search_text__contains=filtros['search'])
+    return qs
+
+
 class AuditLogListView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        qs = AuditLog.objects.all()
-
-        action = request.query_params.get('action')
-        if action:
-            qs = qs.filter(action=action)
-
-        operator_id = request.query_params.get('operator_id')
-        if operator_id:
-            qs = qs.filter(operator_id=operator_id)
-
-        path = request.query_params.get('path')
-        if path:
-            qs = qs.filter(path__icontains=path)
-
-        model_name = request.query_params.get('model')
-        if model_name:
-            qs = qs.filter(model_name__icontains=model_name)
-
-        app_label = request.query_params.get('app')
-        if app_label:
-            qs = qs.filter(app_label__icontains=app_label)
-
-        object_id = request.query_params.get('object_id')
-        if object_id:
-            qs = qs.filter(object_id=str(object_id))
-
-        method = request.query_params.get('method')
-        if method:
-            qs = qs.filter(method__iexact=method)
-
-        status_code = request.query_params.get('status_code')
-        if status_code:
-            qs = qs.filter(status_code=status_code)
-
-        start = request.query_params.get('date_start')
-        if start:
-            qs = qs.filter(created_at__date__gte=start)
-
-        end = request.query_params.get('date_end')
-        if end:
-            qs = qs.filter(created_at__date__lte=end)
-
-        search = request.query_params.get('search')
-        if search:
-            qs = qs.filter(
-                Q(operator_username__icontains=search) |
-                Q(operator_name__icontains=search) |
-                Q(path__icontains=search) |
-                Q(summary__icontains=search) |
-                Q(object_repr__icontains=search) |
-                Q(model_name__icontains=search)
-            )
-
-        paginator = ConfigurablePageNumberPagination()
-        page = paginator.paginate_queryset(qs, request)
+        filtros = _filtros(request)
+        qs = _aplicar_filtros(AuditLog.objects.all(), filtros)
+
+        # O arquivo morto (comando arquivar_auditoria) so e consultado em buscas
+        # delimitadas por objeto ou por periodo, continuando apos as linhas do banco.
+        usa_arquivo = bool(filtros.get('object_id') or filtros.get('start') or filtros.get('end'))
+
+        def arquivados(before, limit):
+            return search_audit_logs(filtros, before=before, limit=limit)
+
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(qs, request, extra_rows=arquivados if usa_arquivo else None)
         if page is None:
-            serializer = AuditLogSerializer(qs, many=True)
+            rows = list(qs)
+            if usa_arquivo:
+                rows.extend(search_audit_logs(filtros))
+            serializer = AuditLogSerializer(rows, many=True)
             return Response(serializer.data)
         serializer = AuditLogSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+
+
+class ObjectHistoryView(APIView):
+    """
+    Estado de um objeto em uma data: ?app_label=&model_name=&object_id=&at=
+    (at aceita data ou data/hora; sem at, o estado atual registrado).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        app_label = (params.get('app_label') or '').strip().lower()
+        model_name = (params.get('model_name') or '').strip().lower()
+        object_id = (params.get('object_id') or '').strip()
+        if not app_label or not model_name or not object_id:
+            return Response({'error': 'Informe app_label, model_name e object_id.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        at_raw = (params.get('at') or '').strip()
+        if at_raw:
+            if 'T' not in at_raw and ' ' not in at_raw:
+                # Data sem horario: estado ao final do dia. parse_datetime aceitaria
+                # a data como meia-noite (datetime.fromisoformat), por isso vem antes.
+                fim = _inicio_do_dia(at_raw, dias=1)
+                at = fim - timedelta(microseconds=1) if fim else None
+            else:
+                try:
+                    at = parse_datetime(at_raw)
+                except ValueError:
+                    at = None
+                if at is not None and timezone.is_naive(at):
+                    at = timezone.make_aware(at, timezone.get_current_timezone())
+            if at is None:
+                return Response({'error': 'Data invalida.'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            at = timezone.now()
+
+        return Response(reconstruct_state(app_label, model_name, object_id, at))
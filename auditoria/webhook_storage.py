@@ -0,0 +1,63 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import WebhookEvent
+
+
+def normalize_event_type(event_type):
+    """'presence.update' e 'PRESENCE_UPDATE' viram a mesma chave de configuracao."""
+    return str(event_type or '').upper().replace('.', '_')
+
+
+def _event_type_variants(key):
+    return [key, key.lower().replace('_', '.')]
+
+
+def should_store_event(event_type):
+    """
+    Amostragem opcional por tipo de evento (WEBHOOK_SAMPLE_RATES). O evento
+    continua sendo processado; apenas o registro bruto deixa de ser gravado.
+    """
+    rates = getattr(settings, 'WEBHOOK_SAMPLE_RATES', None) or {}
+    rate = rates.get(normalize_event_type(event_type))
+    if rate is None:
+        return True
+    try:
+        rate = float(rate)
+    except (TypeError, ValueError):
+        return True
+    if rate >= 1:
+        return True
+    if rate <= 0:
+        return False
+    return random.random() < rate
+
+
+def store_webhook_event(provider, instance_name, event_type, payload):
+    if not should_store_event(event_type):
+        return None
+    event = WebhookEvent(provider=provider, instance_name=instance_name, event_type=event_type)
+    event.set_payload(payload)
+    event.save()
+    return event
+
+
+def purge_expired_events(now=None):
+    """
+    Remove os eventos cujo tipo tem retencao propria em WEBHOOK_RETENTION_DAYS
+    (ex.: presenca), sem passar pelo arquivo morto. Retorna {tipo: removidos}.
+    """
+    now = now or timezone.now()
+    removidos = {}
+    for event_type, dias in (getattr(settings, 'WEBHOOK_RETENTION_DAYS', None) or {}).items():
+        key = normalize_event_type(event_type)
+        cutoff = now - timedelta(days=max(int(dias), 0))
+        total, _ = WebhookEvent.objects.filter(
+            event_type__in=_event_type_variants(key),
+            received_at__lt=cutoff,
+        ).delete()
+        removidos[key] = total
+    return removidos
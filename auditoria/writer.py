@@ -0,0 +1,165 @@
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from threading import local
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog
+
+
+# Modos de escrita do AuditLog:
+#   direct   -> um INSERT por registro, assim que a transacao confirma
+#   buffered -> registros acumulados por requisicao/lote e gravados com um bulk_create
+#   spool    -> igual ao buffered, mas o lote vai para arquivos JSONL em AUDIT_SPOOL_DIR,
+#               carregados depois pelo comando carregar_spool_auditoria
+MODE_DIRECT = 'direct'
+MODE_BUFFERED = 'buffered'
+MODE_SPOOL = 'spool'
+
+_state = local()
+
+
+def _get_mode():
+    mode = getattr(settings, 'AUDIT_WRITER_MODE', MODE_BUFFERED)
+    if mode not in (MODE_DIRECT, MODE_BUFFERED, MODE_SPOOL):
+        return MODE_BUFFERED
+    return mode
+
+
+def _get_buffer_size():
+    try:
+        return max(int(getattr(settings, 'AUDIT_BUFFER_SIZE', 500)), 1)
+    except (TypeError, ValueError):
+        return 500
+
+
+def get_spool_dir():
+    return str(getattr(settings, 'AUDIT_SPOOL_DIR', os.path.join(settings.BASE_DIR, 'audit_spool')))
+
+
+def _active_buffer():
+    stack = getattr(_state, 'buffers', None)
+    if not stack:
+        return None
+    return stack[-1]
+
+
+def pending_entries():
+    """Entradas ja confirmadas que ainda estao nos lotes abertos desta thread (fora do banco)."""
+    return [entry for buffer in getattr(_state, 'buffers', None) or [] for entry in buffer.entries]
+
+
+class AuditBuffer:
+    def __init__(self, mode):
+        self.mode = mode
+        self.entries = []
+        self.closed = False
+
+    def add(self, entry):
+        self.entries.append(entry)
+        # Transacao confirmada depois do fim do lote: grava na hora.
+        if self.closed or len(self.entries) >= _get_buffer_size():
+            self.flush()
+
+    def flush(self):
+        if not self.entries:
+            return 0
+        entries, self.entries = self.entries, []
+        if self.mode == MODE_SPOOL:
+            write_spool(entries)
+        else:
+            AuditLog.objects.bulk_create(entries, batch_size=_get_buffer_size())
+        return len(entries)
+
+
+@contextmanager
+def audit_batch():
+    """
+    Acumula os registros de auditoria do bloco e grava tudo de uma vez na saida.
+    Usado pelo AuditMiddleware (um lote por requisicao) e por rotinas em massa.
+    """
+    mode = _get_mode()
+    if mode == MODE_DIRECT:
+        yield None
+        return
+
+    buffer = AuditBuffer(mode)
+    stack = getattr(_state, 'buffers', None)
+    if stack is None:
+        stack = _state.buffers = []
+    stack.append(buffer)
+    try:
+        yield buffer
+    finally:
+        stack.pop()
+        buffer.closed = True
+        buffer.flush()
+
+
+def record_entry(**fields):
+    """
+    Registra uma entrada de auditoria. Dentro de uma transacao, a entrada so
+    entra no lote quando a transacao confirma (transaction.on_commit), de modo
+    que alteracoes desfeitas por rollback nao geram log.
+    """
+    fields.setdefault('created_at', timezone.now())
+    entry = AuditLog(**fields)
+    entry.refresh_search_text()
+    buffer = _active_buffer()
+
+    if buffer is None:
+        if _get_mode() == MODE_SPOOL:
+            transaction.on_commit(lambda: write_spool([entry]))
+        else:
+            transaction.on_commit(entry.save)
+        return entry
+
+    transaction.on_commit(lambda: buffer.add(entry))
+    return entry
+
+
+def _entry_to_dict(entry):
+    data = {}
+    for field in AuditLog._meta.concrete_fields:
+        if field.primary_key:
+            continue
+        data[field.attname] = getattr(entry, field.attname)
+    return data
+
+
+def write_spool(entries):
+    """
+    Grava o lote em um novo arquivo JSONL. O arquivo e escrito com extensao
+    .tmp e renomeado ao final, para o carregador nunca ler um lote pela metade.
+    """
+    spool_dir = get_spool_dir()
+    os.makedirs(spool_dir, exist_ok=True)
+    name = f"audit-{timezone.now().strftime('%Y%m%d%H%M%S%f')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    tmp_path = os.path.join(spool_dir, f'{name}.tmp')
+    final_path = os.path.join(spool_dir, f'{name}.jsonl')
+    with open(tmp_path, 'w', encoding='utf-8') as fp:
+        for entry in entries:
+            fp.write(json.dumps(_entry_to_dict(entry), cls=DjangoJSONEncoder, ensure_ascii=False))
+            fp.write('\n')
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+def read_spool_file(path):
+    entries = []
+    with open(path, 'r', encoding='utf-8') as fp:
+        for line in fp:
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+            if data.get('created_at'):
+                data['created_at'] = parse_datetime(data['created_at'])
+            entries.append(AuditLog(**data))
+    return entries
@@ -1,6 +1,7 @@
 import { createContext, useState, useEffect, useContext } from 'react';
 import axios from 'axios';
 import { getPrivilegeModules } from '../config/navigation';
+import { carregarReferencias, limparReferencias } from '../utils/referencias';
 
 const AuthContext = createContext();
 
@@ -28,12 +29,13 @@ export function AuthProvider({ children }) {
   };
 
   const refreshUser = async () => {
-    const res = await api.get('me/');
-    setUser(res.data);
-    if (res.data?.is_superuser) {
+    // O operador vem no pacote de referencias, que ja deixa os dropdowns carregados.
+    const { me } = await carregarReferencias(api, { recarregar: true });
+    setUser(me);
+    if (me?.is_superuser) {
       await syncPrivileges();
     }
-    return res.data;
+    return me;
   };
 
   // --- INTERCEPTADOR GLOBAL DE ERROS ---
@@ -101,6 +103,7 @@ export function AuthProvider({ children }) {
   const logout = () => {
     localStorage.removeItem('token');
     sessionStorage.removeItem('token');
+    limparReferencias();
     delete api.defaults.headers.common['Authorization'];
     setUser(null);
   };
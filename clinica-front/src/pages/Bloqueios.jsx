@@ -7,6 +7,7 @@ import {
 } from 'lucide-react';
 import { generateConflictReport } from '../utils/generateReport';
 import { formatDateDMY } from '../utils/date';
+import { carregarReferencias } from '../utils/referencias';
 
 export default function Bloqueios() {
     const { api } = useAuth();
@@ -48,13 +49,13 @@ export default function Bloqueios() {
     const loadData = async () => {
         setFetching(true);
         try {
-            const [resBloq, resProf, resConfig] = await Promise.all([
+            const [resBloq, referencias, resConfig] = await Promise.all([
                 api.get('bloqueios/?nopage=true'),
-                api.get('profissionais/?nopage=true'),
+                carregarReferencias(api),
                 api.get('configuracoes/sistema/')
             ]);
             setBloqueios(Array.isArray(resBloq.data.results || resBloq.data) ? (resBloq.data.results || resBloq.data) : []);
-            setProfissionais(Array.isArray(resProf.data.results || resProf.data) ? (resProf.data.results || resProf.data) : []);
+            setProfissionais(referencias.profissionais || []);
             setConfigSistema(resConfig.data);
         } catch (e) { 
             notify.error("Erro ao sincronizar dados de bloqueio."); 
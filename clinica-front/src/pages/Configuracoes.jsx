@@ -3,6 +3,7 @@ import { useAuth } from '../context/AuthContext';
 import { useNotification } from '../context/NotificationContext';
 import Layout from '../components/Layout';
 import useUnsavedChanges from '../hooks/useUnsavedChanges';
+import { formatDateDMY } from '../utils/date';
 import { 
     Settings, Shield, Layout as LayoutIcon, CalendarClock, Save, Loader2, AlertTriangle, 
     Lock, MessageCircle, Play, Clock, Bell, Activity, Check, QrCode, X
@@ -21,6 +22,7 @@ export default function Configuracoes() {
     const [qrLoading, setQrLoading] = useState(false);
     const [qrImage, setQrImage] = useState('');
     const [qrError, setQrError] = useState('');
+    const [cobertura, setCobertura] = useState(null);
 
     // Estado completo com todos os campos do seu sistema
     const [config, setConfig] = useState({
@@ -76,6 +78,7 @@ export default function Configuracoes() {
         if (api) {
             loadConfig();
             loadWhatsappStatus();
+            loadCobertura();
         }
     }, [api]);
 
@@ -181,6 +184,7 @@ export default function Configuracoes() {
                     stats_amanha: res.data.stats_amanha
                 }));
             }
+            loadCobertura();
         } catch (e) {
             notify.error("Erro na execução do robô.");
         } finally {
@@ -188,6 +192,15 @@ export default function Configuracoes() {
         }
     };
 
+    const loadCobertura = async () => {
+        try {
+            const res = await api.get('configuracoes/sistema/lembretes_cobertura/?dias=7');
+            setCobertura(res.data);
+        } catch (e) {
+            setCobertura(null);
+        }
+    };
+
     const loadWhatsappStatus = async () => {
         setWhatsappStatus(prev => ({ ...prev, loading: true }));
         try {
@@ -447,7 +460,27 @@ export default function Configuracoes() {
                                                                 <span className="text-3xl font-black text-slate-700 dark:text-white">{config.stats_amanha?.pendentes || 0}</span>
                                                             </div>
                                                         </div>
-                                                        
+
+                                                        {cobertura && (
+                                                            <div className="bg-white dark:bg-slate-800 p-4 rounded-2xl border border-slate-100 dark:border-slate-700 shadow-sm mb-6">
+                                                                <div className="flex justify-between items-center mb-2">
+                                                                    <p className="text-[9px] font-black text-slate-400 uppercase tracking-widest">Cobertura 7 dias</p>
+                                                                    <span className="text-xs font-black text-blue-600">
+                                                                        {cobertura.totais.cobertura === null ? '-' : `${cobertura.totais.cobertura}%`}
+                                                                    </span>
+                                                                </div>
+                                                                {cobertura.dias.map((dia) => (
+                                                                    <div key={dia.data} className="flex justify-between text-[11px] font-bold text-slate-500 dark:text-slate-300 py-0.5">
+                                                                        <span>{formatDateDMY(dia.data)}</span>
+                                                                        <span>
+                                                                            {dia.enviados}/{dia.total} enviados
+                                                                            {dia.sem_whatsapp > 0 && <span className="text-orange-400"> · {dia.sem_whatsapp} sem WhatsApp</span>}
+                                                                        </span>
+                                                                    </div>
+                                                                ))}
+                                                            </div>
+                                                        )}
+
                                                         <div className="flex items-center justify-between bg-white dark:bg-slate-800 p-3 rounded-xl border border-slate-200 dark:border-slate-700 mb-6">
                                                             <span className="text-[10px] font-bold text-slate-500 uppercase ml-1">Horário de Disparo:</span>
                                                             <input type="time" name="horario_disparo_lembrete" value={config.horario_disparo_lembrete} onChange={handleChange} className="bg-slate-100 dark:bg-slate-900 border-none rounded-lg px-2 py-1 font-black text-sm text-blue-600 outline-none focus:ring-2 focus:ring-blue-500"/>
@@ -8,6 +8,7 @@ import {
     X, Save, Clock, CalendarDays, PlusCircle, Calculator, DollarSign, ShieldCheck, Users, ListFilter, ChevronDown, Check, Loader2 
 } from 'lucide-react';
 import { normalizeSearchText } from '../utils/text';
+import { carregarReferencias } from '../utils/referencias';
 
 // --- HELPERS DE TEMPO (Mantidos para o Cálculo Real-Time) ---
 const timeToMinutes = (time) => {
@@ -185,9 +186,13 @@ export default function ConfigurarAgenda() {
   // --- CARREGAMENTO INICIAL ---
   useEffect(() => {
     if (api) {
-        api.get(`agendas/config/filters_data/?status=${statusFilter}`).then(res => {
-            setProfissionaisFilter(res.data.profissionais);
-            setEspecialidadesFilter(res.data.especialidades);
+        // Opcoes das agendas ativas vem do pacote de referencias; os demais status consultam a API.
+        const opcoes = statusFilter === 'ativos'
+            ? carregarReferencias(api).then(referencias => referencias.filtros_agenda)
+            : api.get(`agendas/config/filters_data/?status=${statusFilter}`).then(res => res.data);
+        opcoes.then(dados => {
+            setProfissionaisFilter(dados?.profissionais || []);
+            setEspecialidadesFilter(dados?.especialidades || []);
         }).catch(() => {});
         
         api.get('configuracoes/convenios/?nopage=true').then(res => {
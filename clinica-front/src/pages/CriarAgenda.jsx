@@ -10,6 +10,7 @@ import {
     CalendarDays, DollarSign, ShieldCheck, Plus, Trash2, Loader2, Save, PlusCircle
 } from 'lucide-react';
 import { normalizeSearchText } from '../utils/text';
+import { carregarReferencias } from '../utils/referencias';
 
 function generateUUID() {
     return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, function(c) {
@@ -209,9 +210,8 @@ export default function CriarAgenda() {
 
   useEffect(() => {
     if (api) {
-        api.get('profissionais/?nopage=true').then(res => {
-            const data = res.data.results || res.data;
-            setProfissionaisOptions(data.map(p => ({ id: p.id, label: p.nome })));
+        carregarReferencias(api).then(referencias => {
+            setProfissionaisOptions((referencias.profissionais || []).map(p => ({ id: p.id, label: p.nome })));
         });
         api.get('configuracoes/convenios/?nopage=true').then(res => {
             const data = res.data.results || res.data;
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { useNotification } from '../context/NotificationContext';
 import Layout from '../components/Layout';
@@ -13,6 +13,12 @@ export default function ImportacaoTabelas() {
   const [arquivoNome, setArquivoNome] = useState('');
   const [loading, setLoading] = useState(false);
   const [fileKey, setFileKey] = useState(0);
+  const [substituirVersao, setSubstituirVersao] = useState(false);
+  const [job, setJob] = useState(null);
+  const pollingRef = useRef(null);
+  const aceitaUpsert = tipo === 'exames' || tipo === 'cids';
+
+  useEffect(() => () => clearTimeout(pollingRef.current), []);
 
   const handleFileChange = (e) => {
     const file = e.target.files?.[0] || null;
@@ -24,6 +30,7 @@ export default function ImportacaoTabelas() {
     setTipo('');
     setArquivo(null);
     setArquivoNome('');
+    setSubstituirVersao(false);
     setFileKey((prev) => prev + 1);
   };
 
@@ -35,6 +42,7 @@ export default function ImportacaoTabelas() {
     const formData = new FormData();
     formData.append('tipo', tipo);
     formData.append('arquivo', arquivo);
+    if (aceitaUpsert && substituirVersao) formData.append('modo', 'upsert');
 
     setLoading(true);
     try {
@@ -43,10 +51,17 @@ export default function ImportacaoTabelas() {
         : tipo === 'especialidades_cbo'
         ? 'especialidades/importar_cbo/'
         : 'configuracoes/importacao/tabelas/';
-      await api.post(endpoint, formData, {
+      const res = await api.post(endpoint, formData, {
         headers: { 'Content-Type': 'multipart/form-data' }
       });
-      notify.success("Importacao concluida com sucesso.");
+      if (res.status === 202 && res.data?.job_id) {
+        setJob({ id: res.data.job_id, status: res.data.status, linhas_lidas: 0, linhas_gravadas: 0 });
+        notify.info("Arquivo recebido. A importacao continua em segundo plano.");
+        resetForm();
+        acompanharJob(res.data.job_id);
+        return;
+      }
+      notificarResultado(res?.data?.resultado);
       resetForm();
     } catch (error) {
       const msg = error?.response?.data?.error || "Erro ao importar tabela.";
@@ -56,6 +71,37 @@ export default function ImportacaoTabelas() {
     }
   };
 
+  const notificarResultado = (resultado) => {
+    if (resultado && resultado.desativados !== undefined) {
+      notify.success(
+        `Importacao concluida: ${resultado.criados} novos, ${resultado.atualizados} atualizados, ${resultado.desativados} desativados.`
+      );
+    } else {
+      notify.success("Importacao concluida com sucesso.");
+    }
+  };
+
+  const acompanharJob = (jobId) => {
+    clearTimeout(pollingRef.current);
+    pollingRef.current = setTimeout(async () => {
+      try {
+        const { data } = await api.get(`configuracoes/importacao/jobs/${jobId}/`);
+        setJob(data);
+        if (data.status === 'concluido') {
+          notificarResultado(data.resultado);
+          return;
+        }
+        if (data.status === 'erro') {
+          notify.error(data.erro || "Erro ao importar tabela.");
+          return;
+        }
+      } catch (error) {
+        // Falha pontual na consulta: tenta de novo no proximo ciclo.
+      }
+      acompanharJob(jobId);
+    }, 2000);
+  };
+
   return (
     <Layout>
       <div className="max-w-3xl mx-auto pb-20">
@@ -119,7 +165,28 @@ export default function ImportacaoTabelas() {
             <p className="text-[10px] text-slate-400 font-medium uppercase tracking-widest mt-2">
               Selecione o tipo de importacao para habilitar o upload.
             </p>
+            {aceitaUpsert && (
+              <label className="flex items-center gap-2 mt-4 text-xs font-bold text-slate-600 dark:text-slate-300 cursor-pointer">
+                <input
+                  type="checkbox"
+                  checked={substituirVersao}
+                  onChange={(e) => setSubstituirVersao(e.target.checked)}
+                  className="w-4 h-4 rounded border-slate-300"
+                />
+                Nova versao da tabela: atualizar alterados e desativar codigos ausentes
+              </label>
+            )}
           </div>
+
+          {job && (
+            <div className="border-t border-slate-100 dark:border-slate-700 pt-4 text-xs font-bold text-slate-600 dark:text-slate-300 flex items-center gap-2">
+              {(job.status === 'pendente' || job.status === 'processando') && <Loader2 className="animate-spin" size={14} />}
+              <span className="uppercase tracking-widest">Importacao #{job.id}: {job.status}</span>
+              <span className="text-slate-400">
+                {job.linhas_lidas} linhas lidas, {job.linhas_gravadas} gravadas
+              </span>
+            </div>
+          )}
         </form>
       </div>
     </Layout>
@@ -343,7 +343,9 @@ export default function Logs() {
   const [loading, setLoading] = useState(false);
   const [logs, setLogs] = useState([]);
   const [page, setPage] = useState(1);
-  const [totalPages, setTotalPages] = useState(1);
+  const [hasNext, setHasNext] = useState(false);
+  // Cursores da paginacao por keyset: cursorsRef.current[n - 1] abre a pagina n.
+  const cursorsRef = useRef([null]);
   const [hasSearched, setHasSearched] = useState(false);
   const [searchNonce, setSearchNonce] = useState(0);
 
@@ -375,7 +377,8 @@ export default function Logs() {
     setLoading(true);
     try {
       const params = new URLSearchParams();
-      params.append('page', page);
+      const cursor = page > 1 ? cursorsRef.current[page - 1] : null;
+      if (cursor) params.append('cursor', cursor);
       activeFilters.forEach((f) => {
         if (!f.value) return;
         if (f.type === 'texto') params.append('search', f.value);
@@ -384,8 +387,9 @@ export default function Logs() {
 
       const res = await api.get(`auditoria/logs/?${params.toString()}`);
       setLogs(res.data.results || []);
-      const count = res.data.count || 0;
-      setTotalPages(res.data.num_pages || Math.max(1, Math.ceil(count / (res.data.page_size || 1))));
+      const nextCursor = res.data.next_cursor || null;
+      cursorsRef.current[page] = nextCursor;
+      setHasNext(Boolean(nextCursor));
     } catch (error) {
       notify?.error?.('Erro ao carregar logs.');
     } finally {
@@ -625,11 +629,11 @@ export default function Logs() {
             Anterior
           </button>
           <span className="text-[10px] font-black uppercase tracking-widest text-slate-400">
-            Pagina {page} de {totalPages}
+            Pagina {page}
           </span>
           <button
-            onClick={() => setPage((p) => Math.min(totalPages, p + 1))}
-            disabled={page >= totalPages}
+            onClick={() => setPage((p) => p + 1)}
+            disabled={!hasNext}
             className="px-4 py-2 rounded-xl text-[10px] font-black uppercase tracking-widest border border-slate-200 text-slate-500 hover:bg-slate-50 disabled:opacity-50"
           >
             Proxima
@@ -9,8 +9,8 @@ import {
     MapPin, ChevronDown, Check, MessageCircle, User, Baby, Heart, Accessibility, 
     Users, Printer, Clock, Filter, Stethoscope, CalendarDays, CheckCircle2
 } from 'lucide-react';
-import { generateAppointmentReceipt } from '../utils/generateReceipt';
 import { normalizeSearchText } from '../utils/text';
+import { carregarReferencias } from '../utils/referencias';
 
 // --- CSS CUSTOMIZADO PARA AUMENTAR O CALENDÁRIO ---
 const calendarStyles = `
@@ -205,9 +205,8 @@ export default function MarcarConsulta() {
   useEffect(() => {
     if (api) {
         api.get('configuracoes/sistema/').then(res => setConfigSistema(res.data)).catch(() => {});
-        api.get('profissionais/?nopage=true').then(res => {
-            const data = res.data.results || res.data;
-            setProfissionais(Array.isArray(data) ? data.map(p => ({ id: p.id, label: p.nome })) : []);
+        carregarReferencias(api).then(referencias => {
+            setProfissionais((referencias.profissionais || []).map(p => ({ id: p.id, label: p.nome })));
         }).catch(() => {});
         api.get('pacientes/lista/?nopage=true').then(res => {
             const data = res.data.results || res.data;
@@ -335,7 +334,7 @@ export default function MarcarConsulta() {
         } else {
             const { data } = await api.post('agendamento/', payload);
             notify.success("Agendado com sucesso!");
-            generateAppointmentReceipt(data);
+            abrirComprovante(data.id);
         }
         setModalOpen(false);
         carregarAgenda();
@@ -343,17 +342,23 @@ export default function MarcarConsulta() {
     finally { setLoadingSave(false); }
   };
 
-  const handlePrintAgendamento = async (e, slot) => {
-    e.stopPropagation();
-    if (!slot?.agendamento_id) return;
+  const abrirComprovante = async (agendamentoId) => {
     try {
-        const { data } = await api.get(`agendamento/${slot.agendamento_id}/`);
-        generateAppointmentReceipt(data);
+        const res = await api.get(`agendamento/${agendamentoId}/comprovante_pdf/`, { responseType: 'blob' });
+        const url = window.URL.createObjectURL(new Blob([res.data], { type: 'application/pdf' }));
+        window.open(url, '_blank');
+        setTimeout(() => window.URL.revokeObjectURL(url), 2000);
     } catch (error) {
         notify.error("Erro ao gerar a guia.");
     }
   };
 
+  const handlePrintAgendamento = async (e, slot) => {
+    e.stopPropagation();
+    if (!slot?.agendamento_id) return;
+    abrirComprovante(slot.agendamento_id);
+  };
+
   const handleExcluirAgendamento = async (e, id) => {
       e.stopPropagation();
       const confirmed = await confirmDialog("Excluir este agendamento?", "Exclusão", "Sim, Excluir", "Cancelar", "danger");
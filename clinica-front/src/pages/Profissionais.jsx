@@ -3,6 +3,7 @@ import { useAuth } from '../context/AuthContext';
 import { useNotification } from '../context/NotificationContext';
 import { Link } from 'react-router-dom';
 import Layout from '../components/Layout';
+import { carregarReferencias } from '../utils/referencias';
 import { 
     Search, Plus, Stethoscope, Edit, Trash2, Briefcase, ShieldCheck, Filter, ChevronDown, X
 } from 'lucide-react';
@@ -25,8 +26,8 @@ export default function Profissionais() {
 
     useEffect(() => {
         if (!api) return;
-        api.get('especialidades/?nopage=true')
-            .then((res) => setEspecialidadesFilter(res.data.results || res.data))
+        carregarReferencias(api)
+            .then((referencias) => setEspecialidadesFilter(referencias.especialidades || []))
             .catch(() => {});
     }, [api]);
 
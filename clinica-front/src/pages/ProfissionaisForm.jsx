@@ -9,6 +9,7 @@ import {
     BriefcaseMedical, ChevronDown, Check, X, Loader2, Award 
 } from 'lucide-react';
 import { normalizeSearchText } from '../utils/text';
+import { carregarReferencias } from '../utils/referencias';
 
 const SearchableSelect = ({ options, value, onChange, placeholder, required }) => {
     const [isOpen, setIsOpen] = useState(false);
@@ -103,8 +104,8 @@ export default function ProfissionalForm() {
     if(api) {
         setFetching(true);
         // Carrega especialidades para o Select
-        api.get('especialidades/?nopage=true') 
-            .then(res => setListaEspecialidades(res.data.results || res.data))
+        carregarReferencias(api)
+            .then(referencias => setListaEspecialidades(referencias.especialidades || []))
             .catch(() => notify.error("Erro ao carregar lista de especialidades."));
         
         if (id) {
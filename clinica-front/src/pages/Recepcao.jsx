@@ -5,9 +5,10 @@ import Layout from '../components/Layout';
 import { 
     Search, User, CheckCircle2, Clock, DollarSign, X, Save, Loader2, 
     Pencil, UserX, RotateCcw, Flag, Accessibility, Baby, Users, Heart, 
-    AlertTriangle, UserCog, MapPin, Stethoscope, ShieldCheck, Check
+    AlertTriangle, UserCog, MapPin, Stethoscope, ShieldCheck, Check, Printer
 } from 'lucide-react';
 import { normalizeSearchText } from '../utils/text';
+import { carregarReferencias } from '../utils/referencias';
 
 // Mapeamento visual das prioridades
 const PRIORIDADES = {
@@ -52,6 +53,7 @@ export default function Recepcao() {
     const [loadingPaciente, setLoadingPaciente] = useState(false);
     const [loadingCep, setLoadingCep] = useState(false);
     const [activePriorityMenu, setActivePriorityMenu] = useState(null);
+    const [imprimindoDia, setImprimindoDia] = useState(false);
 
     // Máscaras
     const mascaraCPF = (v) => v.replace(/\D/g, '').replace(/(\d{3})(\d)/, '$1.$2').replace(/(\d{3})(\d)/, '$1.$2').replace(/(\d{3})(\d{1,2})/, '$1-$2').slice(0, 14);
@@ -67,7 +69,14 @@ export default function Recepcao() {
     // Carregamento Inicial
     useEffect(() => {
         if(api) {
-            api.get('profissionais/?nopage=true').then(res => setProfissionais(res.data.results || res.data)).catch(() => {});
+            carregarReferencias(api).then(referencias => {
+                // O pacote traz so os ids das especialidades de cada profissional.
+                const especialidades = new Map((referencias.especialidades || []).map(e => [e.id, e]));
+                setProfissionais((referencias.profissionais || []).map(p => ({
+                    ...p,
+                    especialidades_lista: (p.especialidades || []).map(id => especialidades.get(id)).filter(Boolean)
+                })));
+            }).catch(() => {});
             api.get('configuracoes/convenios/?nopage=true').then(res => setConvenios(res.data.results || res.data)).catch(() => {});
         }
     }, [api]);
@@ -270,6 +279,22 @@ export default function Recepcao() {
 
 }, [formCheckin.profissional, profissionais]);
 
+    const imprimirDia = async () => {
+        if (!profissionalFiltro) return notify.warning("Selecione o profissional para imprimir o dia.");
+        setImprimindoDia(true);
+        try {
+            const params = new URLSearchParams({ data: dataFiltro, profissional: profissionalFiltro });
+            const res = await api.get(`agendamento/impressao_dia/?${params.toString()}`, { responseType: 'blob' });
+            const url = window.URL.createObjectURL(new Blob([res.data], { type: 'application/pdf' }));
+            window.open(url, '_blank');
+            setTimeout(() => window.URL.revokeObjectURL(url), 2000);
+        } catch (error) {
+            notify.error(error?.response?.status === 404 ? "Nenhum agendamento para imprimir." : "Erro ao gerar impressao do dia.");
+        } finally {
+            setImprimindoDia(false);
+        }
+    };
+
     return (
         <Layout>
             <div className="max-w-7xl mx-auto pb-20 tracking-tight">
@@ -285,7 +310,7 @@ export default function Recepcao() {
                 <div className="bg-white dark:bg-slate-800 p-6 rounded-[24px] shadow-sm border border-slate-200 dark:border-slate-700 mb-8 grid grid-cols-1 lg:grid-cols-4 gap-6">
                     <div><label className={labelClass}>Data</label><input type="date" value={dataFiltro} onChange={e => setDataFiltro(e.target.value)} className={inputClass}/></div>
                     <div><label className={labelClass}>Profissional</label><select value={profissionalFiltro} onChange={e => setProfissionalFiltro(e.target.value)} className={inputClass}><option value="">Todos</option>{profissionais.map(p => <option key={p.id} value={p.id}>{p.nome}</option>)}</select></div>
-                    <div className="lg:col-span-2"><label className={labelClass}>Busca Rápida</label><div className="relative"><Search className="absolute left-4 top-3.5 text-slate-400" size={18} /><input placeholder="Paciente..." value={buscaTexto} onChange={e => setBuscaTexto(e.target.value)} className={`${inputClass} pl-12`}/></div></div>
+                    <div className="lg:col-span-2"><label className={labelClass}>Busca Rápida</label><div className="flex gap-3"><div className="relative flex-1"><Search className="absolute left-4 top-3.5 text-slate-400" size={18} /><input placeholder="Paciente..." value={buscaTexto} onChange={e => setBuscaTexto(e.target.value)} className={`${inputClass} pl-12`}/></div><button type="button" onClick={imprimirDia} disabled={!profissionalFiltro || imprimindoDia} title="Guias e fichas de todos os agendamentos do dia" className="h-12 px-4 rounded-xl bg-slate-900 text-white text-[10px] font-black uppercase tracking-widest flex items-center gap-2 disabled:opacity-40">{imprimindoDia ? <Loader2 className="animate-spin" size={16}/> : <Printer size={16}/>} Imprimir dia</button></div></div>
                 </div>
 
                 <div className="flex flex-wrap gap-2 mb-6">
@@ -5,6 +5,7 @@ import { useNotification } from '../context/NotificationContext';
 import Layout from '../components/Layout';
 import { Search, CheckCircle2, Clock, Loader2 } from 'lucide-react';
 import { normalizeSearchText } from '../utils/text';
+import { carregarReferencias } from '../utils/referencias';
 
 const STATUS_OPTIONS = ['agendado', 'aguardando', 'em_atendimento', 'finalizado', 'faltou'];
 
@@ -31,8 +32,8 @@ export default function Triagem() {
 
   useEffect(() => {
     if (api) {
-      api.get('profissionais/?nopage=true').then((res) => {
-        setProfissionais(res.data.results || res.data || []);
+      carregarReferencias(api).then((referencias) => {
+        setProfissionais(referencias.profissionais || []);
       }).catch(() => {});
     }
   }, [api]);
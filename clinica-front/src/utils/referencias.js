@@ -0,0 +1,70 @@
+// Dados de referencia (convenios, especialidades, profissionais, filtros da agenda e o
+// operador logado em `me`) vindos de GET /bootstrap/. O pacote fica no localStorage e cada chamada envia as
+// versoes que ja temos: o servidor responde 304 ou so as secoes que mudaram.
+const STORAGE_KEY = 'referencias';
+const MAX_IDADE_MS = 30 * 1000;
+
+let pendente = null;
+let carregadoEm = 0;
+
+const lerPacote = () => {
+  try {
+    return JSON.parse(localStorage.getItem(STORAGE_KEY)) || { secoes: {} };
+  } catch {
+    return { secoes: {} };
+  }
+};
+
+// Secoes em tabela ({ campos, linhas }) viram lista de objetos.
+const expandir = (dados) => {
+  if (!dados || !Array.isArray(dados.campos)) return dados;
+  return dados.linhas.map((linha) =>
+    Object.fromEntries(dados.campos.map((campo, i) => [campo, linha[i]]))
+  );
+};
+
+const buscar = async (api) => {
+  const pacote = lerPacote();
+  const versoes = Object.entries(pacote.secoes)
+    .map(([nome, secao]) => `${nome}:${secao.versao}`)
+    .join(',');
+
+  const res = await api.get('bootstrap/', {
+    params: versoes ? { versoes } : {},
+    validateStatus: (status) => status === 200 || status === 304,
+  });
+
+  if (res.status === 200) {
+    const secoes = {};
+    Object.entries(res.data.secoes).forEach(([nome, secao]) => {
+      secoes[nome] = 'dados' in secao ? secao : pacote.secoes[nome];
+    });
+    pacote.secoes = secoes;
+    try {
+      localStorage.setItem(STORAGE_KEY, JSON.stringify(pacote));
+    } catch {
+      // Sem espaco no localStorage: segue com o pacote em memoria.
+    }
+  }
+  return pacote;
+};
+
+// recarregar ignora o pacote em memoria (ex.: o operador acabou de mudar o proprio cadastro).
+export const carregarReferencias = async (api, { recarregar = false } = {}) => {
+  if (recarregar || !pendente || Date.now() - carregadoEm > MAX_IDADE_MS) {
+    carregadoEm = Date.now();
+    pendente = buscar(api).catch((err) => {
+      pendente = null;
+      throw err;
+    });
+  }
+  const pacote = await pendente;
+  return Object.fromEntries(
+    Object.entries(pacote.secoes).map(([nome, secao]) => [nome, expandir(secao?.dados)])
+  );
+};
+
+export const limparReferencias = () => {
+  pendente = null;
+  localStorage.removeItem(STORAGE_KEY);
+};
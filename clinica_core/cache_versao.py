@@ -0,0 +1,48 @@
+"""
+Versoes compartilhadas entre os workers para invalidar caches em processo.
+
+Cada nome tem uma versao no cache do Django (ver CACHES). Quem guarda dados em
+memoria anota a versao em que os leu e, quando ela muda, le de novo. A versao e
+um token aleatorio trocado apos o commit: diferente de um incr(), nunca se perde
+em alteracoes concorrentes (o FileBasedCache nao tem incr atomico).
+"""
+import logging
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+def _chave(nome):
+    return f"versao:{nome}"
+
+
+def atual(nome):
+    """Versao atual, ou None se o cache estiver indisponivel (nesse caso, nao use dados em memoria)."""
+    chave = _chave(nome)
+    try:
+        versao = cache.get(chave)
+        if versao is None:
+            # add() nao sobrescreve a versao gravada por outro worker no meio tempo.
+            cache.add(chave, uuid.uuid4().hex, None)
+            versao = cache.get(chave)
+        return versao
+    except Exception as exc:
+        logger.warning(f"Cache indisponivel para a versao de {nome}: {exc}")
+        return None
+
+
+def trocar(nome, ao_trocar=None):
+    """Troca a versao apos o commit da transacao corrente."""
+    def executar():
+        if ao_trocar:
+            ao_trocar()
+        try:
+            cache.set(_chave(nome), uuid.uuid4().hex, None)
+        except Exception as exc:
+            logger.warning(f"Falha ao trocar a versao de {nome}: {exc}")
+
+    transaction.on_commit(executar)
@@ -0,0 +1,155 @@
+"""
+Deteccao de formato dos arquivos tabulares importados (CBO, CID, TUSS, medicamentos).
+
+Uma unica leitura dos primeiros KB define BOM/encoding, separador e linha do
+cabecalho; antes do parse o encoding e conferido no arquivo inteiro e o
+arquivo e entao lido uma so vez pelo engine C do pandas.
+"""
+import codecs
+import csv
+
+import pandas as pd
+
+
+AMOSTRA_BYTES = 64 * 1024
+SEPARADORES = [';', ',', '\t', '|']
+MAX_LINHAS_CABECALHO = 100
+
+_ASSINATURAS_EXCEL = (b'PK\x03\x04', b'\xd0\xcf\x11\xe0')
+
+
+def ler_amostra(arquivo, tamanho=AMOSTRA_BYTES):
+    """Le os primeiros bytes do arquivo e volta o cursor para o inicio."""
+    arquivo.seek(0)
+    amostra = arquivo.read(tamanho)
+    arquivo.seek(0)
+    return amostra
+
+
+def eh_planilha_excel(amostra):
+    """xlsx (zip) ou xls (OLE2) pela assinatura dos primeiros bytes."""
+    return amostra.startswith(_ASSINATURAS_EXCEL)
+
+
+def _decodificar(amostra):
+    if amostra.startswith(codecs.BOM_UTF8):
+        return amostra[len(codecs.BOM_UTF8):].decode('utf-8', errors='replace'), 'utf-8-sig'
+    if amostra.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return amostra.decode('utf-16', errors='replace'), 'utf-16'
+
+    # Sem final=True: um caractere multibyte cortado no fim da amostra nao invalida o UTF-8.
+    try:
+        return codecs.getincrementaldecoder('utf-8')().decode(amostra), 'utf-8-sig'
+    except UnicodeDecodeError:
+        pass
+    try:
+        return amostra.decode('cp1252'), 'cp1252'
+    except UnicodeDecodeError:
+        return amostra.decode('latin1'), 'latin1'
+
+
+def _contar_colunas(linha, sep):
+    try:
+        return len(next(csv.reader([linha], delimiter=sep)))
+    except (csv.Error, StopIteration):
+        return 0
+
+
+def _escolher_separador(linhas, separadores, min_colunas):
+    """Separador com mais colunas no cabecalho e contagem estavel nas linhas seguintes."""
+    cabecalho, seguintes = linhas[0], linhas[1:6]
+    melhor, melhor_colunas = None, 0
+    for sep in separadores:
+        colunas = _contar_colunas(cabecalho, sep)
+        if colunas < min_colunas:
+            continue
+        estavel = all(_contar_colunas(linha, sep) == colunas for linha in seguintes)
+        if estavel and colunas > melhor_colunas:
+            melhor, melhor_colunas = sep, colunas
+    if melhor is None:
+        for sep in separadores:
+            if _contar_colunas(cabecalho, sep) >= min_colunas:
+                return sep
+    return melhor
+
+
+def detectar_formato_csv(amostra, cabecalho=None, separadores=SEPARADORES, min_colunas=2):
+    """
+    Retorna {'encoding', 'sep', 'linha_cabecalho'} para a amostra, ou None se ela
+    nao parece um CSV. cabecalho(celulas) -> bool localiza a linha do cabecalho
+    entre as MAX_LINHAS_CABECALHO primeiras; sem ele vale a primeira linha nao vazia.
+    """
+    if not amostra or eh_planilha_excel(amostra):
+        return None
+
+    texto, encoding = _decodificar(amostra)
+    linhas = texto.split('\n')
+    if len(linhas) > 1:
+        # A ultima linha da amostra pode estar cortada.
+        linhas = linhas[:-1]
+    linhas = [linha.rstrip('\r') for linha in linhas]
+
+    for idx, linha in enumerate(linhas[:MAX_LINHAS_CABECALHO]):
+        if not linha.strip():
+            continue
+        if cabecalho is None:
+            sep = _escolher_separador(linhas[idx:], separadores, min_colunas)
+            if sep is None:
+                return None
+            return {'encoding': encoding, 'sep': sep, 'linha_cabecalho': idx}
+        for sep in separadores:
+            celulas = next(csv.reader([linha], delimiter=sep), [])
+            if len(celulas) >= min_colunas and cabecalho(celulas):
+                return {'encoding': encoding, 'sep': sep, 'linha_cabecalho': idx}
+    return None
+
+
+# Se o arquivo inteiro nao decodifica no encoding da amostra, tenta o proximo (latin1 nunca falha).
+_ALTERNATIVAS_ENCODING = {'utf-8-sig': 'cp1252', 'cp1252': 'latin1'}
+BLOCO_VERIFICACAO = 1024 * 1024
+
+
+def _decodifica_inteiro(arquivo, encoding):
+    decodificador = codecs.getincrementaldecoder(encoding)()
+    arquivo.seek(0)
+    try:
+        while True:
+            bloco = arquivo.read(BLOCO_VERIFICACAO)
+            if not bloco:
+                decodificador.decode(b'', final=True)
+                return True
+            decodificador.decode(bloco)
+    except UnicodeDecodeError:
+        return False
+    finally:
+        arquivo.seek(0)
+
+
+def confirmar_encoding(arquivo, encoding):
+    """
+    Confere o encoding escolhido pela amostra contra o arquivo inteiro (leitura
+    em blocos, sem parsear) e passa para cp1252/latin1 se o UTF-8 falhar mais
+    adiante. Arquivo que nao decodifica em nenhum gera ValueError.
+    """
+    while encoding:
+        if _decodifica_inteiro(arquivo, encoding):
+            return encoding
+        encoding = _ALTERNATIVAS_ENCODING.get(encoding)
+    raise ValueError('Nao foi possivel identificar a codificacao do arquivo.')
+
+
+def ler_csv(arquivo, formato, **kwargs):
+    """pd.read_csv com o formato detectado (engine C, texto como str)."""
+    kwargs.setdefault('dtype', str)
+    encoding = confirmar_encoding(arquivo, formato['encoding'])
+    # O pandas nao reconhece os arquivos do Django (UploadedFile, FieldFile) como binarios
+    # e ignoraria o encoding; a decodificacao fica com um leitor de texto, estrito: o
+    # encoding ja foi conferido no arquivo inteiro e nenhum caractere e substituido.
+    texto = codecs.getreader(encoding)(arquivo, errors='strict')
+    return pd.read_csv(
+        texto,
+        sep=formato['sep'],
+        skiprows=formato['linha_cabecalho'],
+        engine='c',
+        **kwargs
+    )
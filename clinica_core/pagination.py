@@ -1,26 +1,43 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
 from configuracoes.models import ConfiguracaoSistema
 
 
+def _is_nopage(request):
+    value = request.query_params.get('nopage')
+    if value is None:
+        return False
+    return str(value).strip().lower() in ['1', 'true', 'yes', 'sim']
+
+
+def _configured_page_size():
+    try:
+        size = int(ConfiguracaoSistema.cached().itens_por_pagina or 0)
+        if size > 0:
+            return size
+    except Exception:
+        pass
+    return None
+
+
 class ConfigurablePageNumberPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = None
 
     def _is_nopage(self, request):
-        value = request.query_params.get('nopage')
-        if value is None:
-            return False
-        return str(value).strip().lower() in ['1', 'true', 'yes', 'sim']
+        return _is_nopage(request)
 
     def get_page_size(self, request):
-        try:
-            size = int(ConfiguracaoSistema.load().itens_por_pagina or 0)
-            if size > 0:
-                return size
-        except Exception:
-            pass
+        size = _configured_page_size()
+        if size:
+            return size
         return super().get_page_size(request) or self.page_size
 
     def paginate_queryset(self, queryset, request, view=None):
@@ -38,3 +55,76 @@ class ConfigurablePageNumberPagination(PageNumberPagination):
             'previous': self.get_previous_link(),
             'results': data
         })
+
+
+class KeysetPagination:
+    """
+    Paginacao por chave (created_at, id) em ordem decrescente, sem OFFSET e
+    sem COUNT: cada pagina parte do ultimo registro da anterior via ?cursor=.
+    """
+    page_size = 10
+    timestamp_field = 'created_at'
+
+    def get_page_size(self, request):
+        return _configured_page_size() or self.page_size
+
+    def _encode_cursor(self, obj):
+        timestamp = getattr(obj, self.timestamp_field)
+        raw = f'{timestamp.isoformat()}|{obj.pk}'
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, value):
+        try:
+            raw = base64.urlsafe_b64decode(value.encode('ascii')).decode('utf-8')
+            timestamp_raw, pk_raw = raw.rsplit('|', 1)
+            timestamp = parse_datetime(timestamp_raw)
+            pk = int(pk_raw)
+        except (ValueError, UnicodeError, binascii.Error):
+            raise ValidationError({'cursor': 'Cursor invalido.'})
+        if timestamp is None:
+            raise ValidationError({'cursor': 'Cursor invalido.'})
+        return timestamp, pk
+
+    def paginate_queryset(self, queryset, request, view=None, extra_rows=None):
+        """
+        extra_rows(before, limit), opcional, completa a pagina com registros de
+        outra origem (ex.: arquivo morto) mais antigos que before=(timestamp, pk),
+        na mesma ordem decrescente, quando o queryset se esgota.
+        """
+        if _is_nopage(request):
+            return None
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        field = self.timestamp_field
+
+        queryset = queryset.order_by(f'-{field}', '-pk')
+        cursor = request.query_params.get('cursor')
+        before = None
+        if cursor:
+            before = self._decode_cursor(cursor)
+            timestamp, pk = before
+            queryset = queryset.filter(
+                Q(**{f'{field}__lt': timestamp}) | Q(**{field: timestamp, 'pk__lt': pk})
+            )
+
+        # Busca um registro a mais so para saber se existe proxima pagina.
+        rows = list(queryset[:self.page_size_value + 1])
+        if extra_rows is not None and len(rows) <= self.page_size_value:
+            if rows:
+                before = (getattr(rows[-1], field), rows[-1].pk)
+            rows.extend(extra_rows(before, self.page_size_value + 1 - len(rows)))
+        self.has_next = len(rows) > self.page_size_value
+        self.page = rows[:self.page_size_value]
+        return self.page
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._encode_cursor(self.page[-1])
+
+    def get_paginated_response(self, data):
+        return Response({
+            'page_size': self.page_size_value,
+            'next_cursor': self.get_next_cursor(),
+            'results': data
+        })
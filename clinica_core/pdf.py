@@ -0,0 +1,326 @@
+"""
+Gerador de PDF simples para os documentos impressos pelo sistema.
+
+DocumentoPdf acumula blocos (titulos, paragrafos, campos, linhas); gerar()
+faz a diagramacao com quebra de linha e de pagina e devolve o arquivo em
+pedacos, pagina a pagina, para uso com StreamingHttpResponse. Os conteudos
+das paginas sao comprimidos (FlateDecode) e a tabela xref e montada com os
+deslocamentos registrados durante a escrita.
+
+Fontes: Helvetica e Helvetica-Bold (fontes padrao do leitor, sem embutir)
+com WinAnsiEncoding, o que cobre a acentuacao do portugues. Imagens (logo)
+sao gravadas uma unica vez e referenciadas por todas as paginas.
+"""
+import io
+import unicodedata
+import zlib
+
+from PIL import Image
+
+
+A4 = (595, 842)
+MARGEM = 50
+ENTRELINHA = 1.3
+
+FONTE_NORMAL = 'F1'
+FONTE_NEGRITO = 'F2'
+_FONTES = {
+    FONTE_NORMAL: 'Helvetica',
+    FONTE_NEGRITO: 'Helvetica-Bold',
+}
+
+# Larguras (milesimos de em) dos caracteres 32-126, das metricas AFM padrao.
+_LARGURAS = {
+    FONTE_NORMAL: [
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    ],
+    FONTE_NEGRITO: [
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+        975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+        333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+        611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+    ],
+}
+_LARGURA_PADRAO = 556
+
+# Catalogo, arvore de paginas e fontes tem numeros fixos; imagens e paginas vem a seguir.
+_OBJ_CATALOGO = 1
+_OBJ_PAGINAS = 2
+_OBJ_FONTES = {FONTE_NORMAL: 3, FONTE_NEGRITO: 4}
+_PRIMEIRO_OBJ_LIVRE = 5
+
+
+def _largura_caractere(caractere, fonte):
+    codigo = ord(caractere)
+    if not 32 <= codigo <= 126:
+        # Letras acentuadas tem a largura da letra base nas fontes Helvetica.
+        base = unicodedata.normalize('NFKD', caractere)[:1]
+        codigo = ord(base) if base else 0
+        if not 32 <= codigo <= 126:
+            return _LARGURA_PADRAO
+    return _LARGURAS[fonte][codigo - 32]
+
+
+def largura_texto(texto, fonte, tamanho):
+    return sum(_largura_caractere(c, fonte) for c in texto) * tamanho / 1000
+
+
+def _texto_pdf(texto):
+    dados = str(texto).encode('cp1252', 'replace')
+    return dados.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _quebrar_palavra(palavra, fonte, tamanho, largura):
+    """Divide uma palavra maior que a linha em pedacos que cabem nela."""
+    pedacos, atual = [], ''
+    for caractere in palavra:
+        if atual and largura_texto(atual + caractere, fonte, tamanho) > largura:
+            pedacos.append(atual)
+            atual = ''
+        atual += caractere
+    if atual:
+        pedacos.append(atual)
+    return pedacos
+
+
+def quebrar_linhas(trechos, tamanho, largura):
+    """
+    Distribui os trechos [(texto, fonte)] em linhas de ate `largura` pontos.
+    Cada linha e uma lista de (texto, fonte); '\\n' no texto forca nova linha.
+    """
+    linhas, atual, ocupado = [], [], 0.0
+    espaco = {fonte: largura_texto(' ', fonte, tamanho) for fonte in _FONTES}
+
+    def fechar_linha():
+        nonlocal atual, ocupado
+        linhas.append(atual)
+        atual, ocupado = [], 0.0
+
+    for texto, fonte in trechos:
+        for indice, paragrafo in enumerate(str(texto).split('\n')):
+            if indice > 0:
+                fechar_linha()
+            for palavra in paragrafo.split():
+                medida = largura_texto(palavra, fonte, tamanho)
+                separador = espaco[fonte] if atual else 0.0
+                if atual and ocupado + separador + medida > largura:
+                    fechar_linha()
+                    separador = 0.0
+                if medida > largura:
+                    pedacos = _quebrar_palavra(palavra, fonte, tamanho, largura)
+                    for pedaco in pedacos[:-1]:
+                        atual.append((pedaco, fonte))
+                        fechar_linha()
+                    palavra = pedacos[-1]
+                    medida = largura_texto(palavra, fonte, tamanho)
+                if atual:
+                    atual.append((' ', fonte))
+                    ocupado += separador
+                atual.append((palavra, fonte))
+                ocupado += medida
+    if atual or not linhas:
+        linhas.append(atual)
+    return linhas
+
+
+class DocumentoPdf:
+    def __init__(self, tamanho_pagina=A4, margem=MARGEM, rodape=''):
+        self.largura_pagina, self.altura_pagina = tamanho_pagina
+        self.margem = margem
+        self.rodape = rodape
+        self.blocos = []
+        self.imagens = {}
+
+    # --- Conteudo ---
+
+    def registrar_imagem(self, nome, conteudo):
+        """
+        Converte a imagem (PNG, JPEG...) para RGB e a guarda para ser gravada uma
+        vez no arquivo; retorna False se o conteudo nao for uma imagem valida.
+        """
+        try:
+            with Image.open(io.BytesIO(conteudo)) as original:
+                original.load()
+                if original.mode in ('RGBA', 'LA', 'P'):
+                    original = original.convert('RGBA')
+                    fundo = Image.new('RGB', original.size, (255, 255, 255))
+                    fundo.paste(original, mask=original.split()[-1])
+                    imagem = fundo
+                else:
+                    imagem = original.convert('RGB')
+        except (OSError, ValueError):
+            return False
+        largura, altura = imagem.size
+        self.imagens[nome] = (largura, altura, zlib.compress(imagem.tobytes(), 6))
+        return True
+
+    def imagem(self, nome, largura, altura=None):
+        """Desenha a imagem registrada em `nome`; sem altura, mantem a proporcao."""
+        if nome not in self.imagens:
+            return
+        if altura is None:
+            largura_px, altura_px, _ = self.imagens[nome]
+            altura = largura * altura_px / largura_px
+        self.blocos.append(('imagem', nome, largura, altura))
+
+    def titulo(self, texto, tamanho=14):
+        self.blocos.append(('texto', [(texto, FONTE_NEGRITO)], tamanho, 4))
+
+    def subtitulo(self, texto, tamanho=11):
+        self.blocos.append(('texto', [(texto, FONTE_NEGRITO)], tamanho, 2))
+
+    def paragrafo(self, texto, tamanho=10, negrito=False):
+        fonte = FONTE_NEGRITO if negrito else FONTE_NORMAL
+        self.blocos.append(('texto', [(texto or '', fonte)], tamanho, 2))
+
+    def campo(self, rotulo, valor, tamanho=10):
+        """'Rotulo: valor', com o rotulo em negrito e o valor quebrado na largura da pagina."""
+        valor = '-' if valor in (None, '') else valor
+        self.blocos.append(('texto', [(f'{rotulo}:', FONTE_NEGRITO), (f' {valor}', FONTE_NORMAL)], tamanho, 2))
+
+    def espaco(self, pontos=8):
+        self.blocos.append(('espaco', pontos))
+
+    def linha_horizontal(self):
+        self.blocos.append(('linha',))
+
+    def quebra_pagina(self):
+        self.blocos.append(('pagina',))
+
+    # --- Diagramacao ---
+
+    def _paginas(self):
+        """Gera o conteudo (operadores PDF) de cada pagina, uma por vez."""
+        largura_util = self.largura_pagina - 2 * self.margem
+        limite_inferior = self.margem + (20 if self.rodape else 0)
+        comandos, y, numero = [], self.altura_pagina - self.margem, 1
+
+        def finalizar():
+            if self.rodape:
+                texto = f'{self.rodape}  -  Pagina {numero}'
+                comandos.append(
+                    f'BT /{FONTE_NORMAL} 8 Tf {self.margem} {self.margem} Td ('.encode('ascii')
+                    + _texto_pdf(texto) + b') Tj ET'
+                )
+            return b'\n'.join(comandos)
+
+        for bloco in self.blocos:
+            tipo = bloco[0]
+            if tipo == 'pagina':
+                yield finalizar()
+                comandos, y, numero = [], self.altura_pagina - self.margem, numero + 1
+            elif tipo == 'espaco':
+                y -= bloco[1]
+            elif tipo == 'imagem':
+                _, nome, largura, altura = bloco
+                if y - altura < limite_inferior:
+                    yield finalizar()
+                    comandos, y, numero = [], self.altura_pagina - self.margem, numero + 1
+                y -= altura
+                comandos.append(
+                    f'q {largura:.2f} 0 0 {altura:.2f} {self.margem} {y:.2f} cm /{nome} Do Q'.encode('ascii')
+                )
+                y -= 4
+            elif tipo == 'linha':
+                y -= 4
+                comandos.append(
+                    f'0.8 G 0.5 w {self.margem} {y:.2f} m {self.largura_pagina - self.margem} {y:.2f} l S 0 G'
+                    .encode('ascii')
+                )
+                y -= 6
+            else:
+                _, trechos, tamanho, depois = bloco
+                altura_linha = tamanho * ENTRELINHA
+                for linha in quebrar_linhas(trechos, tamanho, largura_util):
+                    if y - altura_linha < limite_inferior:
+                        yield finalizar()
+                        comandos, y, numero = [], self.altura_pagina - self.margem, numero + 1
+                    y -= altura_linha
+                    if not linha:
+                        continue
+                    partes = [f'BT {self.margem} {y + (altura_linha - tamanho):.2f} Td'.encode('ascii')]
+                    fonte_atual = None
+                    for texto, fonte in linha:
+                        if fonte != fonte_atual:
+                            partes.append(f'/{fonte} {tamanho} Tf'.encode('ascii'))
+                            fonte_atual = fonte
+                        partes.append(b'(' + _texto_pdf(texto) + b') Tj')
+                    partes.append(b'ET')
+                    comandos.append(b' '.join(partes))
+                y -= depois
+        yield finalizar()
+
+    # --- Saida ---
+
+    def gerar(self):
+        """Escreve o PDF em pedacos (um por pagina); serve direto a StreamingHttpResponse."""
+        deslocamentos = {}
+        posicao = 0
+
+        def objeto(numero, corpo):
+            nonlocal posicao
+            deslocamentos[numero] = posicao
+            dados = f'{numero} 0 obj\n'.encode('ascii') + corpo + b'\nendobj\n'
+            posicao += len(dados)
+            return dados
+
+        cabecalho = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+        posicao += len(cabecalho)
+        yield cabecalho
+
+        numero = _PRIMEIRO_OBJ_LIVRE
+        objetos_imagem = {}
+        for nome, (largura, altura, comprimido) in self.imagens.items():
+            yield objeto(numero, (
+                f'<< /Type /XObject /Subtype /Image /Width {largura} /Height {altura} '
+                f'/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode /Length {len(comprimido)} >>'
+                '\nstream\n'
+            ).encode('ascii') + comprimido + b'\nendstream')
+            objetos_imagem[nome] = numero
+            numero += 1
+
+        recursos = '/Font << ' + ' '.join(f'/{nome} {obj} 0 R' for nome, obj in _OBJ_FONTES.items()) + ' >>'
+        if objetos_imagem:
+            recursos += ' /XObject << ' + ' '.join(f'/{nome} {obj} 0 R' for nome, obj in objetos_imagem.items()) + ' >>'
+        paginas = []
+        for conteudo in self._paginas():
+            comprimido = zlib.compress(conteudo, 6)
+            pedaco = objeto(
+                numero,
+                f'<< /Length {len(comprimido)} /Filter /FlateDecode >>\nstream\n'.encode('ascii')
+                + comprimido + b'\nendstream'
+            )
+            pedaco += objeto(numero + 1, (
+                f'<< /Type /Page /Parent {_OBJ_PAGINAS} 0 R '
+                f'/MediaBox [0 0 {self.largura_pagina} {self.altura_pagina}] '
+                f'/Resources << {recursos} >> /Contents {numero} 0 R >>'
+            ).encode('ascii'))
+            paginas.append(numero + 1)
+            numero += 2
+            yield pedaco
+
+        final = b''
+        for nome, numero_fonte in _OBJ_FONTES.items():
+            final += objeto(numero_fonte, (
+                f'<< /Type /Font /Subtype /Type1 /BaseFont /{_FONTES[nome]} /Encoding /WinAnsiEncoding >>'
+            ).encode('ascii'))
+        kids = ' '.join(f'{pagina} 0 R' for pagina in paginas)
+        final += objeto(_OBJ_PAGINAS, f'<< /Type /Pages /Kids [{kids}] /Count {len(paginas)} >>'.encode('ascii'))
+        final += objeto(_OBJ_CATALOGO, f'<< /Type /Catalog /Pages {_OBJ_PAGINAS} 0 R >>'.encode('ascii'))
+
+        total = numero
+        xref = [f'xref\n0 {total}\n', '0000000000 65535 f \n']
+        for indice in range(1, total):
+            xref.append(f'{deslocamentos[indice]:010d} 00000 n \n')
+        xref.append(f'trailer\n<< /Size {total} /Root {_OBJ_CATALOGO} 0 R >>\nstartxref\n{posicao}\n%%EOF\n')
+        yield final + ''.join(xref).encode('ascii')
+
+    def conteudo(self):
+        return b''.join(self.gerar())
@@ -71,7 +71,7 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'usuarios.authentication.CachedJWTAuthentication',
     )
 }
 
@@ -155,7 +155,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'clinica_core.pagination.ConfigurablePageNumberPagination',
     'DEFAULT_FILTER_BACKENDS': ['clinica_core.filters.AccentInsensitiveSearchFilter', 'rest_framework.filters.OrderingFilter'],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'usuarios.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -193,15 +193,62 @@ SIMPLE_JWT = {
 }
 
 # Configuracoes Evolution API (WhatsApp)
-EVOLUTION_API_URL = "https://theclinic-api.up.railway.app"
+# Sobrescreva por variavel de ambiente para usar a API simulada (servidor_evolution_fake).
+EVOLUTION_API_URL = os.environ.get('EVOLUTION_API_URL', "https://theclinic-api.up.railway.app")
 EVOLUTION_API_KEY = "Luan@4957"
 EVOLUTION_INSTANCE_NAME = "zap_turbo"
 EVOLUTION_OWNER_NUMBER = "5515981780655"
 
+# Auditoria: politica por model ('app.model' ou 'app') -> full | diff | create_delete | off.
+# Models nao listados usam AUDIT_DEFAULT_POLICY; os padroes ficam em auditoria.policies.
+AUDIT_DEFAULT_POLICY = 'full'
+AUDIT_POLICIES = {}
+# Amostragem opcional de UPDATEs (0.0 a 1.0) para models ruidosos.
+AUDIT_SAMPLE_RATES = {}
+# Models com politica 'diff' gravam o estado completo a cada N alteracoes (historico).
+AUDIT_SNAPSHOT_INTERVAL = 20
+# Escrita do AuditLog: 'buffered' (bulk_create por requisicao), 'direct' ou 'spool'
+# (lotes em arquivos JSONL carregados pelo comando carregar_spool_auditoria).
+AUDIT_WRITER_MODE = os.environ.get('AUDIT_WRITER_MODE', 'buffered')
+AUDIT_BUFFER_SIZE = 500
+AUDIT_SPOOL_DIR = os.environ.get('AUDIT_SPOOL_DIR', os.path.join(BASE_DIR, 'audit_spool'))
+# Arquivo morto (comando arquivar_auditoria): segmentos JSONL comprimidos por dia.
+AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR', os.path.join(BASE_DIR, 'audit_archive'))
+AUDIT_ARCHIVE_RETENTION_DAYS = 180
+WEBHOOK_ARCHIVE_RETENTION_DAYS = 30
+# WebhookEvent: payloads maiores que o limite (bytes) sao gravados comprimidos.
+WEBHOOK_COMPRESS_THRESHOLD = 8192
+# Retencao por tipo de evento (dias), removidos sem arquivar: ex. {'PRESENCE_UPDATE': 2}.
+WEBHOOK_RETENTION_DAYS = {'PRESENCE_UPDATE': 2, 'CHATS_UPDATE': 7}
+# Amostragem opcional (0.0 a 1.0) da gravacao de tipos ruidosos: ex. {'PRESENCE_UPDATE': 0.1}.
+WEBHOOK_SAMPLE_RATES = {}
+# Importacao de tabelas: o upload vira um ImportacaoJob processado pelo worker do Procfile
+# (processar_importacoes --loop), que precisa ler o mesmo MEDIA_ROOT do web (volume
+# persistente compartilhado). IMPORTACAO_EM_SEGUNDO_PLANO=false processa o job na propria
+# requisicao (desenvolvimento ou deploy sem worker).
+IMPORTACAO_EM_SEGUNDO_PLANO = os.environ.get('IMPORTACAO_EM_SEGUNDO_PLANO', 'true').lower() in ('1', 'true', 'yes')
+
+# PDFs de atendimento ja gerados (chave: atendimento + atualizado_em + documentos). Sao
+# documentos clinicos em disco sem criptografia: expiram em PDF_CACHE_MAX_IDADE segundos
+# (comando limpar_pdf_cache) e o diretorio e limitado a PDF_CACHE_MAX_BYTES.
+PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', os.path.join(BASE_DIR, 'pdf_cache'))
+PDF_CACHE_MAX_BYTES = 200 * 1024 * 1024
+PDF_CACHE_MAX_IDADE = 2 * 3600
+
+# Cache compartilhado pelos workers do gunicorn (mesma maquina): guarda as versoes dos
+# singletons de configuracao (configuracoes.singleton_cache). Com mais de uma maquina,
+# aponte para um backend em rede.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, 'django_cache')),
+    }
+}
 
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media' 
+# Uploads (inclusive os arquivos das importacoes pendentes): em producao, volume persistente.
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media')
 
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",          # Para seus testes locais (Vite/React)
@@ -7,6 +7,7 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 from usuarios.views import MeView
+from configuracoes.views import BootstrapView
 from clinica_core.webhooks import EvolutionWebhookView
 
 urlpatterns = [
@@ -15,6 +16,7 @@ urlpatterns = [
     path('api/token/', TokenObtainPairView.as_view()),
     path('api/token/refresh/', TokenRefreshView.as_view()),
     path('api/me/', MeView.as_view()),
+    path('api/bootstrap/', BootstrapView.as_view()),
     path('api/webhooks/whatsapp/<str:instance_name>/', EvolutionWebhookView.as_view()),
     path('api/webhooks/whatsapp/<str:instance_name>', EvolutionWebhookView.as_view()),
 
@@ -23,6 +25,7 @@ urlpatterns = [
     path('api/configuracoes/', include('configuracoes.urls')),
     path('api/cadastros/', include('configuracoes.cadastros_urls')),
     path('api/auditoria/', include('auditoria.urls')),
+    path('api/financeiro/', include('financeiro.urls')),
 
     #  routers "puros" primeiro
     path('api/', include('profissionais.urls')),
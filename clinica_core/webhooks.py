@@ -3,7 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from auditoria.models import WebhookEvent
+from auditoria.webhook_storage import store_webhook_event
 from whatsapp.services import process_webhook_event
 
 
@@ -21,7 +21,7 @@ class EvolutionWebhookView(APIView):
         event_type = ''
         if isinstance(payload, dict):
             event_type = payload.get('event') or payload.get('type') or ''
-        WebhookEvent.objects.create(
+        store_webhook_event(
             provider='evolution',
             instance_name=instance_name,
             event_type=event_type,
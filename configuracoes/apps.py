@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ConfiguracoesConfig(AppConfig):
     name = 'configuracoes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,133 @@
+"""
+Pacote de dados de referencia do /api/bootstrap/ (convenios, especialidades,
+profissionais, filtros da agenda e dados do operador logado).
+
+Cada secao e montada e serializada uma vez por versao (clinica_core.cache_versao)
+em cada worker e guardada ja em JSON, com o hash do conteudo. Os signals
+registrados em configuracoes.apps trocam a versao quando os modelos de origem
+mudam; importacoes em massa chamam invalidar() diretamente.
+"""
+import hashlib
+import json
+import threading
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from agendas.filtros import opcoes_filtros
+from clinica_core import cache_versao
+from profissionais.models import Especialidade, Profissional, ProfissionalEspecialidade
+from usuarios.views import MeView
+
+from .models import Convenio
+
+
+def _tabela(campos, linhas):
+    """Formato compacto para listas longas: nomes das colunas uma vez e linhas como arrays."""
+    return {'campos': list(campos), 'linhas': [list(linha) for linha in linhas]}
+
+
+def _convenios():
+    campos = ('id', 'nome', 'percentual_desconto', 'ativo')
+    return _tabela(campos, Convenio.objects.order_by('nome').values_list(*campos))
+
+
+def _especialidades():
+    campos = ('id', 'codigo', 'codigo_visual', 'nome')
+    return _tabela(campos, Especialidade.objects.filter(status=True).order_by('nome').values_list(*campos))
+
+
+def _profissionais():
+    especialidades = {}
+    for profissional_id, especialidade_id in ProfissionalEspecialidade.objects.values_list(
+        'profissional_id', 'especialidade_id'
+    ):
+        especialidades.setdefault(profissional_id, []).append(especialidade_id)
+    return _tabela(
+        ('id', 'nome', 'especialidades'),
+        (
+            (pk, nome, especialidades.get(pk, []))
+            for pk, nome in Profissional.objects.order_by('nome').values_list('id', 'nome')
+        )
+    )
+
+
+def _filtros_agenda():
+    return opcoes_filtros('ativos')
+
+
+# secao -> (montagem, modelos de origem). filtros_agenda tambem depende do dia (agendas vencidas).
+SECOES = {
+    'convenios': (_convenios, ('configuracoes.Convenio',)),
+    'especialidades': (_especialidades, ('profissionais.Especialidade',)),
+    'profissionais': (_profissionais, ('profissionais.Profissional', 'profissionais.ProfissionalEspecialidade')),
+    'filtros_agenda': (
+        _filtros_agenda,
+        ('agendas.AgendaConfig', 'profissionais.Profissional', 'profissionais.Especialidade'),
+    ),
+}
+SECAO_ME = 'me'
+
+_secoes = {}
+_lock = threading.Lock()
+
+
+def _nome_versao(secao):
+    return f"bootstrap:{secao}"
+
+
+def _serializar(dados):
+    conteudo = json.dumps(dados, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return conteudo, hashlib.sha1(conteudo).hexdigest()[:16]
+
+
+def secao(nome):
+    """(json, hash) da secao, montada no maximo uma vez por versao neste worker."""
+    versao = cache_versao.atual(_nome_versao(nome))
+    chave = (versao, timezone.localdate()) if nome == 'filtros_agenda' else versao
+    atual = _secoes.get(nome)
+    if versao is not None and atual and atual[0] == chave:
+        return atual[1]
+
+    montar, _ = SECOES[nome]
+    resultado = _serializar(montar())
+    if versao is not None:
+        with _lock:
+            _secoes[nome] = (chave, resultado)
+    return resultado
+
+
+def secao_me(user):
+    return _serializar(MeView.montar_dados(user))
+
+
+def secoes_do_modelo(label):
+    return [nome for nome, (_, modelos) in SECOES.items() if label in modelos]
+
+
+def invalidar(*secoes):
+    for nome in secoes or SECOES:
+        cache_versao.trocar(_nome_versao(nome), ao_trocar=lambda nome=nome: _secoes.pop(nome, None))
+
+
+def etag(versoes):
+    base = ','.join(f"{nome}:{versoes[nome]}" for nome in sorted(versoes))
+    return '"' + hashlib.sha1(base.encode('utf-8')).hexdigest()[:20] + '"'
+
+
+def montar_resposta(secoes, versoes_cliente):
+    """
+    Corpo JSON {versao, secoes: {nome: {versao, dados?}}}. Secoes cuja versao o
+    cliente ja tem (versoes_cliente) vao sem 'dados'.
+    """
+    versoes = {nome: versao for nome, (_, versao) in secoes.items()}
+    partes = []
+    for nome, (conteudo, versao) in secoes.items():
+        cabecalho = f'"{nome}":{{"versao":"{versao}"'.encode('utf-8')
+        if versoes_cliente.get(nome) == versao:
+            partes.append(cabecalho + b'}')
+        else:
+            partes.append(cabecalho + b',"dados":' + conteudo + b'}')
+    tag = etag(versoes)
+    corpo = f'{{"versao":{tag},"secoes":{{'.encode('utf-8') + b','.join(partes) + b'}}'
+    return corpo, tag
@@ -1,11 +1,18 @@
 import re
 import unicodedata
 
+import openpyxl
 import pandas as pd
 
+from clinica_core.formato_tabular import detectar_formato_csv, ler_amostra, ler_csv
+
 from .models import Medicamento
 
 
+# Linhas por lote na importacao de medicamentos.
+IMPORT_CHUNK_SIZE = 5000
+
+
 def _normalize_header(value):
     if not isinstance(value, str):
         return ""
@@ -24,82 +31,129 @@ def _find_header_row(df):
     return None
 
 
-def _read_csv(file_obj):
-    encodings = ["utf-8", "latin1"]
-    last_error = None
-    for encoding in encodings:
-        try:
-            file_obj.seek(0)
-            df_temp = pd.read_csv(file_obj, header=None, nrows=100, encoding=encoding, sep=None, engine="python")
-            header_row = _find_header_row(df_temp)
-            if header_row is None:
-                raise ValueError("Cabecalho nao encontrado no CSV.")
-            file_obj.seek(0)
-            df = pd.read_csv(
-                file_obj,
-                header=header_row,
-                encoding=encoding,
-                sep=None,
-                engine="python",
-                low_memory=False,
-            )
-            return df
-        except (UnicodeDecodeError, ValueError) as exc:
-            last_error = exc
-            continue
-    raise ValueError(f"Nao foi possivel ler o CSV: {last_error}")
+def _eh_cabecalho(celulas):
+    return any(_normalize_header(cell) == "SUBSTANCIA" for cell in celulas)
+
 
+def _iter_csv(file_obj, chunk_size):
+    # O cabecalho (SUBSTANCIA) fica apos algumas linhas de titulo: amostra maior que o padrao.
+    formato = detectar_formato_csv(ler_amostra(file_obj, 256 * 1024), cabecalho=_eh_cabecalho)
+    if formato is None:
+        raise ValueError("Cabecalho nao encontrado no CSV.")
+    for chunk in ler_csv(file_obj, formato, chunksize=chunk_size):
+        yield chunk
 
-def _read_excel(file_obj):
+
+def _nomes_colunas(header):
+    return [str(cell) if cell is not None else f"Unnamed: {idx}" for idx, cell in enumerate(header)]
+
+
+def _iter_xlsx(file_obj, chunk_size):
+    # openpyxl em modo read_only le as linhas sob demanda.
+    file_obj.seek(0)
+    workbook = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        colunas = None
+        for idx, row in enumerate(rows):
+            if _eh_cabecalho(row):
+                colunas = _nomes_colunas(row)
+                break
+            if idx >= 99:
+                break
+        if colunas is None:
+            raise ValueError("Cabecalho nao encontrado no XLSX.")
+
+        total = len(colunas)
+        lote = []
+        for row in rows:
+            row = tuple(row[:total]) + (None,) * (total - len(row))
+            if all(cell is None for cell in row):
+                continue
+            lote.append(row)
+            if len(lote) >= chunk_size:
+                yield pd.DataFrame(lote, columns=colunas)
+                lote = []
+        if lote:
+            yield pd.DataFrame(lote, columns=colunas)
+    finally:
+        workbook.close()
+
+
+def _iter_xls(file_obj, chunk_size):
+    # O formato .xls antigo nao tem leitura incremental; apenas o processamento e fatiado.
     file_obj.seek(0)
     df_temp = pd.read_excel(file_obj, header=None, nrows=100)
     header_row = _find_header_row(df_temp)
     if header_row is None:
         raise ValueError("Cabecalho nao encontrado no XLSX.")
     file_obj.seek(0)
-    return pd.read_excel(file_obj, header=header_row)
+    df = pd.read_excel(file_obj, header=header_row)
+    for inicio in range(0, len(df), chunk_size):
+        yield df.iloc[inicio:inicio + chunk_size].copy()
+
+
+# Embalagem (CT, CX, FR...) marca o fim da forma farmaceutica: o resto e descartado.
+_CORTE_APRESENTACAO = re.compile(r"\b(?:CT|CX|FR|EST|BL|ENV|AMP|FA|BS)\b.*", re.DOTALL)
+
+_ABREVIACOES = {
+    "COM REV": "Comprimido Revestido",
+    "COM": "Comprimido",
+    "CAP GEL DURA": "Capsula",
+    "CAP": "Capsula",
+    "DRG": "Dragea",
+    "XPE": "Xarope",
+    "SOL": "Solucao",
+    "SUS": "Suspensao",
+    "INJ": "Injetavel",
+    "CREM": "Creme",
+    "POM": "Pomada",
+    "GEL": "Gel",
+    "TOP": "Topico",
+    "OFT": "Oftalmico",
+    "NAS": "Nasal",
+    "OR": "Oral",
+    "RET": "Retal",
+    "VAG": "Vaginal",
+}
+
+# Uma unica alternancia, com as siglas mais longas primeiro ("COM REV" antes de "COM").
+_ABREVIACOES_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(sigla) for sigla in sorted(_ABREVIACOES, key=len, reverse=True)) + r")\b"
+)
+
+
+def _expandir_sigla(match):
+    return _ABREVIACOES[match.group(0)]
 
 
 def limpar_apresentacao(texto):
     if not isinstance(texto, str):
         return ""
 
-    padrao_corte = r"\b(CT|CX|FR|EST|BL|ENV|AMP|FA|BS)\b"
-    partes = re.split(padrao_corte, texto, maxsplit=1)
-    texto_limpo = partes[0].strip()
-
-    substituicoes = {
-        "COM REV": "Comprimido Revestido",
-        "COM": "Comprimido",
-        "CAP GEL DURA": "Capsula",
-        "CAP": "Capsula",
-        "DRG": "Dragea",
-        "XPE": "Xarope",
-        "SOL": "Solucao",
-        "SUS": "Suspensao",
-        "INJ": "Injetavel",
-        "CREM": "Creme",
-        "POM": "Pomada",
-        "GEL": "Gel",
-        "TOP": "Topico",
-        "OFT": "Oftalmico",
-        "NAS": "Nasal",
-        "OR": "Oral",
-        "RET": "Retal",
-        "VAG": "Vaginal",
-    }
+    texto_limpo = _CORTE_APRESENTACAO.sub("", texto, count=1).strip()
+    texto_limpo = _ABREVIACOES_RE.sub(_expandir_sigla, texto_limpo)
+    return texto_limpo.title()
 
-    for sigla, completo in substituicoes.items():
-        texto_limpo = re.sub(r"\b" + sigla + r"\b", completo, texto_limpo)
 
-    return texto_limpo.title()
+def limpar_apresentacao_series(series):
+    """Versao coluna a coluna de limpar_apresentacao, via metodos .str do pandas."""
+    texto = series.where(series.map(lambda valor: isinstance(valor, str)), "").astype(str)
+    return (
+        texto.str.replace(_CORTE_APRESENTACAO, "", n=1, regex=True)
+        .str.strip()
+        .str.replace(_ABREVIACOES_RE, _expandir_sigla, regex=True)
+        .str.title()
+    )
 
 
-def _carregar_dataframe(arquivo, extensao):
+def _iter_dataframes(arquivo, extensao, chunk_size):
     if extensao == ".csv":
-        return _read_csv(arquivo)
-    if extensao in [".xlsx", ".xls"]:
-        return _read_excel(arquivo)
+        return _iter_csv(arquivo, chunk_size)
+    if extensao == ".xlsx":
+        return _iter_xlsx(arquivo, chunk_size)
+    if extensao == ".xls":
+        return _iter_xls(arquivo, chunk_size)
     raise ValueError("Formato de arquivo nao suportado.")
 
 
@@ -122,11 +176,8 @@ def _mapear_colunas(df):
     return df
 
 
-def importar_medicamentos(arquivo):
-    nome = getattr(arquivo, "name", "") or ""
-    extensao = f".{nome.split('.')[-1].lower()}" if "." in nome else ""
-
-    df = _carregar_dataframe(arquivo, extensao)
+def _preparar_lote(df):
+    """Lote limpo e deduplicado, e quantas linhas repetidas dentro do lote foram descartadas."""
     df = _mapear_colunas(df)
 
     campos_necessarios = ["nome_comercial", "principio_ativo"]
@@ -140,7 +191,7 @@ def importar_medicamentos(arquivo):
 
     df = df.dropna(subset=["nome_comercial", "principio_ativo"])
 
-    df["apresentacao_limpa"] = df["apresentacao_original"].apply(limpar_apresentacao)
+    df["apresentacao_limpa"] = limpar_apresentacao_series(df["apresentacao_original"])
     df["search_text"] = (
         df["nome_comercial"].astype(str).str.title().str.strip()
         + " "
@@ -149,9 +200,17 @@ def importar_medicamentos(arquivo):
         + df["principio_ativo"].astype(str).str.title().str.strip()
         + ")"
     )
+    unicos = df.drop_duplicates(subset=["search_text", "laboratorio"])
+    return unicos, len(df) - len(unicos)
+
 
-    df_final = df.drop_duplicates(subset=["search_text", "laboratorio"])
-    registros = df_final.to_dict("records")
+def _importar_lote(df):
+    """
+    Importa um lote ja preparado. Os lotes anteriores ja estao gravados, entao a
+    consulta de existentes tambem descarta as repeticoes entre lotes; so o lote
+    atual fica em memoria.
+    """
+    registros = df.to_dict("records")
 
     search_texts = [str(item.get("search_text") or "").strip() for item in registros if item.get("search_text")]
     existentes = set(
@@ -174,6 +233,7 @@ def importar_medicamentos(arquivo):
         if (nome_busca, laboratorio) in existentes:
             ignorados += 1
             continue
+        existentes.add((nome_busca, laboratorio))
 
         objs.append(
             Medicamento(
@@ -187,15 +247,34 @@ def importar_medicamentos(arquivo):
             )
         )
 
-    criados = 0
     if objs:
-        for i in range(0, len(objs), 5000):
-            lote = objs[i : i + 5000]
-            Medicamento.objects.bulk_create(lote)
-            criados += len(lote)
+        Medicamento.objects.bulk_create(objs)
+    return len(registros), len(objs), ignorados
+
+
+def importar_medicamentos(arquivo, chunk_size=IMPORT_CHUNK_SIZE, progresso=None):
+    """
+    Importa a planilha da ANVISA em lotes de chunk_size linhas: cada lote e
+    lido, limpo, deduplicado, consultado no banco e gravado antes do proximo,
+    de modo que a memoria nao cresce com o tamanho do arquivo.
+    progresso(lidas, gravadas), opcional, e chamado ao fim de cada lote.
+    """
+    nome = getattr(arquivo, "name", "") or ""
+    extensao = f".{nome.split('.')[-1].lower()}" if "." in nome else ""
+
+    lidas = total_processados = criados = ignorados = 0
+    for df in _iter_dataframes(arquivo, extensao, chunk_size):
+        lidas += len(df)
+        lote, repetidos = _preparar_lote(df)
+        processados, criados_lote, ignorados_lote = _importar_lote(lote)
+        total_processados += processados + repetidos
+        criados += criados_lote
+        ignorados += ignorados_lote + repetidos
+        if progresso:
+            progresso(lidas, criados)
 
     return {
-        "total_processados": len(registros),
+        "total_processados": total_processados,
         "criados": criados,
         "ignorados": ignorados,
     }
@@ -0,0 +1,195 @@
+import io
+import random
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from configuracoes.importacao import IMPORT_CHUNK_SIZE, _iter_csv
+from configuracoes.services.cids_import_service import CHUNK_LINHAS
+from configuracoes.services.exames_import_service import _read_tuss_file
+from clinica_core.formato_tabular import detectar_formato_csv, ler_amostra, ler_csv
+from profissionais.utils.cbo_processing import _ler_csv_flexivel
+
+
+# Leitores anteriores, mantidos para comparacao. O de medicamentos e o de leitura em blocos;
+# o original (sep=None, engine python) nao conseguia ler a planilha da CMED.
+
+def _cbo_referencia(arquivo):
+    dados = arquivo.read()
+    for enc in ['utf-8-sig', 'utf-8', 'cp1252', 'latin1']:
+        for sep in [';', ',', '\t']:
+            try:
+                df = pd.read_csv(io.BytesIO(dados), sep=sep, encoding=enc, nrows=5, dtype=str,
+                                 keep_default_na=False, encoding_errors='strict')
+                if len(df.columns) >= 2:
+                    return pd.read_csv(io.BytesIO(dados), sep=sep, encoding=enc, dtype=str,
+                                       keep_default_na=False, encoding_errors='strict')
+            except Exception:
+                continue
+        try:
+            df = pd.read_csv(io.BytesIO(dados), sep=None, engine='python', encoding=enc, nrows=5,
+                             dtype=str, keep_default_na=False, encoding_errors='strict')
+            if len(df.columns) >= 2:
+                return pd.read_csv(io.BytesIO(dados), sep=None, engine='python', encoding=enc,
+                                   dtype=str, keep_default_na=False, encoding_errors='strict')
+        except Exception:
+            continue
+    return None
+
+
+def _cids_referencia(arquivo):
+    for enc in ['latin1', 'utf-8', 'cp1252']:
+        for sep in [';', ',']:
+            try:
+                arquivo.seek(0)
+                df = pd.read_csv(arquivo, sep=sep, encoding=enc, nrows=5, dtype=str)
+                if len(df.columns) >= 2:
+                    arquivo.seek(0)
+                    return pd.read_csv(arquivo, sep=sep, encoding=enc, dtype=str)
+            except Exception:
+                continue
+    return None
+
+
+def _exames_referencia(arquivo):
+    arquivo.seek(0)
+    try:
+        return pd.read_csv(arquivo, encoding='latin1', sep=';', dtype=str)
+    except Exception:
+        arquivo.seek(0)
+        return pd.read_excel(arquivo, dtype=str)
+
+
+def _medicamentos_referencia(arquivo):
+    # Valida o arquivo inteiro como UTF-8 antes de procurar o cabecalho e ler os blocos.
+    arquivo.seek(0)
+    try:
+        arquivo.read().decode('utf-8')
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        encoding = 'latin1'
+    arquivo.seek(0)
+    amostra = arquivo.read(256 * 1024).decode(encoding, errors='ignore')
+    arquivo.seek(0)
+    for idx, linha in enumerate(amostra.splitlines()[:100]):
+        for sep in [';', ',', '\t', '|']:
+            if 'SUBSTANCIA' in linha.split(sep):
+                reader = pd.read_csv(arquivo, skiprows=idx, sep=sep, encoding=encoding, dtype=str,
+                                     chunksize=IMPORT_CHUNK_SIZE)
+                return pd.concat(list(reader), ignore_index=True)
+    raise ValueError('Cabecalho nao encontrado no CSV.')
+
+
+def _cids_novo(arquivo):
+    formato = detectar_formato_csv(ler_amostra(arquivo))
+    return pd.concat(list(ler_csv(arquivo, formato, chunksize=CHUNK_LINHAS)), ignore_index=True)
+
+
+def _medicamentos_novo(arquivo):
+    return pd.concat(list(_iter_csv(arquivo, IMPORT_CHUNK_SIZE)), ignore_index=True)
+
+
+# Tamanhos proximos das tabelas oficiais (CBO 2002, CID-10 subcategorias, TUSS, lista CMED).
+TAMANHOS = {'cbo': 2700, 'cids': 12500, 'exames': 6000, 'medicamentos': 25000}
+
+
+def _gerar(tipo, linhas, rng, sep=';', encoding='latin1'):
+    palavras = ['Medico', 'Cirurgiao', 'Tecnico', 'Acao', 'Colera', 'Paralisia', 'Sindrome',
+                'Consulta', 'Dosagem', 'Exame', 'Hemograma', 'Ressonancia', 'Tomografia']
+
+    def texto(n):
+        return ' '.join(rng.choice(palavras) for _ in range(n)) + ' ção'
+
+    if tipo == 'cbo':
+        corpo = ['CODIGO;TITULO'] + [f'{2000 + i // 10}-{i % 100:02d};{texto(4)}' for i in range(linhas)]
+    elif tipo == 'cids':
+        corpo = ['SUBCAT;CLASSIF;RESTRSEXO;CAUSAOBITO;DESCRICAO;DESCRABREV;REFCAT;EXCLUIDOS'] + [
+            f'A{i:04d};;;;{texto(8)};{texto(3)};;' for i in range(linhas)
+        ]
+    elif tipo == 'exames':
+        corpo = ['Codigo do Termo;Termo;Data de inicio de vigencia;Data de fim de vigencia'] + [
+            f'{40000000 + i};{texto(6)};01/01/2020;' for i in range(linhas)
+        ]
+    else:
+        colunas = ['SUBSTANCIA', 'CNPJ', 'LABORATORIO', 'CODIGO GGREM', 'REGISTRO', 'EAN 1', 'PRODUTO',
+                   'APRESENTACAO', 'CLASSE TERAPEUTICA', 'TIPO DE PRODUTO', 'REGIME DE PRECO'] + [
+            f'PF {aliquota}%' for aliquota in range(0, 30, 2)
+        ] + ['TARJA']
+        titulo = ['LISTA DE PRECOS DE MEDICAMENTOS', 'Atualizada em 01/01/2025', ''] * 10
+        corpo = titulo + [';'.join(colunas)] + [
+            ';'.join([texto(2), '00.000.000/0001-00', texto(1), str(i), str(10000 + i), str(789000 + i),
+                      texto(2), f'{i % 900} MG COM REV CT BL AL X {i % 60}', texto(3), 'Generico',
+                      'Regulado'] + [f'{rng.random() * 100:.2f}' for _ in range(15)] + ['Tarja Vermelha'])
+            for i in range(linhas)
+        ]
+    return ('\n'.join(corpo) + '\n').replace(';', sep).encode(encoding)
+
+
+LEITORES = {
+    'cbo': (_cbo_referencia, _ler_csv_flexivel),
+    'cids': (_cids_referencia, _cids_novo),
+    'exames': (_exames_referencia, _read_tuss_file),
+    'medicamentos': (_medicamentos_referencia, _medicamentos_novo),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a leitura dos arquivos de importacao (CBO, CID, TUSS, medicamentos) pelos '
+        'leitores anteriores (tentativa e erro) e pela deteccao de formato compartilhada.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tipo', choices=sorted(LEITORES), help='Apenas um tipo (padrao: todos)')
+        parser.add_argument('--arquivo', help='Arquivo real do tipo informado em vez do sintetico')
+        parser.add_argument('--escala', type=float, default=1.0, help='Multiplica o tamanho sintetico')
+        parser.add_argument('--repeticoes', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--sep', default=';', help='Separador do arquivo sintetico')
+        parser.add_argument('--encoding', default='latin1', help='Encoding do arquivo sintetico')
+
+    def handle(self, *args, **options):
+        if options['arquivo'] and not options['tipo']:
+            raise CommandError('--arquivo exige --tipo.')
+
+        tipos = [options['tipo']] if options['tipo'] else sorted(LEITORES)
+        rng = random.Random(options['seed'])
+        for tipo in tipos:
+            if options['arquivo']:
+                with open(options['arquivo'], 'rb') as fp:
+                    dados = fp.read()
+            else:
+                dados = _gerar(
+                    tipo, max(int(TAMANHOS[tipo] * options['escala']), 1), rng,
+                    sep=options['sep'].replace('\\t', '\t'), encoding=options['encoding']
+                )
+
+            referencia, novo = LEITORES[tipo]
+            tempo_ref, saida_ref = self._medir(referencia, dados, options['repeticoes'])
+            tempo_novo, saida_nova = self._medir(novo, dados, options['repeticoes'])
+            ganho = tempo_ref / tempo_novo if tempo_novo else 0
+            self.stdout.write(
+                f'{tipo:<13} {len(dados) / 1024:8.0f} KB  anterior {tempo_ref * 1000:8.1f}ms '
+                f'({self._linhas(saida_ref)} linhas)  atual {tempo_novo * 1000:8.1f}ms '
+                f'({self._linhas(saida_nova)} linhas)  {ganho:.1f}x'
+            )
+
+    def _linhas(self, saida):
+        if saida is None:
+            return 0
+        return len(saida)
+
+    def _medir(self, leitor, dados, repeticoes):
+        melhor, saida = None, None
+        for _ in range(max(repeticoes, 1)):
+            arquivo = io.BytesIO(dados)
+            inicio = time.perf_counter()
+            try:
+                saida = leitor(arquivo)
+            except Exception as exc:
+                self.stderr.write(f'{leitor.__name__}: {exc}')
+                saida = None
+            decorrido = time.perf_counter() - inicio
+            melhor = decorrido if melhor is None else min(melhor, decorrido)
+        return melhor, saida
@@ -0,0 +1,141 @@
+import random
+import re
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from configuracoes.importacao import (
+    _iter_dataframes,
+    _mapear_colunas,
+    limpar_apresentacao,
+    limpar_apresentacao_series,
+)
+
+
+def limpar_apresentacao_referencia(texto):
+    """Implementacao original (re.split + um re.sub por sigla), mantida para comparacao."""
+    if not isinstance(texto, str):
+        return ""
+
+    padrao_corte = r"\b(CT|CX|FR|EST|BL|ENV|AMP|FA|BS)\b"
+    partes = re.split(padrao_corte, texto, maxsplit=1)
+    texto_limpo = partes[0].strip()
+
+    substituicoes = {
+        "COM REV": "Comprimido Revestido",
+        "COM": "Comprimido",
+        "CAP GEL DURA": "Capsula",
+        "CAP": "Capsula",
+        "DRG": "Dragea",
+        "XPE": "Xarope",
+        "SOL": "Solucao",
+        "SUS": "Suspensao",
+        "INJ": "Injetavel",
+        "CREM": "Creme",
+        "POM": "Pomada",
+        "GEL": "Gel",
+        "TOP": "Topico",
+        "OFT": "Oftalmico",
+        "NAS": "Nasal",
+        "OR": "Oral",
+        "RET": "Retal",
+        "VAG": "Vaginal",
+    }
+
+    for sigla, completo in substituicoes.items():
+        texto_limpo = re.sub(r"\b" + sigla + r"\b", completo, texto_limpo)
+
+    return texto_limpo.title()
+
+
+_TOKENS = [
+    "COM", "REV", "COM REV", "CAP", "GEL", "DURA", "CAP GEL DURA", "DRG", "XPE", "SOL", "SUS", "INJ",
+    "CREM", "POM", "TOP", "OFT", "NAS", "OR", "RET", "VAG", "CT", "CX", "FR", "EST", "BL", "ENV", "AMP",
+    "FA", "BS", "AL", "PLAS", "TRANS", "X", "10", "500 MG", "2,5 MG/ML", "50 ML", "COMREV", "CAPS",
+    "SOLUCAO", "ORAL", "com", "Sol", "(+)", "-", "/", "GOTAS", "ÁGUA", "AÇÚCAR",
+]
+
+
+def _amostra_sintetica(linhas, seed):
+    rng = random.Random(seed)
+    valores = []
+    for _ in range(linhas):
+        sorteio = rng.random()
+        if sorteio < 0.02:
+            valores.append(None)
+        elif sorteio < 0.03:
+            valores.append(rng.randint(1, 1000))
+        elif sorteio < 0.04:
+            valores.append("")
+        else:
+            separador = rng.choice([" ", " ", " ", "  ", "\n"])
+            valores.append(separador.join(rng.choice(_TOKENS) for _ in range(rng.randint(1, 12))))
+    return pd.Series(valores, dtype=object)
+
+
+class Command(BaseCommand):
+    help = (
+        'Confere que limpar_apresentacao (regex unica) e limpar_apresentacao_series (pandas) '
+        'produzem exatamente a saida da implementacao original, e mede o tempo de cada uma.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--arquivo', help='Planilha ANVISA (CSV/XLSX) usada como amostra em vez da sintetica')
+        parser.add_argument('--linhas', type=int, default=50000, help='Tamanho da amostra sintetica')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeticoes', type=int, default=3)
+
+    def handle(self, *args, **options):
+        amostra = self._carregar_amostra(options)
+        self.stdout.write(f'Amostra: {len(amostra)} apresentacoes')
+
+        esperado = [limpar_apresentacao_referencia(valor) for valor in amostra]
+        escalar = [limpar_apresentacao(valor) for valor in amostra]
+        vetorizado = limpar_apresentacao_series(amostra).tolist()
+
+        divergencias = 0
+        for nome, resultado in [('escalar', escalar), ('series', vetorizado)]:
+            diferentes = [idx for idx, (a, b) in enumerate(zip(esperado, resultado)) if a != b]
+            divergencias += len(diferentes)
+            for idx in diferentes[:5]:
+                self.stderr.write(f'[{nome}] {amostra.iloc[idx]!r}: {esperado[idx]!r} != {resultado[idx]!r}')
+            self.stdout.write(f'{nome}: {len(diferentes)} divergencias')
+
+        repeticoes = max(options['repeticoes'], 1)
+        tempos = {
+            'original (apply)': self._medir(lambda: amostra.apply(limpar_apresentacao_referencia), repeticoes),
+            'regex unica (apply)': self._medir(lambda: amostra.apply(limpar_apresentacao), repeticoes),
+            'series (.str)': self._medir(lambda: limpar_apresentacao_series(amostra), repeticoes),
+        }
+        base = tempos['original (apply)']
+        for nome, segundos in tempos.items():
+            self.stdout.write(f'{nome:<22} {segundos * 1000:9.1f}ms  ({base / segundos if segundos else 0:.1f}x)')
+
+        if divergencias:
+            raise CommandError(f'{divergencias} divergencias em relacao a implementacao original.')
+        self.stdout.write(self.style.SUCCESS('Saida identica a implementacao original.'))
+
+    def _carregar_amostra(self, options):
+        if not options['arquivo']:
+            return _amostra_sintetica(max(options['linhas'], 1), options['seed'])
+        caminho = options['arquivo']
+        extensao = f".{caminho.rsplit('.', 1)[-1].lower()}" if '.' in caminho else ''
+        partes = []
+        with open(caminho, 'rb') as fp:
+            for df in _iter_dataframes(fp, extensao, 5000):
+                df = _mapear_colunas(df)
+                if 'apresentacao_original' not in df.columns:
+                    raise CommandError('Coluna APRESENTACAO nao encontrada na planilha.')
+                partes.append(df['apresentacao_original'].astype(object))
+        if not partes:
+            raise CommandError('Planilha vazia.')
+        return pd.concat(partes, ignore_index=True)
+
+    def _medir(self, funcao, repeticoes):
+        melhores = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            melhores.append(time.perf_counter() - inicio)
+        return min(melhores)
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from configuracoes.services.importacao_jobs import liberar_jobs_travados, processar_job, proximo_job
+
+
+class Command(BaseCommand):
+    help = 'Processa os jobs de importacao de tabelas (medicamentos, TUSS, CID, CBO) enviados pela tela.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Continua aguardando novos jobs')
+        parser.add_argument('--intervalo', type=float, default=5.0, help='Segundos entre consultas no modo --loop')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Encerra apos N jobs (0 = sem limite)')
+        parser.add_argument(
+            '--timeout-min', type=int, default=60,
+            help='Jobs em processamento ha mais tempo que isso voltam para a fila'
+        )
+
+    def handle(self, *args, **options):
+        processados = 0
+        while True:
+            liberados = liberar_jobs_travados(options['timeout_min'])
+            if liberados:
+                self.stdout.write(f'{liberados} jobs travados devolvidos para a fila.')
+
+            job = proximo_job()
+            if job is None:
+                if not options['loop']:
+                    break
+                time.sleep(max(options['intervalo'], 0.5))
+                continue
+
+            if processar_job(job):
+                job.refresh_from_db()
+                processados += 1
+                self.stdout.write(f'Importacao #{job.pk} ({job.tipo}): {job.status}')
+            if options['max_jobs'] and processados >= options['max_jobs']:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'{processados} importacoes processadas.'))
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuracoes', '0007_alter_configuracaosistema_id_alter_convenio_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cid',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='exame',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+    ]
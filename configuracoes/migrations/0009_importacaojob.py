@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-19 15:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuracoes', '0008_exame_cid_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportacaoJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('medicamentos', 'Medicamentos'), ('exames', 'Exames (TUSS)'), ('cids', 'CIDs'), ('especialidades_cbo', 'Especialidades (CBO)')], max_length=30)),
+                ('modo', models.CharField(blank=True, default='', max_length=20)),
+                ('arquivo', models.FileField(blank=True, upload_to='importacoes/%Y/%m/')),
+                ('nome_arquivo', models.CharField(blank=True, default='', max_length=255)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('concluido', 'Concluido'), ('erro', 'Erro')], db_index=True, default='pendente', max_length=20)),
+                ('linhas_lidas', models.PositiveIntegerField(default=0)),
+                ('linhas_gravadas', models.PositiveIntegerField(default=0)),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('erro', models.TextField(blank=True, default='')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('finalizado_em', models.DateTimeField(blank=True, null=True)),
+                ('criado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-criado_em'],
+            },
+        ),
+    ]
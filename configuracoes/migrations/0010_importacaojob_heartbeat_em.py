@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuracoes', '0009_importacaojob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importacaojob',
+            name='heartbeat_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
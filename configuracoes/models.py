@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.db import models
 
+from . import singleton_cache
+
 class Convenio(models.Model):
     nome = models.CharField(max_length=100, unique=True)
     percentual_desconto = models.DecimalField(max_digits=5, decimal_places=2, default=0.00)
@@ -33,12 +36,23 @@ class DadosClinica(models.Model):
     def save(self, *args, **kwargs):
         self.pk = 1 # Trava o ID em 1
         super().save(*args, **kwargs)
+        singleton_cache.invalidar(type(self))
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        singleton_cache.invalidar(type(self))
+        return resultado
 
     @classmethod
     def load(cls):
         obj, created = cls.objects.get_or_create(pk=1, defaults={'nome_fantasia': 'Minha Clínica'})
         return obj
 
+    @classmethod
+    def cached(cls):
+        """Instancia somente leitura, lida do banco uma vez por alteracao (ver singleton_cache)."""
+        return singleton_cache.obter(cls)
+
 class ConfiguracaoSistema(models.Model):
     # 1. Interface
     itens_por_pagina = models.IntegerField(default=10, help_text="Paginação padrão das tabelas")
@@ -72,12 +86,23 @@ class ConfiguracaoSistema(models.Model):
     def save(self, *args, **kwargs):
         self.pk = 1 
         super().save(*args, **kwargs)
+        singleton_cache.invalidar(type(self))
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        singleton_cache.invalidar(type(self))
+        return resultado
 
     @classmethod
     def load(cls):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
 
+    @classmethod
+    def cached(cls):
+        """Instancia somente leitura, lida do banco uma vez por alteracao (ver singleton_cache)."""
+        return singleton_cache.obter(cls)
+
 
 class Medicamento(models.Model):
     nome = models.CharField(max_length=255)
@@ -108,6 +133,8 @@ class Exame(models.Model):
     tipo = models.CharField(max_length=50, choices=TIPO_CHOICES, default='Exame')
     search_text = models.CharField(max_length=600, db_index=True)
     situacao = models.BooleanField(default=True)
+    # Hash do conteudo importado (nome, tipo, search_text) para o modo upsert.
+    content_hash = models.CharField(max_length=40, blank=True, default='')
 
     def __str__(self):
         return f"{self.nome} ({self.codigo_tuss})"
@@ -121,9 +148,49 @@ class Cid(models.Model):
     nome = models.CharField(max_length=500)
     search_text = models.CharField(max_length=600, db_index=True)
     situacao = models.BooleanField(default=True)
+    # Hash do conteudo importado (nome, search_text) para o modo upsert.
+    content_hash = models.CharField(max_length=40, blank=True, default='')
 
     def __str__(self):
         return f"{self.codigo} - {self.nome}"
 
     class Meta:
         ordering = ['codigo']
+
+
+class ImportacaoJob(models.Model):
+    """Importacao de tabela enviada pela tela e processada pelo comando processar_importacoes."""
+    TIPO_CHOICES = [
+        ('medicamentos', 'Medicamentos'),
+        ('exames', 'Exames (TUSS)'),
+        ('cids', 'CIDs'),
+        ('especialidades_cbo', 'Especialidades (CBO)'),
+    ]
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('processando', 'Processando'),
+        ('concluido', 'Concluido'),
+        ('erro', 'Erro'),
+    ]
+
+    tipo = models.CharField(max_length=30, choices=TIPO_CHOICES)
+    modo = models.CharField(max_length=20, blank=True, default='')
+    arquivo = models.FileField(upload_to='importacoes/%Y/%m/', blank=True)
+    nome_arquivo = models.CharField(max_length=255, blank=True, default='')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente', db_index=True)
+    linhas_lidas = models.PositiveIntegerField(default=0)
+    linhas_gravadas = models.PositiveIntegerField(default=0)
+    resultado = models.JSONField(null=True, blank=True)
+    erro = models.TextField(blank=True, default='')
+    criado_por = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    # Sinal de vida do worker que processa o job; parado ha muito tempo = job travado.
+    heartbeat_em = models.DateTimeField(null=True, blank=True)
+    finalizado_em = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ['-criado_em']
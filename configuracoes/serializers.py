@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Convenio, DadosClinica, ConfiguracaoSistema, Medicamento, Exame, Cid
+from .models import Convenio, DadosClinica, ConfiguracaoSistema, Medicamento, Exame, Cid, ImportacaoJob
 
 class ConvenioSerializer(serializers.ModelSerializer):
     class Meta:
@@ -115,3 +115,9 @@ class CidSerializer(serializers.ModelSerializer):
                 codigo_puro
             )
         return super().update(instance, validated_data)
+
+
+class ImportacaoJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportacaoJob
+        exclude = ['arquivo']
@@ -1,11 +1,16 @@
 import os
-import tempfile
 import zipfile
 
-import pandas as pd
 from django.db import transaction
 
+from clinica_core.formato_tabular import AMOSTRA_BYTES, detectar_formato_csv, ler_amostra, ler_csv
 from configuracoes.models import Cid
+from configuracoes.services.upsert_service import hash_conteudo, upsert_por_codigo
+
+
+MODO_UPSERT = 'upsert'
+CAMPOS_CONTEUDO = ['nome', 'search_text']
+CHUNK_LINHAS = 5000
 
 
 def formatar_codigo_cid(codigo):
@@ -15,43 +20,23 @@ def formatar_codigo_cid(codigo):
     return codigo
 
 
-def _ler_csv_flexivel(caminho_arquivo):
-    encodings = ['latin1', 'utf-8', 'cp1252']
-    separadores = [';', ',']
-
-    for enc in encodings:
-        for sep in separadores:
-            try:
-                df_test = pd.read_csv(
-                    caminho_arquivo,
-                    sep=sep,
-                    encoding=enc,
-                    nrows=5,
-                    dtype=str
-                )
-                if len(df_test.columns) >= 2:
-                    return pd.read_csv(
-                        caminho_arquivo,
-                        sep=sep,
-                        encoding=enc,
-                        dtype=str
-                    )
-            except Exception:
-                continue
-    return None
-
-
-def _processar_dataframe(df):
-    if df is None or df.empty:
-        return []
+def _iter_registros_csv(fluxo, formato):
+    """Le o CSV em blocos de CHUNK_LINHAS linhas a partir de um fluxo binario."""
+    col_nome = None
+    for df in ler_csv(fluxo, formato, chunksize=CHUNK_LINHAS):
+        if len(df.columns) < 2:
+            return
+        if col_nome is None:
+            # A coluna de descricao e a de textos mais longos, avaliada no primeiro bloco.
+            col_nome = max(df.columns, key=lambda x: df[x].astype(str).str.len().mean())
+        yield from _processar_dataframe(df, df.columns[0], col_nome)
 
-    col_codigo = df.columns[0]
-    col_nome = max(df.columns, key=lambda x: df[x].astype(str).str.len().mean())
 
+def _processar_dataframe(df, col_codigo, col_nome):
     registros = []
-    for _, row in df.iterrows():
-        codigo_bruto = str(row[col_codigo]).strip()
-        nome = str(row[col_nome]).strip()
+    for codigo_bruto, nome in zip(df[col_codigo], df[col_nome]):
+        codigo_bruto = str(codigo_bruto).strip()
+        nome = str(nome).strip()
         if not codigo_bruto or codigo_bruto.lower() == 'nan':
             continue
 
@@ -66,61 +51,65 @@ def _processar_dataframe(df):
     return registros
 
 
-def _processar_arquivo_unico(caminho_arquivo):
-    df = _ler_csv_flexivel(caminho_arquivo)
-    if df is None:
+def _processar_arquivo_unico(arquivo):
+    formato = detectar_formato_csv(ler_amostra(arquivo))
+    if formato is None:
         return []
-    return _processar_dataframe(df)
-
-
-def _processar_zip(caminho_zip):
-    registros = []
-    with tempfile.TemporaryDirectory() as tmpdirname:
-        with zipfile.ZipFile(caminho_zip, 'r') as z:
-            z.extractall(tmpdirname)
-
-        arquivos = []
-        for raiz, _, nomes in os.walk(tmpdirname):
-            for nome in nomes:
-                if nome.lower().endswith(('.csv', '.txt')):
-                    arquivos.append(os.path.join(raiz, nome))
-
-        if not arquivos:
+    return list(_iter_registros_csv(arquivo, formato))
+
+
+def _processar_zip(arquivo):
+    """
+    Le o maior .csv/.txt do zip direto do arquivo compactado, sem extrair em disco:
+    uma amostra define encoding/separador e o membro e reaberto para a leitura em blocos.
+    """
+    arquivo.seek(0)
+    with zipfile.ZipFile(arquivo, 'r') as z:
+        membros = [
+            info for info in z.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(('.csv', '.txt'))
+        ]
+        if not membros:
             return []
 
-        arquivo_vencedor = max(arquivos, key=os.path.getsize)
-        registros = _processar_arquivo_unico(arquivo_vencedor)
-
-    return registros
+        membro = max(membros, key=lambda info: info.file_size)
+        with z.open(membro) as fluxo:
+            formato = detectar_formato_csv(fluxo.read(AMOSTRA_BYTES))
+        if formato is None:
+            return []
+        with z.open(membro) as fluxo:
+            return list(_iter_registros_csv(fluxo, formato))
 
 
 def _carregar_registros(arquivo):
     nome = getattr(arquivo, 'name', '') or ''
     extensao = os.path.splitext(nome)[1].lower()
 
-    with tempfile.NamedTemporaryFile(delete=False) as tmp:
-        for chunk in arquivo.chunks():
-            tmp.write(chunk)
-        caminho_tmp = tmp.name
+    if extensao == '.zip':
+        return _processar_zip(arquivo)
+    return _processar_arquivo_unico(arquivo)
 
-    try:
-        if extensao == '.zip':
-            registros = _processar_zip(caminho_tmp)
-        else:
-            registros = _processar_arquivo_unico(caminho_tmp)
-    finally:
-        try:
-            os.remove(caminho_tmp)
-        except OSError:
-            pass
 
-    return registros
-
-
-def importar_cids(arquivo):
+def importar_cids(arquivo, modo=None, progresso=None):
+    """
+    Padrao: cria os CIDs novos e sobrescreve nome/search_text dos existentes.
+    modo='upsert': trata o arquivo como a versao vigente completa (grava apenas
+    as linhas alteradas e desativa os codigos ausentes).
+    progresso(lidas, gravadas), opcional, e chamado apos a leitura e a gravacao.
+    """
     registros = _carregar_registros(arquivo)
     if not registros:
         raise ValueError('Arquivo de CIDs vazio ou ilegivel.')
+    if progresso:
+        progresso(len(registros), 0)
+
+    if modo == MODO_UPSERT:
+        resultado = upsert_por_codigo(
+            Cid, 'codigo', [item for item in registros if item.get('nome')], CAMPOS_CONTEUDO
+        )
+        if progresso:
+            progresso(len(registros), resultado['criados'] + resultado['atualizados'])
+        return resultado
 
     codigos = [item.get('codigo') for item in registros if item.get('codigo')]
     existentes = {
@@ -145,13 +134,15 @@ def importar_cids(arquivo):
             existente.nome = nome
             existente.search_text = search_text
             existente.situacao = True
+            existente.content_hash = hash_conteudo(item, CAMPOS_CONTEUDO)
             atualizaveis.append(existente)
         else:
             novos.append(Cid(
                 codigo=codigo,
                 nome=nome,
                 search_text=search_text,
-                situacao=True
+                situacao=True,
+                content_hash=hash_conteudo(item, CAMPOS_CONTEUDO)
             ))
 
     with transaction.atomic():
@@ -162,9 +153,12 @@ def importar_cids(arquivo):
             for i in range(0, len(atualizaveis), 5000):
                 Cid.objects.bulk_update(
                     atualizaveis[i:i + 5000],
-                    ['nome', 'search_text', 'situacao']
+                    ['nome', 'search_text', 'situacao', 'content_hash']
                 )
 
+    if progresso:
+        progresso(len(registros), len(novos) + len(atualizaveis))
+
     return {
         'total_processados': total_processados,
         'criados': len(novos),
@@ -2,16 +2,23 @@ import re
 
 import pandas as pd
 
+from clinica_core.formato_tabular import detectar_formato_csv, eh_planilha_excel, ler_amostra, ler_csv
 from configuracoes.models import Exame
+from configuracoes.services.upsert_service import hash_conteudo, upsert_por_codigo
+
+
+MODO_UPSERT = 'upsert'
+CAMPOS_CONTEUDO = ['nome', 'tipo', 'search_text']
 
 
 def _read_tuss_file(arquivo):
-    arquivo.seek(0)
-    try:
-        return pd.read_csv(arquivo, encoding='latin1', sep=';', dtype=str)
-    except Exception:
-        arquivo.seek(0)
+    amostra = ler_amostra(arquivo)
+    formato = detectar_formato_csv(amostra)
+    if formato is None:
+        if not eh_planilha_excel(amostra):
+            raise ValueError('Formato do arquivo de exames nao reconhecido.')
         return pd.read_excel(arquivo, dtype=str)
+    return ler_csv(arquivo, formato)
 
 
 def _normalize_codigo(valor):
@@ -34,7 +41,13 @@ def _mapear_tipo(codigo_limpo):
     return 'Outros'
 
 
-def importar_exames(arquivo):
+def importar_exames(arquivo, modo=None, progresso=None):
+    """
+    Padrao: cria apenas os codigos TUSS que ainda nao existem.
+    modo='upsert': trata o arquivo como a versao vigente completa da tabela
+    (atualiza alterados e desativa os codigos ausentes).
+    progresso(lidas, gravadas), opcional, e chamado apos a leitura e a gravacao.
+    """
     df = _read_tuss_file(arquivo)
     if df.empty:
         raise ValueError('Arquivo de exames vazio.')
@@ -69,6 +82,15 @@ def importar_exames(arquivo):
             'search_text': f"{nome} ({codigo_limpo})"
         })
 
+    if progresso:
+        progresso(len(registros), 0)
+
+    if modo == MODO_UPSERT:
+        resultado = upsert_por_codigo(Exame, 'codigo_tuss', registros, CAMPOS_CONTEUDO)
+        if progresso:
+            progresso(len(registros), resultado['criados'] + resultado['atualizados'])
+        return resultado
+
     codigos = [r['codigo_tuss'] for r in registros if r.get('codigo_tuss')]
     existentes = set(Exame.objects.filter(codigo_tuss__in=codigos).values_list('codigo_tuss', flat=True))
 
@@ -84,7 +106,8 @@ def importar_exames(arquivo):
             nome=item.get('nome') or '',
             tipo=item.get('tipo') or 'Exame',
             search_text=item.get('search_text') or '',
-            situacao=True
+            situacao=True,
+            content_hash=hash_conteudo(item, CAMPOS_CONTEUDO)
         ))
 
     criados = 0
@@ -93,6 +116,8 @@ def importar_exames(arquivo):
             lote = objs[i:i + 5000]
             Exame.objects.bulk_create(lote)
             criados += len(lote)
+            if progresso:
+                progresso(len(registros), criados)
 
     return {
         'total_processados': len(registros),
@@ -0,0 +1,142 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from configuracoes.importacao import importar_medicamentos
+from configuracoes.models import ImportacaoJob
+from configuracoes.services.cids_import_service import importar_cids
+from configuracoes.services.exames_import_service import importar_exames
+
+
+logger = logging.getLogger(__name__)
+
+# Intervalo do heartbeat enquanto o job roda; o --timeout-min do comando deve ser bem maior.
+HEARTBEAT_SEGUNDOS = 30
+
+
+def _importar_cbo(arquivo, modo=None, progresso=None):
+    from profissionais.services.cbo_import import importar_cbo
+    from profissionais.utils.cbo_processing import processar_cbo
+
+    registros = processar_cbo(arquivo)
+    if not registros:
+        raise ValueError('Nenhum registro CBO encontrado no arquivo.')
+    if progresso:
+        progresso(len(registros), 0)
+    resultado = importar_cbo(registros)
+    if progresso:
+        progresso(len(registros), resultado['criados'] + resultado['atualizados'])
+    return resultado
+
+
+HANDLERS = {
+    'medicamentos': lambda arquivo, modo, progresso: importar_medicamentos(arquivo, progresso=progresso),
+    'exames': lambda arquivo, modo, progresso: importar_exames(arquivo, modo=modo or None, progresso=progresso),
+    'cids': lambda arquivo, modo, progresso: importar_cids(arquivo, modo=modo or None, progresso=progresso),
+    'especialidades_cbo': lambda arquivo, modo, progresso: _importar_cbo(arquivo, modo, progresso),
+}
+
+
+def importacao_em_segundo_plano():
+    return bool(getattr(settings, 'IMPORTACAO_EM_SEGUNDO_PLANO', True))
+
+
+def criar_job(tipo, arquivo, modo='', usuario=None):
+    """Grava o upload em disco (MEDIA_ROOT/importacoes) e registra o job pendente."""
+    if tipo not in HANDLERS:
+        raise ValueError('Tipo de importacao nao suportado.')
+    job = ImportacaoJob(
+        tipo=tipo,
+        modo=modo or '',
+        nome_arquivo=(getattr(arquivo, 'name', '') or '')[:255],
+        criado_por=usuario if getattr(usuario, 'is_authenticated', False) else None,
+    )
+    job.arquivo.save(getattr(arquivo, 'name', '') or f'{tipo}.csv', arquivo, save=False)
+    job.save()
+    return job
+
+
+def _bater(job_pk):
+    ImportacaoJob.objects.filter(pk=job_pk, status='processando').update(heartbeat_em=timezone.now())
+
+
+class _Heartbeat(threading.Thread):
+    """Atualiza heartbeat_em a cada HEARTBEAT_SEGUNDOS mesmo quando o handler demora entre progressos."""
+
+    def __init__(self, job_pk):
+        super().__init__(daemon=True)
+        self.job_pk = job_pk
+        self.parar = threading.Event()
+
+    def run(self):
+        try:
+            while not self.parar.wait(HEARTBEAT_SEGUNDOS):
+                _bater(self.job_pk)
+        except Exception as exc:
+            logger.warning(f"Falha no heartbeat da importacao #{self.job_pk}: {exc}")
+        finally:
+            connection.close()
+
+
+def _remover_arquivo(job):
+    job.arquivo.delete(save=False)
+    ImportacaoJob.objects.filter(pk=job.pk).update(arquivo='')
+
+
+def processar_job(job):
+    """
+    Processa um job pendente. A troca pendente -> processando e um UPDATE
+    condicional, entao dois workers nunca pegam o mesmo job.
+    """
+    agora = timezone.now()
+    assumido = ImportacaoJob.objects.filter(pk=job.pk, status='pendente').update(
+        status='processando', iniciado_em=agora, heartbeat_em=agora, erro=''
+    )
+    if not assumido:
+        return False
+
+    def progresso(lidas, gravadas):
+        ImportacaoJob.objects.filter(pk=job.pk).update(
+            linhas_lidas=lidas, linhas_gravadas=gravadas, heartbeat_em=timezone.now()
+        )
+
+    job.refresh_from_db()
+    heartbeat = _Heartbeat(job.pk)
+    heartbeat.start()
+    try:
+        with job.arquivo.open('rb') as arquivo:
+            resultado = HANDLERS[job.tipo](arquivo, job.modo, progresso)
+    except Exception as exc:
+        logger.exception(f"Erro na importacao #{job.pk} ({job.tipo}): {exc}")
+        ImportacaoJob.objects.filter(pk=job.pk).update(
+            status='erro', erro=str(exc)[:2000], finalizado_em=timezone.now()
+        )
+        # Nao ha nova tentativa automatica: o usuario corrige o arquivo e envia de novo.
+        _remover_arquivo(job)
+        return True
+    finally:
+        heartbeat.parar.set()
+        heartbeat.join()
+
+    ImportacaoJob.objects.filter(pk=job.pk).update(
+        status='concluido', resultado=resultado, finalizado_em=timezone.now()
+    )
+    _remover_arquivo(job)
+    return True
+
+
+def proximo_job():
+    return ImportacaoJob.objects.filter(status='pendente').order_by('criado_em', 'id').first()
+
+
+def liberar_jobs_travados(minutos):
+    """Devolve para a fila os jobs em 'processando' sem heartbeat ha mais de minutos (worker interrompido)."""
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return ImportacaoJob.objects.filter(status='processando').filter(
+        Q(heartbeat_em__lt=limite) | Q(heartbeat_em__isnull=True, iniciado_em__lt=limite)
+    ).update(status='pendente')
@@ -0,0 +1,87 @@
+"""
+Contadores de lembretes (WhatsApp) por dia, em uma unica consulta agregada.
+
+Usado pelo monitor do robo (ConfiguracaoSistemaView) e pelo painel de
+cobertura dos proximos dias. O resultado fica alguns segundos no cache do
+Django; o disparo manual recalcula sem cache.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from agendamento.models import Agendamento
+
+
+CACHE_SEGUNDOS = 30
+MAX_DIAS = 31
+
+
+def _vazio():
+    return {'total': 0, 'enviados': 0, 'pendentes': 0, 'sem_whatsapp': 0}
+
+
+def _consultar(inicio, fim):
+    linhas = (
+        Agendamento.objects
+        .filter(data__range=(inicio, fim), status='agendado')
+        .values('data')
+        .annotate(
+            total=Count('id'),
+            enviados=Count('id', filter=Q(lembrete_enviado=True)),
+            pendentes=Count('id', filter=Q(lembrete_enviado=False)),
+            sem_whatsapp=Count('id', filter=Q(lembrete_enviado=False, enviar_whatsapp=False)),
+        )
+        .order_by()
+    )
+    return {linha.pop('data'): linha for linha in linhas}
+
+
+def estatisticas_por_dia(inicio, dias=2, usar_cache=True):
+    """
+    {data: {'total', 'enviados', 'pendentes', 'sem_whatsapp'}} de cada dia entre
+    inicio e inicio + dias - 1 (agendamentos com status 'agendado'). sem_whatsapp
+    conta os pendentes cujo paciente optou por nao receber mensagens.
+    """
+    dias = max(1, min(int(dias), MAX_DIAS))
+    fim = inicio + timedelta(days=dias - 1)
+    chave = f"lembretes:estatisticas:{inicio.isoformat()}:{dias}"
+
+    por_dia = cache.get(chave) if usar_cache else None
+    if por_dia is None:
+        por_dia = _consultar(inicio, fim)
+        cache.set(chave, por_dia, CACHE_SEGUNDOS)
+
+    return {
+        inicio + timedelta(days=i): por_dia.get(inicio + timedelta(days=i)) or _vazio()
+        for i in range(dias)
+    }
+
+
+def resumo_monitor(hoje, usar_cache=True):
+    """stats_hoje e stats_amanha no formato esperado pela tela de configuracoes."""
+    por_dia = estatisticas_por_dia(hoje, 2, usar_cache=usar_cache)
+    campos = ('total', 'enviados', 'pendentes')
+    hoje_stats, amanha_stats = (por_dia[hoje + timedelta(days=i)] for i in range(2))
+    return {
+        'stats_hoje': {campo: hoje_stats[campo] for campo in campos},
+        'stats_amanha': {campo: amanha_stats[campo] for campo in campos},
+    }
+
+
+def painel_cobertura(inicio, dias=7, usar_cache=True):
+    """Cobertura dos lembretes nos proximos dias: contadores por dia, totais e percentual enviado."""
+    por_dia = estatisticas_por_dia(inicio, dias, usar_cache=usar_cache)
+    totais = _vazio()
+    linhas = []
+    for data, contadores in por_dia.items():
+        for campo in totais:
+            totais[campo] += contadores[campo]
+        linhas.append({'data': data, **contadores, 'cobertura': _percentual(contadores)})
+    return {'inicio': inicio, 'dias': linhas, 'totais': {**totais, 'cobertura': _percentual(totais)}}
+
+
+def _percentual(contadores):
+    if not contadores['total']:
+        return None
+    return round(100 * contadores['enviados'] / contadores['total'], 1)
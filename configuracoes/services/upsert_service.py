@@ -0,0 +1,85 @@
+import hashlib
+
+from django.db import transaction
+
+
+BATCH_SIZE = 5000
+
+
+def hash_conteudo(registro, campos):
+    """Hash estavel dos campos importados de uma linha, usado para detectar alteracoes."""
+    conteudo = '\x1f'.join(str(registro.get(campo) or '') for campo in campos)
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+
+def upsert_por_codigo(model, campo_codigo, registros, campos):
+    """
+    Sincroniza a tabela com uma nova versao completa, chaveada por campo_codigo:
+    cria os codigos novos, atualiza apenas as linhas cujo hash mudou (ou que
+    estavam inativas) e desativa (situacao=False) os codigos ausentes.
+    """
+    entrada = {}
+    for registro in registros:
+        codigo = registro.get(campo_codigo)
+        if codigo:
+            entrada[codigo] = registro
+
+    existentes = {
+        codigo: (pk, content_hash, situacao)
+        for codigo, pk, content_hash, situacao in model.objects.values_list(
+            campo_codigo, 'pk', 'content_hash', 'situacao'
+        ).iterator(chunk_size=BATCH_SIZE)
+    }
+
+    # Linhas gravadas antes do content_hash existir: o hash vem dos valores atuais.
+    sem_hash = [pk for pk, content_hash, _ in existentes.values() if not content_hash]
+    hashes_calculados = {}
+    for inicio in range(0, len(sem_hash), BATCH_SIZE):
+        for valores in model.objects.filter(pk__in=sem_hash[inicio:inicio + BATCH_SIZE]).values('pk', *campos):
+            hashes_calculados[valores['pk']] = hash_conteudo(valores, campos)
+
+    novos, alterados, so_hash = [], [], []
+    inalterados = 0
+    for codigo, registro in entrada.items():
+        novo_hash = hash_conteudo(registro, campos)
+        valores = {campo: registro.get(campo) or '' for campo in campos}
+        atual = existentes.get(codigo)
+        if atual is None:
+            novos.append(model(
+                **{campo_codigo: codigo}, **valores, content_hash=novo_hash, situacao=True
+            ))
+            continue
+        pk, content_hash, situacao = atual
+        content_hash = content_hash or hashes_calculados.get(pk)
+        if content_hash == novo_hash and situacao:
+            inalterados += 1
+            if not atual[1]:
+                # Conteudo igual, apenas grava o hash que faltava.
+                so_hash.append(model(pk=pk, content_hash=novo_hash))
+            continue
+        alterados.append(model(pk=pk, **valores, content_hash=novo_hash, situacao=True))
+
+    ausentes = [
+        pk for codigo, (pk, _, situacao) in existentes.items()
+        if situacao and codigo not in entrada
+    ]
+
+    with transaction.atomic():
+        for inicio in range(0, len(novos), BATCH_SIZE):
+            model.objects.bulk_create(novos[inicio:inicio + BATCH_SIZE])
+        for inicio in range(0, len(alterados), BATCH_SIZE):
+            model.objects.bulk_update(
+                alterados[inicio:inicio + BATCH_SIZE], [*campos, 'content_hash', 'situacao']
+            )
+        for inicio in range(0, len(so_hash), BATCH_SIZE):
+            model.objects.bulk_update(so_hash[inicio:inicio + BATCH_SIZE], ['content_hash'])
+        for inicio in range(0, len(ausentes), BATCH_SIZE):
+            model.objects.filter(pk__in=ausentes[inicio:inicio + BATCH_SIZE]).update(situacao=False)
+
+    return {
+        'total_processados': len(entrada),
+        'criados': len(novos),
+        'atualizados': len(alterados),
+        'inalterados': inalterados,
+        'desativados': len(ausentes),
+    }
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+
+from .bootstrap import SECOES, invalidar, secoes_do_modelo
+
+
+def _conectar(label):
+    secoes = secoes_do_modelo(label)
+
+    def _invalidar_bootstrap(sender, **kwargs):
+        invalidar(*secoes)
+
+    post_save.connect(_invalidar_bootstrap, sender=label, weak=False, dispatch_uid=f'bootstrap_save_{label}')
+    post_delete.connect(_invalidar_bootstrap, sender=label, weak=False, dispatch_uid=f'bootstrap_delete_{label}')
+
+
+for _label in sorted({label for _, modelos in SECOES.values() for label in modelos}):
+    _conectar(_label)
@@ -0,0 +1,38 @@
+"""
+Cache em processo dos singletons de configuracao (DadosClinica, ConfiguracaoSistema).
+
+Cada worker guarda a instancia junto com a versao em que foi lida
+(clinica_core.cache_versao); save/delete trocam a versao e o worker que
+encontra outra versao le o banco de novo. Ler a versao nao toca no banco.
+
+A instancia devolvida e compartilhada entre requisicoes: somente leitura. Para
+editar use Model.load().
+"""
+import threading
+
+from clinica_core import cache_versao
+
+
+_instancias = {}
+_lock = threading.Lock()
+
+
+def _nome(model):
+    return f"singleton:{model._meta.label_lower}"
+
+
+def obter(model):
+    versao = cache_versao.atual(_nome(model))
+    atual = _instancias.get(model)
+    if versao is not None and atual and atual[0] == versao:
+        return atual[1]
+
+    obj = model.load()
+    if versao is not None:
+        with _lock:
+            _instancias[model] = (versao, obj)
+    return obj
+
+
+def invalidar(model):
+    cache_versao.trocar(_nome(model), ao_trocar=lambda: _instancias.pop(model, None))
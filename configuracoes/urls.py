@@ -4,6 +4,7 @@ from .views import (
     ConvenioViewSet,
     DadosClinicaView,
     ConfiguracaoSistemaView,
+    LembretesCoberturaView,
     WhatsAppStatusView,
     WhatsAppQRCodeView,
     MedicamentoViewSet,
@@ -11,6 +12,7 @@ from .views import (
     CidViewSet,
     ImportacaoTabelasView,
     ImportacaoCidsView,
+    ImportacaoJobView,
 )
 
 router = DefaultRouter()
@@ -29,7 +31,9 @@ urlpatterns = [
     
     # --- NOVA ROTA PARA O DISPARO MANUAL ---
     path('sistema/executar_lembretes/', ConfiguracaoSistemaView.as_view(), name='executar-lembretes'),
+    path('sistema/lembretes_cobertura/', LembretesCoberturaView.as_view(), name='lembretes-cobertura'),
     path('sistema/whatsapp_status/', WhatsAppStatusView.as_view(), name='whatsapp-status'),
     path('sistema/whatsapp_qrcode/', WhatsAppQRCodeView.as_view(), name='whatsapp-qrcode'),
     path('importacao/tabelas/', ImportacaoTabelasView.as_view(), name='importacao-tabelas'),
+    path('importacao/jobs/<int:pk>/', ImportacaoJobView.as_view(), name='importacao-job'),
 ]
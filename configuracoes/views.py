@@ -2,23 +2,25 @@ from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from usuarios.authentication import CachedJWTAuthentication
 from rest_framework.parsers import MultiPartParser, FormParser 
 from datetime import timedelta
 from django.utils import timezone
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 import requests
 import base64
 
 # Imports dos Models
-from .models import Convenio, DadosClinica, ConfiguracaoSistema, Medicamento, Exame, Cid
+from .models import Convenio, DadosClinica, ConfiguracaoSistema, Medicamento, Exame, Cid, ImportacaoJob
 from agendamento.models import Agendamento
 
 # Imports dos Serializers
-from .serializers import ConvenioSerializer, DadosClinicaSerializer, ConfiguracaoSistemaSerializer, MedicamentoSerializer, ExameSerializer, CidSerializer
-from .importacao import importar_medicamentos
-from .services.exames_import_service import importar_exames
-from .services.cids_import_service import importar_cids
+from .serializers import ConvenioSerializer, DadosClinicaSerializer, ConfiguracaoSistemaSerializer, MedicamentoSerializer, ExameSerializer, CidSerializer, ImportacaoJobSerializer
+from . import bootstrap
+from .services.lembretes_estatisticas import MAX_DIAS, painel_cobertura, resumo_monitor
+from .services.importacao_jobs import criar_job, importacao_em_segundo_plano, processar_job
 from clinica_core.filters import AccentInsensitiveSearchFilter
 
 # IMPORTANTE: Importar a funcao de disparo do WhatsApp
@@ -33,7 +35,7 @@ except ImportError:
 class ConvenioViewSet(viewsets.ModelViewSet):
     queryset = Convenio.objects.all().order_by('nome')
     serializer_class = ConvenioSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [AccentInsensitiveSearchFilter]
     search_fields = ['nome']
@@ -59,7 +61,7 @@ class ConvenioViewSet(viewsets.ModelViewSet):
 class MedicamentoViewSet(viewsets.ModelViewSet):
     queryset = Medicamento.objects.all().order_by('nome')
     serializer_class = MedicamentoSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [AccentInsensitiveSearchFilter]
     search_fields = ['nome', 'principio_ativo', 'apresentacao', 'laboratorio', 'tarja', 'nome_busca']
@@ -134,7 +136,7 @@ class MedicamentoViewSet(viewsets.ModelViewSet):
 class ExameViewSet(viewsets.ModelViewSet):
     queryset = Exame.objects.all().order_by('nome')
     serializer_class = ExameSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [AccentInsensitiveSearchFilter]
     search_fields = ['codigo_tuss', 'nome', 'tipo', 'search_text']
@@ -205,7 +207,7 @@ class ExameViewSet(viewsets.ModelViewSet):
 class CidViewSet(viewsets.ModelViewSet):
     queryset = Cid.objects.all().order_by('codigo')
     serializer_class = CidSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [AccentInsensitiveSearchFilter]
     search_fields = ['codigo', 'nome', 'search_text']
@@ -253,6 +255,38 @@ class CidViewSet(viewsets.ModelViewSet):
         cid.save(update_fields=['situacao'])
         return Response({'status': 'inativado'})
 
+class BootstrapView(APIView):
+    """
+    Dados de referencia dos dropdowns e do operador logado em uma so chamada.
+    Aceita If-None-Match (ETag do pacote) e ?versoes=secao:hash,... : secoes que
+    o cliente ja tem voltam sem 'dados' e, se nenhuma mudou, a resposta e 304.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _versoes_cliente(self, request):
+        versoes = {}
+        for item in (request.query_params.get('versoes') or '').split(','):
+            nome, _, versao = item.partition(':')
+            if nome.strip() and versao.strip():
+                versoes[nome.strip()] = versao.strip()
+        return versoes
+
+    def get(self, request):
+        secoes = {nome: bootstrap.secao(nome) for nome in bootstrap.SECOES}
+        secoes[bootstrap.SECAO_ME] = bootstrap.secao_me(request.user)
+
+        versoes_cliente = self._versoes_cliente(request)
+        corpo, tag = bootstrap.montar_resposta(secoes, versoes_cliente)
+        inalterado = all(versoes_cliente.get(nome) == versao for nome, (_, versao) in secoes.items())
+        if inalterado or tag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(corpo, content_type='application/json')
+        response['ETag'] = tag
+        # Inclui os dados do operador: cache so no navegador, sempre revalidado.
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
 class DadosClinicaView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
@@ -277,6 +311,34 @@ class DadosClinicaView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def enfileirar_importacao(request, tipo, arquivo, modo=''):
+    """
+    Registra o upload como ImportacaoJob e responde 202 com o id para acompanhamento
+    em importacao/jobs/<id>/. Com IMPORTACAO_EM_SEGUNDO_PLANO=false (sem worker) o job
+    e processado aqui mesmo e a resposta ja traz o resultado.
+    """
+    job = criar_job(tipo, arquivo, modo=modo, usuario=request.user)
+    if importacao_em_segundo_plano():
+        return Response(
+            {'status': job.status, 'tipo': tipo, 'job_id': job.pk},
+            status=status.HTTP_202_ACCEPTED
+        )
+
+    processar_job(job)
+    job.refresh_from_db()
+    if job.status == 'erro':
+        return Response(
+            {'error': 'Falha ao processar importacao.', 'detalhe': job.erro, 'job_id': job.pk},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response({
+        'status': 'sucesso',
+        'tipo': tipo,
+        'job_id': job.pk,
+        'resultado': job.resultado
+    })
+
+
 class ImportacaoTabelasView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
@@ -289,29 +351,11 @@ class ImportacaoTabelasView(APIView):
             return Response({'error': 'Tipo de importacao nao informado.'}, status=status.HTTP_400_BAD_REQUEST)
         if not arquivo:
             return Response({'error': 'Arquivo nao informado.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        handlers = {
-            'medicamentos': importar_medicamentos,
-            'exames': importar_exames,
-            'cids': importar_cids,
-        }
-        handler = handlers.get(tipo)
-        if not handler:
+        if tipo not in ('medicamentos', 'exames', 'cids'):
             return Response({'error': 'Tipo de importacao nao suportado.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            resultado = handler(arquivo)
-        except Exception as exc:
-            return Response(
-                {'error': 'Falha ao processar importacao.', 'detalhe': str(exc)},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        return Response({
-            'status': 'sucesso',
-            'tipo': tipo,
-            'resultado': resultado
-        })
+        modo = request.data.get('modo') if tipo in ('exames', 'cids') else ''
+        return enfileirar_importacao(request, tipo, arquivo, modo=modo or '')
 
 
 class ImportacaoCidsView(APIView):
@@ -323,19 +367,21 @@ class ImportacaoCidsView(APIView):
         if not arquivo:
             return Response({'error': 'Arquivo nao informado.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            resultado = importar_cids(arquivo)
-        except Exception as exc:
-            return Response(
-                {'error': 'Falha ao processar importacao de CIDs.', 'detalhe': str(exc)},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        return enfileirar_importacao(request, 'cids', arquivo, modo=request.data.get('modo') or '')
 
-        return Response({
-            'status': 'sucesso',
-            'tipo': 'cids',
-            'resultado': resultado
-        })
+
+class ImportacaoJobView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        # Cada operador acompanha os proprios uploads; administradores veem todos.
+        jobs = ImportacaoJob.objects.all()
+        if not request.user.is_staff:
+            jobs = jobs.filter(criado_por=request.user)
+        job = jobs.filter(pk=pk).first()
+        if job is None:
+            return Response({'error': 'Importacao nao encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ImportacaoJobSerializer(job).data)
 
 class ConfiguracaoSistemaView(APIView):
     permission_classes = [permissions.IsAdminUser] 
@@ -344,32 +390,8 @@ class ConfiguracaoSistemaView(APIView):
         config = ConfiguracaoSistema.load()
         serializer = ConfiguracaoSistemaSerializer(config)
         
-        # Datas
-        hoje = timezone.localdate()
-        amanha = hoje + timedelta(days=1)
-        
-        # --- ESTATISTICAS DE HOJE ---
-        agendamentos_hoje = Agendamento.objects.filter(data=hoje, status='agendado')
-        enviados_hoje = agendamentos_hoje.filter(lembrete_enviado=True).count()
-        falhas_hoje = agendamentos_hoje.filter(lembrete_enviado=False).count()
-
-        # --- ESTATISTICAS DE AMANHA ---
-        agendamentos_amanha = Agendamento.objects.filter(data=amanha, status='agendado')
-        enviados_amanha = agendamentos_amanha.filter(lembrete_enviado=True).count()
-        pendentes_amanha = agendamentos_amanha.filter(lembrete_enviado=False).count()
-        
         data = serializer.data
-        data['stats_hoje'] = {
-            'total': agendamentos_hoje.count(),
-            'enviados': enviados_hoje,
-            'pendentes': falhas_hoje
-        }
-        data['stats_amanha'] = {
-            'total': agendamentos_amanha.count(),
-            'enviados': enviados_amanha,
-            'pendentes': pendentes_amanha
-        }
-        
+        data.update(resumo_monitor(timezone.localdate()))
         return Response(data)
 
     def put(self, request):
@@ -425,10 +447,7 @@ class ConfiguracaoSistemaView(APIView):
             config.save()
 
             # --- PREPARA ESTATISTICAS ATUALIZADAS PARA O FRONTEND ---
-            # Recalcula tudo para a tela atualizar instantaneamente sem F5
-            ag_hoje = Agendamento.objects.filter(data=hoje, status='agendado')
-            ag_amanha = Agendamento.objects.filter(data=amanha, status='agendado')
-
+            # Recalcula sem cache para a tela atualizar instantaneamente sem F5
             return Response({
                 'status': 'sucesso', 
                 'mensagem': f'Processo finalizado. {enviados_count} enviados, {erros_count} falhas.',
@@ -437,16 +456,7 @@ class ConfiguracaoSistemaView(APIView):
                     'falhas': erros_count
                 },
                 'ultima_execucao': config.data_ultima_execucao_lembrete,
-                'stats_hoje': {
-                    'total': ag_hoje.count(),
-                    'enviados': ag_hoje.filter(lembrete_enviado=True).count(),
-                    'pendentes': ag_hoje.filter(lembrete_enviado=False).count(),
-                },
-                'stats_amanha': {
-                    'total': ag_amanha.count(),
-                    'enviados': ag_amanha.filter(lembrete_enviado=True).count(),
-                    'pendentes': ag_amanha.filter(lembrete_enviado=False).count(),
-                }
+                **resumo_monitor(hoje, usar_cache=False),
             })
 
         except Exception as e:
@@ -457,6 +467,20 @@ class ConfiguracaoSistemaView(APIView):
             )
 
 
+class LembretesCoberturaView(APIView):
+    """Painel de cobertura dos lembretes: contadores por dia dos proximos ?dias= (padrao 7)."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            dias = int(request.query_params.get('dias', 7))
+        except (TypeError, ValueError):
+            return Response({'error': 'Parametro dias invalido.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= dias <= MAX_DIAS:
+            return Response({'error': f'dias deve estar entre 1 e {MAX_DIAS}.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(painel_cobertura(timezone.localdate(), dias))
+
+
 def _parse_evolution_state(payload):
     state = None
     if isinstance(payload, dict):
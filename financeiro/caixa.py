@@ -0,0 +1,102 @@
+"""
+Fechamento de caixa sobre Fatura.
+
+Os recebidos do periodo (pago=True e data_pagamento no intervalo) sao
+somados no banco, um GROUP BY por quebra, usando o indice
+fatura_pago_data_pagamento; os pendentes usam o indice parcial
+fatura_pendente_vencimento. Valor recebido = valor - desconto, o mesmo
+criterio de ResumoDiario.
+"""
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+
+from agendamento.models import Agendamento
+
+from .models import Fatura
+
+
+LIMITE_PENDENTES = 500
+
+_LIQUIDO = ExpressionWrapper(F('valor') - F('desconto'), output_field=DecimalField(max_digits=12, decimal_places=2))
+_SOMAS = {'quantidade': Count('id'), 'valor': Sum(_LIQUIDO)}
+
+_FORMAS = dict(Fatura.PAGAMENTO_CHOICES)
+
+
+def _quebra(recebidos, campos, ordem):
+    linhas = []
+    for linha in recebidos.values(*campos).annotate(**_SOMAS).order_by(ordem):
+        linha['valor'] = linha['valor'] or 0
+        linhas.append(linha)
+    return linhas
+
+
+def _por_forma(recebidos):
+    linhas = _quebra(recebidos, ('forma_pagamento',), 'forma_pagamento')
+    for linha in linhas:
+        linha['descricao'] = _FORMAS.get(linha['forma_pagamento'], linha['forma_pagamento'])
+    return linhas
+
+
+def _por_operador(recebidos):
+    linhas = []
+    for linha in _quebra(
+        recebidos, ('recebido_por_id', 'recebido_por__username', 'recebido_por__first_name'), 'recebido_por__username'
+    ):
+        linhas.append({
+            'operador_id': linha['recebido_por_id'],
+            'operador': linha['recebido_por__first_name'] or linha['recebido_por__username'],
+            'quantidade': linha['quantidade'],
+            'valor': linha['valor'],
+        })
+    return linhas
+
+
+def _por_profissional(recebidos):
+    linhas = []
+    for linha in _quebra(
+        recebidos, ('agendamento__profissional_id', 'agendamento__profissional__nome'), 'agendamento__profissional__nome'
+    ):
+        linhas.append({
+            'profissional_id': linha['agendamento__profissional_id'],
+            'profissional': linha['agendamento__profissional__nome'],
+            'quantidade': linha['quantidade'],
+            'valor': linha['valor'],
+        })
+    return linhas
+
+
+def _pendentes(ate, limite):
+    """Faturas em aberto vencidas ate a data (sem agendamentos cancelados), mais antigas primeiro."""
+    pendentes = Fatura.objects.filter(pago=False, data_vencimento__lte=ate).exclude(
+        agendamento__status=Agendamento.Status.CANCELADO
+    )
+    totais = pendentes.aggregate(**_SOMAS)
+    itens = list(
+        pendentes.order_by('data_vencimento', 'id').values(
+            'id', 'agendamento_id', 'data_vencimento', 'forma_pagamento', 'valor', 'desconto',
+            data=F('agendamento__data'),
+            horario=F('agendamento__horario'),
+            paciente=F('agendamento__paciente__nome'),
+            profissional=F('agendamento__profissional__nome'),
+        )[:limite]
+    )
+    return {
+        'quantidade': totais['quantidade'],
+        'valor': totais['valor'] or 0,
+        'itens': itens,
+        'truncado': totais['quantidade'] > len(itens),
+    }
+
+
+def fechamento(inicio, fim, limite_pendentes=LIMITE_PENDENTES):
+    recebidos = Fatura.objects.filter(pago=True, data_pagamento__range=(inicio, fim))
+    total = recebidos.aggregate(**_SOMAS)
+    return {
+        'inicio': inicio,
+        'fim': fim,
+        'total_recebido': {'quantidade': total['quantidade'], 'valor': total['valor'] or 0},
+        'por_forma_pagamento': _por_forma(recebidos),
+        'por_operador': _por_operador(recebidos),
+        'por_profissional': _por_profissional(recebidos),
+        'pendentes': _pendentes(fim, limite_pendentes),
+    }
@@ -0,0 +1,128 @@
+"""
+Indicadores de agendamento e faturamento lidos da tabela ResumoDiario.
+
+A ocupacao compara os agendamentos nao cancelados com as vagas das agendas
+configuradas (AgendaConfig) no periodo, pelas mesmas regras de limite do
+AgendamentoSerializer; bloqueios de agenda nao sao descontados.
+"""
+from datetime import datetime, timedelta
+
+from django.db.models import Sum
+
+from agendas.models import AgendaConfig
+
+from .models import ResumoDiario
+
+
+MAX_DIAS = 366
+
+# agrupar -> (campos do values(), rotulo)
+AGRUPAMENTOS = {
+    'data': (('data',), 'data'),
+    'profissional': (('profissional_id', 'profissional__nome'), 'profissional__nome'),
+    'especialidade': (('especialidade_id', 'especialidade__nome'), 'especialidade__nome'),
+    'convenio': (('convenio_id', 'convenio__nome'), 'convenio__nome'),
+}
+
+_CONTADORES = (
+    'agendados', 'aguardando', 'em_atendimento', 'finalizados', 'cancelados', 'faltas',
+    'valor_faturado', 'valor_recebido', 'espera_segundos', 'qtd_espera', 'consulta_segundos', 'qtd_consulta',
+)
+
+
+def _vagas_da_regra(regra):
+    if regra.tipo == 'fixo':
+        return regra.quantidade_atendimentos
+    if not regra.intervalo_minutos or regra.intervalo_minutos <= 0:
+        return 0
+    dia = datetime(2000, 1, 1)
+    minutos = (datetime.combine(dia, regra.hora_fim) - datetime.combine(dia, regra.hora_inicio)).total_seconds() / 60
+    horarios = max(0, -(-int(minutos) // regra.intervalo_minutos))
+    return horarios * (regra.quantidade_atendimentos if regra.tipo == 'periodo' else 1)
+
+
+def capacidade(inicio, fim):
+    """{(data, profissional_id, especialidade_id): vagas} das agendas ativas no periodo."""
+    regras = AgendaConfig.objects.filter(
+        situacao=True, data_inicio__lte=fim, data_fim__gte=inicio
+    ).only(
+        'profissional_id', 'especialidade_id', 'dia_semana', 'data_inicio', 'data_fim',
+        'hora_inicio', 'hora_fim', 'intervalo_minutos', 'quantidade_atendimentos', 'tipo'
+    )
+    por_dia_semana = {}
+    for regra in regras:
+        por_dia_semana.setdefault(regra.dia_semana, []).append((regra, _vagas_da_regra(regra)))
+
+    vagas = {}
+    dia = inicio
+    while dia <= fim:
+        # AgendaConfig usa 0 = domingo
+        for regra, quantidade in por_dia_semana.get((dia.weekday() + 1) % 7, []):
+            if regra.data_inicio <= dia <= regra.data_fim and quantidade:
+                chave = (dia, regra.profissional_id, regra.especialidade_id)
+                vagas[chave] = vagas.get(chave, 0) + quantidade
+        dia += timedelta(days=1)
+    return vagas
+
+
+def _media(segundos, quantidade):
+    return round(segundos / quantidade / 60, 1) if quantidade else None
+
+
+def _linha(grupo, totais, vagas=None):
+    validos = totais['agendados'] + totais['aguardando'] + totais['em_atendimento'] + totais['finalizados'] + totais['faltas']
+    linha = dict(grupo)
+    linha.update({
+        'agendados': totais['agendados'],
+        'aguardando': totais['aguardando'],
+        'em_atendimento': totais['em_atendimento'],
+        'finalizados': totais['finalizados'],
+        'cancelados': totais['cancelados'],
+        'faltas': totais['faltas'],
+        'total': validos + totais['cancelados'],
+        'taxa_faltas': round(totais['faltas'] * 100 / validos, 1) if validos else None,
+        'valor_faturado': totais['valor_faturado'] or 0,
+        'valor_recebido': totais['valor_recebido'] or 0,
+        'espera_media_min': _media(totais['espera_segundos'], totais['qtd_espera']),
+        'consulta_media_min': _media(totais['consulta_segundos'], totais['qtd_consulta']),
+    })
+    if vagas is not None:
+        linha['vagas'] = vagas
+        linha['ocupacao'] = round(validos * 100 / vagas, 1) if vagas else None
+    return linha
+
+
+def indicadores(inicio, fim, agrupar):
+    """Linhas por grupo e total geral do periodo. Ocupacao nao se aplica ao agrupamento por convenio."""
+    campos, rotulo = AGRUPAMENTOS[agrupar]
+    resumos = ResumoDiario.objects.filter(data__range=(inicio, fim))
+    somas = {campo: Sum(campo) for campo in _CONTADORES}
+    grupos = resumos.values(*campos).annotate(**somas).order_by(rotulo)
+    geral = resumos.aggregate(**somas)
+
+    vagas_por_grupo = None
+    vagas_total = None
+    if agrupar != 'convenio':
+        vagas = capacidade(inicio, fim)
+        indice = {'data': 0, 'profissional': 1, 'especialidade': 2}[agrupar]
+        vagas_por_grupo = {}
+        for chave, quantidade in vagas.items():
+            vagas_por_grupo[chave[indice]] = vagas_por_grupo.get(chave[indice], 0) + quantidade
+        vagas_total = sum(vagas.values())
+
+    linhas = []
+    for grupo in grupos:
+        totais = {campo: grupo.pop(campo) or 0 for campo in _CONTADORES}
+        if vagas_por_grupo is None:
+            linhas.append(_linha(grupo, totais))
+        else:
+            linhas.append(_linha(grupo, totais, vagas_por_grupo.pop(grupo[campos[0]], 0)))
+
+    geral = {campo: valor or 0 for campo, valor in geral.items()}
+    return {
+        'inicio': inicio,
+        'fim': fim,
+        'agrupar': agrupar,
+        'linhas': linhas,
+        'total': _linha({}, geral, vagas_total),
+    }
@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from financeiro.resumos import datas_alteradas, intervalos, reconstruir
+
+
+class Command(BaseCommand):
+    help = (
+        'Atualiza a tabela ResumoDiario. Sem --inicio/--fim, reconstroi os dias com '
+        'agendamentos ou faturas alterados nas ultimas --horas (recupera o que os signals '
+        'nao viram, como updates em massa).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inicio', help='Primeiro dia a reconstruir (AAAA-MM-DD)')
+        parser.add_argument('--fim', help='Ultimo dia a reconstruir (AAAA-MM-DD, padrao: --inicio)')
+        parser.add_argument('--horas', type=int, default=24, help='Janela de alteracoes sem --inicio (padrao: 24)')
+
+    def handle(self, *args, **options):
+        if options['inicio']:
+            try:
+                inicio = date.fromisoformat(options['inicio'])
+                fim = date.fromisoformat(options['fim']) if options['fim'] else inicio
+            except ValueError:
+                raise CommandError('Use datas no formato AAAA-MM-DD.')
+            if fim < inicio:
+                raise CommandError('--fim deve ser igual ou posterior a --inicio.')
+            periodos = [(inicio, fim)]
+        else:
+            desde = timezone.now() - timedelta(hours=max(options['horas'], 1))
+            periodos = intervalos(datas_alteradas(desde))
+
+        if not periodos:
+            self.stdout.write('Nenhum dia para atualizar.')
+            return
+
+        for inicio, fim in periodos:
+            total = reconstruir(inicio, fim)
+            self.stdout.write(f'{inicio:%d/%m/%Y} a {fim:%d/%m/%Y}: {total} grupos.')
+        self.stdout.write(self.style.SUCCESS('Resumos diarios atualizados.'))
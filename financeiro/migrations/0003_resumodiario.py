@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-19 13:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuracoes', '0009_importacaojob'),
+        ('financeiro', '0002_alter_fatura_id'),
+        ('profissionais', '0003_alter_especialidade_id_alter_profissional_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoDiario',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('agendados', models.PositiveIntegerField(default=0)),
+                ('aguardando', models.PositiveIntegerField(default=0)),
+                ('em_atendimento', models.PositiveIntegerField(default=0)),
+                ('finalizados', models.PositiveIntegerField(default=0)),
+                ('cancelados', models.PositiveIntegerField(default=0)),
+                ('faltas', models.PositiveIntegerField(default=0)),
+                ('valor_faturado', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('valor_recebido', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('espera_segundos', models.PositiveBigIntegerField(default=0)),
+                ('qtd_espera', models.PositiveIntegerField(default=0)),
+                ('consulta_segundos', models.PositiveBigIntegerField(default=0)),
+                ('qtd_consulta', models.PositiveIntegerField(default=0)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('convenio', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='configuracoes.convenio')),
+                ('especialidade', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profissionais.especialidade')),
+                ('profissional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profissionais.profissional')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['data', 'profissional'], name='resumo_diario_data_prof')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('convenio__isnull', False)), fields=('data', 'profissional', 'especialidade', 'convenio'), name='resumo_diario_chave'), models.UniqueConstraint(condition=models.Q(('convenio__isnull', True)), fields=('data', 'profissional', 'especialidade'), name='resumo_diario_chave_particular')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-19 14:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0008_alter_agendamento_id_alter_bloqueioagenda_id'),
+        ('financeiro', '0003_resumodiario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fatura',
+            name='recebido_por',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='fatura',
+            index=models.Index(fields=['pago', 'data_pagamento'], name='fatura_pago_data_pagamento'),
+        ),
+        migrations.AddIndex(
+            model_name='fatura',
+            index=models.Index(condition=models.Q(('pago', False)), fields=['data_vencimento'], name='fatura_pendente_vencimento'),
+        ),
+    ]
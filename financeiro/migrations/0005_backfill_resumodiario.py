@@ -0,0 +1,102 @@
+# Generated by Django 6.0 on 2026-10-19 15:40
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Max, Min
+
+
+# Copia da agregacao de financeiro.resumos no momento desta migracao (migracoes nao
+# importam codigo do app): status de Agendamento -> contador de ResumoDiario.
+CAMPO_POR_STATUS = {
+    'agendado': 'agendados',
+    'aguardando': 'aguardando',
+    'em_atendimento': 'em_atendimento',
+    'finalizado': 'finalizados',
+    'cancelado': 'cancelados',
+    'faltou': 'faltas',
+}
+
+CAMPOS_CHAVE = ('data', 'profissional_id', 'especialidade_id', 'convenio_id')
+
+COLUNAS = CAMPOS_CHAVE + (
+    'status', 'horario_chegada', 'inicio_atendimento', 'fim_atendimento',
+    'fatura__valor', 'fatura__desconto', 'fatura__pago',
+)
+
+
+def _segundos(inicio, fim):
+    if not inicio or not fim:
+        return None
+    dia = datetime(2000, 1, 1)
+    segundos = (datetime.combine(dia, fim) - datetime.combine(dia, inicio)).total_seconds()
+    return int(segundos) if segundos >= 0 else None
+
+
+def _zerado():
+    totais = {campo: 0 for campo in CAMPO_POR_STATUS.values()}
+    totais.update({
+        'valor_faturado': Decimal('0'), 'valor_recebido': Decimal('0'),
+        'espera_segundos': 0, 'qtd_espera': 0, 'consulta_segundos': 0, 'qtd_consulta': 0,
+    })
+    return totais
+
+
+def _acumular(linhas):
+    grupos = {}
+    for linha in linhas:
+        dados = dict(zip(COLUNAS, linha))
+        totais = grupos.setdefault(tuple(dados[campo] for campo in CAMPOS_CHAVE), _zerado())
+
+        campo_status = CAMPO_POR_STATUS.get(dados['status'])
+        if campo_status:
+            totais[campo_status] += 1
+
+        if dados['fatura__valor'] is not None:
+            liquido = dados['fatura__valor'] - (dados['fatura__desconto'] or 0)
+            totais['valor_faturado'] += liquido
+            if dados['fatura__pago']:
+                totais['valor_recebido'] += liquido
+
+        espera = _segundos(dados['horario_chegada'], dados['inicio_atendimento'])
+        if espera is not None:
+            totais['espera_segundos'] += espera
+            totais['qtd_espera'] += 1
+        consulta = _segundos(dados['inicio_atendimento'], dados['fim_atendimento'])
+        if consulta is not None:
+            totais['consulta_segundos'] += consulta
+            totais['qtd_consulta'] += 1
+    return grupos
+
+
+def preencher_resumos(apps, schema_editor):
+    """Monta ResumoDiario para todo o historico existente, um mes por vez."""
+    Agendamento = apps.get_model('agendamento', 'Agendamento')
+    ResumoDiario = apps.get_model('financeiro', 'ResumoDiario')
+
+    limites = Agendamento.objects.aggregate(inicio=Min('data'), fim=Max('data'))
+    if limites['inicio'] is None:
+        return
+    inicio = limites['inicio']
+    while inicio <= limites['fim']:
+        fim = min(inicio + timedelta(days=30), limites['fim'])
+        linhas = Agendamento.objects.filter(data__range=(inicio, fim)).values_list(*COLUNAS).iterator(chunk_size=5000)
+        grupos = _acumular(linhas)
+        ResumoDiario.objects.filter(data__range=(inicio, fim)).delete()
+        ResumoDiario.objects.bulk_create(
+            [ResumoDiario(**dict(zip(CAMPOS_CHAVE, chave)), **totais) for chave, totais in grupos.items()],
+            batch_size=1000
+        )
+        inicio = fim + timedelta(days=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0004_fatura_recebido_por_indices'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
 from agendamento.models import Agendamento 
+from configuracoes.models import Convenio
+from profissionais.models import Especialidade, Profissional
 
 class Fatura(models.Model):
     PAGAMENTO_CHOICES = [
@@ -23,9 +27,78 @@ class Fatura(models.Model):
     # --- CAMPOS QUE FALTAVAM E CAUSAVAM O ERRO ---
     data_vencimento = models.DateField(null=True, blank=True)
     data_pagamento = models.DateField(null=True, blank=True)
+    recebido_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
     
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Fechamento de caixa: recebidos por data_pagamento
+            models.Index(fields=['pago', 'data_pagamento'], name='fatura_pago_data_pagamento'),
+            # Lista de pendentes por vencimento (sao poucas perto do historico)
+            models.Index(
+                fields=['data_vencimento'], condition=Q(pago=False), name='fatura_pendente_vencimento'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Fatura #{self.id} - {self.agendamento}"
+
+
+class ResumoDiario(models.Model):
+    """
+    Totais de agendamentos e faturas por (data, profissional, especialidade, convenio),
+    mantidos por financeiro.resumos (a cada alteracao e pelo comando atualizar_resumos).
+    Os relatorios de indicadores leem daqui em vez de varrer Agendamento e Fatura.
+    """
+    data = models.DateField()
+    profissional = models.ForeignKey(Profissional, on_delete=models.CASCADE, related_name='+')
+    especialidade = models.ForeignKey(Especialidade, on_delete=models.CASCADE, related_name='+')
+    convenio = models.ForeignKey(Convenio, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+
+    # Agendamentos por status
+    agendados = models.PositiveIntegerField(default=0)
+    aguardando = models.PositiveIntegerField(default=0)
+    em_atendimento = models.PositiveIntegerField(default=0)
+    finalizados = models.PositiveIntegerField(default=0)
+    cancelados = models.PositiveIntegerField(default=0)
+    faltas = models.PositiveIntegerField(default=0)
+
+    # Faturas (valor liquido = valor - desconto)
+    valor_faturado = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    valor_recebido = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    # Tempos em segundos (chegada -> inicio e inicio -> fim) e quantos atendimentos os tem
+    espera_segundos = models.PositiveBigIntegerField(default=0)
+    qtd_espera = models.PositiveIntegerField(default=0)
+    consulta_segundos = models.PositiveBigIntegerField(default=0)
+    qtd_consulta = models.PositiveIntegerField(default=0)
+
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['data', 'profissional', 'especialidade', 'convenio'],
+                condition=Q(convenio__isnull=False),
+                name='resumo_diario_chave'
+            ),
+            models.UniqueConstraint(
+                fields=['data', 'profissional', 'especialidade'],
+                condition=Q(convenio__isnull=True),
+                name='resumo_diario_chave_particular'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['data', 'profissional'], name='resumo_diario_data_prof'),
+        ]
+
+    @property
+    def total(self):
+        return self.agendados + self.aguardando + self.em_atendimento + self.finalizados + self.cancelados + self.faltas
+
     def __str__(self):
-        return f"Fatura #{self.id} - {self.agendamento}"
\ No newline at end of file
+        return f"Resumo {self.data} - {self.profissional_id}/{self.especialidade_id}/{self.convenio_id}"
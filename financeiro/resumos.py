@@ -0,0 +1,166 @@
+"""
+Manutencao da tabela ResumoDiario.
+
+A unidade e o grupo (data, profissional, especialidade, convenio): cada
+alteracao de Agendamento ou Fatura recalcula, apos o commit, so os grupos
+afetados (ver signals). O comando atualizar_resumos reconstroi periodos
+inteiros e recupera grupos que ficaram para tras (updates em massa, falhas).
+A migracao 0005 (backfill) tem uma copia propria desta agregacao.
+"""
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from agendamento.models import Agendamento
+
+from .models import ResumoDiario
+
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_CHAVE = ('data', 'profissional_id', 'especialidade_id', 'convenio_id')
+
+CAMPO_POR_STATUS = {
+    Agendamento.Status.AGENDADO: 'agendados',
+    Agendamento.Status.AGUARDANDO: 'aguardando',
+    Agendamento.Status.EM_ATENDIMENTO: 'em_atendimento',
+    Agendamento.Status.FINALIZADO: 'finalizados',
+    Agendamento.Status.CANCELADO: 'cancelados',
+    Agendamento.Status.FALTOU: 'faltas',
+}
+
+_COLUNAS = CAMPOS_CHAVE + (
+    'status', 'horario_chegada', 'inicio_atendimento', 'fim_atendimento',
+    'fatura__valor', 'fatura__desconto', 'fatura__pago',
+)
+
+
+def chave_de(agendamento):
+    return tuple(getattr(agendamento, campo) for campo in CAMPOS_CHAVE)
+
+
+def _segundos(inicio, fim):
+    """Duracao entre dois horarios do mesmo dia; None se faltar um deles ou a ordem estiver invertida."""
+    if not inicio or not fim:
+        return None
+    dia = datetime(2000, 1, 1)
+    segundos = (datetime.combine(dia, fim) - datetime.combine(dia, inicio)).total_seconds()
+    return int(segundos) if segundos >= 0 else None
+
+
+def _zerado():
+    totais = {campo: 0 for campo in CAMPO_POR_STATUS.values()}
+    totais.update({
+        'valor_faturado': Decimal('0'), 'valor_recebido': Decimal('0'),
+        'espera_segundos': 0, 'qtd_espera': 0, 'consulta_segundos': 0, 'qtd_consulta': 0,
+    })
+    return totais
+
+
+def _acumular(linhas):
+    """{chave: totais} a partir das linhas de _COLUNAS."""
+    grupos = {}
+    for linha in linhas:
+        dados = dict(zip(_COLUNAS, linha))
+        totais = grupos.setdefault(tuple(dados[campo] for campo in CAMPOS_CHAVE), _zerado())
+
+        campo_status = CAMPO_POR_STATUS.get(dados['status'])
+        if campo_status:
+            totais[campo_status] += 1
+
+        if dados['fatura__valor'] is not None:
+            liquido = dados['fatura__valor'] - (dados['fatura__desconto'] or 0)
+            totais['valor_faturado'] += liquido
+            if dados['fatura__pago']:
+                totais['valor_recebido'] += liquido
+
+        espera = _segundos(dados['horario_chegada'], dados['inicio_atendimento'])
+        if espera is not None:
+            totais['espera_segundos'] += espera
+            totais['qtd_espera'] += 1
+        consulta = _segundos(dados['inicio_atendimento'], dados['fim_atendimento'])
+        if consulta is not None:
+            totais['consulta_segundos'] += consulta
+            totais['qtd_consulta'] += 1
+    return grupos
+
+
+def _filtro_chave(chave):
+    data, profissional_id, especialidade_id, convenio_id = chave
+    filtro = {'data': data, 'profissional_id': profissional_id, 'especialidade_id': especialidade_id}
+    if convenio_id is None:
+        filtro['convenio__isnull'] = True
+    else:
+        filtro['convenio_id'] = convenio_id
+    return filtro
+
+
+def recalcular(chave):
+    """Recalcula um grupo. O lock na linha do resumo serializa recalculos concorrentes do mesmo grupo."""
+    filtro = _filtro_chave(chave)
+    with transaction.atomic():
+        # select_for_update nao trava uma linha que ainda nao existe: o get_or_create
+        # garante a linha antes (dois primeiros saves do grupo disputam o INSERT e o
+        # perdedor recebe a linha do vencedor) e so entao ela e travada.
+        resumo, _ = ResumoDiario.objects.get_or_create(**dict(zip(CAMPOS_CHAVE, chave)))
+        resumo = ResumoDiario.objects.select_for_update().get(pk=resumo.pk)
+        linhas = Agendamento.objects.filter(**filtro).values_list(*_COLUNAS)
+        totais = _acumular(linhas).get(chave)
+
+        if totais is None:
+            resumo.delete()
+            return None
+        for campo, valor in totais.items():
+            setattr(resumo, campo, valor)
+        resumo.save()
+        return resumo
+
+
+def agendar_recalculo(*chaves):
+    """Recalcula os grupos depois do commit; uma falha fica registrada e o comando recupera depois."""
+    chaves = {chave for chave in chaves if chave and chave[0]}
+
+    def executar():
+        for chave in chaves:
+            try:
+                recalcular(chave)
+            except Exception as exc:
+                logger.exception(f"Falha ao atualizar o resumo diario {chave}: {exc}")
+
+    if chaves:
+        transaction.on_commit(executar)
+
+
+def reconstruir(inicio, fim):
+    """Refaz todos os resumos entre inicio e fim (inclusive) a partir de Agendamento e Fatura."""
+    linhas = Agendamento.objects.filter(data__range=(inicio, fim)).values_list(*_COLUNAS).iterator(chunk_size=5000)
+    grupos = _acumular(linhas)
+    with transaction.atomic():
+        ResumoDiario.objects.filter(data__range=(inicio, fim)).delete()
+        ResumoDiario.objects.bulk_create(
+            [ResumoDiario(**dict(zip(CAMPOS_CHAVE, chave)), **totais) for chave, totais in grupos.items()],
+            batch_size=1000
+        )
+    return len(grupos)
+
+
+def datas_alteradas(desde):
+    """Datas com agendamento ou fatura alterados a partir de desde."""
+    from .models import Fatura
+
+    datas = set(Agendamento.objects.filter(atualizado_em__gte=desde).values_list('data', flat=True).distinct())
+    datas.update(Fatura.objects.filter(atualizado_em__gte=desde).values_list('agendamento__data', flat=True).distinct())
+    return sorted(datas)
+
+
+def intervalos(datas):
+    """Agrupa datas ordenadas em intervalos continuos [(inicio, fim), ...]."""
+    resultado = []
+    for data in datas:
+        if resultado and data == resultado[-1][1] + timedelta(days=1):
+            resultado[-1] = (resultado[-1][0], data)
+        else:
+            resultado.append((data, data))
+    return resultado
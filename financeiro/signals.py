@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from agendamento.models import Agendamento
+
+from .models import Fatura
+from .resumos import CAMPOS_CHAVE, agendar_recalculo, chave_de
+
+
+def _guardar_chave_anterior(sender, instance, raw=False, **kwargs):
+    # Se data, profissional, especialidade ou convenio mudarem, o grupo antigo tambem precisa ser recalculado.
+    if raw or instance.pk is None:
+        return
+    instance._chave_resumo_anterior = (
+        Agendamento.objects.filter(pk=instance.pk).values_list(*CAMPOS_CHAVE).first()
+    )
+
+
+def _agendamento_salvo(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    agendar_recalculo(chave_de(instance), getattr(instance, '_chave_resumo_anterior', None))
+
+
+def _agendamento_removido(sender, instance, **kwargs):
+    agendar_recalculo(chave_de(instance))
+
+
+def _fatura_alterada(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    chave = Agendamento.objects.filter(pk=instance.agendamento_id).values_list(*CAMPOS_CHAVE).first()
+    agendar_recalculo(chave)
+
+
+pre_save.connect(_guardar_chave_anterior, sender=Agendamento, dispatch_uid='resumo_agendamento_pre_save')
+post_save.connect(_agendamento_salvo, sender=Agendamento, dispatch_uid='resumo_agendamento_save')
+post_delete.connect(_agendamento_removido, sender=Agendamento, dispatch_uid='resumo_agendamento_delete')
+post_save.connect(_fatura_alterada, sender=Fatura, dispatch_uid='resumo_fatura_save')
+post_delete.connect(_fatura_alterada, sender=Fatura, dispatch_uid='resumo_fatura_delete')
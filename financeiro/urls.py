@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import FechamentoCaixaView, IndicadoresView
+
+urlpatterns = [
+    path('indicadores/', IndicadoresView.as_view(), name='financeiro-indicadores'),
+    path('caixa/', FechamentoCaixaView.as_view(), name='financeiro-caixa'),
+]
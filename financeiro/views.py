@@ -1,3 +1,74 @@
-from django.shortcuts import render
+from datetime import date
 
-# Create your views here.
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from usuarios.authentication import CachedJWTAuthentication
+
+from .caixa import fechamento
+from .indicadores import AGRUPAMENTOS, MAX_DIAS, indicadores
+
+
+class AcessoFinanceiro(permissions.BasePermission):
+    """Relatorios financeiros: superusuario ou operador com acesso_faturamento ("Acesso Financeiro")."""
+    message = 'Acesso restrito ao financeiro.'
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(
+            user and user.is_authenticated
+            and (getattr(user, 'is_superuser', False) or getattr(user, 'acesso_faturamento', False))
+        )
+
+
+def _periodo(params, padrao=None):
+    """(inicio, fim, erro) a partir de ?inicio=&fim= (ou ?data= para um dia so)."""
+    inicio = params.get('inicio') or params.get('data') or padrao
+    fim = params.get('fim') or inicio
+    try:
+        inicio = date.fromisoformat(str(inicio))
+        fim = date.fromisoformat(str(fim))
+    except ValueError:
+        return None, None, 'Informe inicio e fim no formato AAAA-MM-DD.'
+    if fim < inicio or (fim - inicio).days >= MAX_DIAS:
+        return None, None, f'Periodo invalido (fim >= inicio, ate {MAX_DIAS} dias).'
+    return inicio, fim, None
+
+
+class IndicadoresView(APIView):
+    """
+    Indicadores do periodo (?inicio=&fim=AAAA-MM-DD) agrupados por ?agrupar=
+    data|profissional|especialidade|convenio, lidos de ResumoDiario.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [AcessoFinanceiro]
+
+    def get(self, request):
+        inicio, fim, erro = _periodo(request.query_params)
+        if erro:
+            return Response({'error': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+        agrupar = request.query_params.get('agrupar', 'profissional')
+        if agrupar not in AGRUPAMENTOS:
+            return Response(
+                {'error': f"agrupar deve ser um de: {', '.join(AGRUPAMENTOS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(indicadores(inicio, fim, agrupar))
+
+
+class FechamentoCaixaView(APIView):
+    """
+    Fechamento de caixa do dia (?data=, padrao hoje) ou periodo (?inicio=&fim=):
+    recebidos por forma de pagamento, operador e profissional, e faturas pendentes.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [AcessoFinanceiro]
+
+    def get(self, request):
+        inicio, fim, erro = _periodo(request.query_params, padrao=timezone.localdate())
+        if erro:
+            return Response({'error': erro}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(fechamento(inicio, fim))
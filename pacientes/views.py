@@ -1,5 +1,5 @@
 ﻿from rest_framework import generics, permissions, filters
-from rest_framework_simplejwt.authentication import JWTAuthentication # <--- IMPORTANTE
+from usuarios.authentication import CachedJWTAuthentication # <--- IMPORTANTE
 from django.utils import timezone
 from django.db.models import Case, When, Value, IntegerField
 from agendamento.models import Agendamento
@@ -13,7 +13,7 @@ class PacienteListCreateView(generics.ListCreateAPIView):
     serializer_class = PacienteSerializer
 
     # --- BLINDAGEM DE SEGURANCA ---
-    authentication_classes = [JWTAuthentication] # Forca aceitar o Token
+    authentication_classes = [CachedJWTAuthentication] # Forca aceitar o Token
     permission_classes = [permissions.IsAuthenticated]
 
     filter_backends = [AccentInsensitiveSearchFilter]
@@ -47,7 +47,7 @@ class PacienteListCreateView(generics.ListCreateAPIView):
 
 class PacienteAtendimentoListView(generics.ListAPIView):
     serializer_class = AgendamentoSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def _parse_bool(self, value):
@@ -113,5 +113,5 @@ class PacienteDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PacienteSerializer
 
     # --- BLINDAGEM DE SEGURANCA ---
-    authentication_classes = [JWTAuthentication] # Forca aceitar o Token
+    authentication_classes = [CachedJWTAuthentication] # Forca aceitar o Token
     permission_classes = [permissions.IsAuthenticated]
@@ -1,5 +1,6 @@
 from django.db import transaction
 
+from configuracoes import bootstrap
 from profissionais.models import Especialidade
 
 
@@ -70,6 +71,8 @@ def importar_cbo(registros):
                     atualizaveis[i:i + 5000],
                     ['codigo', 'codigo_visual', 'nome', 'search_text', 'status']
                 )
+        # bulk_create/bulk_update nao disparam post_save.
+        bootstrap.invalidar(*bootstrap.secoes_do_modelo('profissionais.Especialidade'))
 
     return {
         'total_processados': total_processados,
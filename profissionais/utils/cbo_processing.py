@@ -1,71 +1,11 @@
-﻿import io
-
-import pandas as pd
-
-
-def _read_csv_safe(buffer, **kwargs):
-    try:
-        return pd.read_csv(buffer, **kwargs)
-    except TypeError:
-        kwargs.pop('encoding_errors', None)
-        return pd.read_csv(buffer, **kwargs)
+﻿from clinica_core.formato_tabular import detectar_formato_csv, ler_amostra, ler_csv
 
 
 def _ler_csv_flexivel(arquivo):
-    encodings = ['utf-8-sig', 'utf-8', 'cp1252', 'latin1']
-    separadores = [';', ',', '\t']
-
-    dados = arquivo.read()
-    if not dados:
+    formato = detectar_formato_csv(ler_amostra(arquivo))
+    if formato is None:
         return None
-
-    for enc in encodings:
-        for sep in separadores:
-            try:
-                df_test = _read_csv_safe(
-                    io.BytesIO(dados),
-                    sep=sep,
-                    encoding=enc,
-                    nrows=5,
-                    dtype=str,
-                    keep_default_na=False,
-                    encoding_errors='strict'
-                )
-                if len(df_test.columns) >= 2:
-                    return _read_csv_safe(
-                        io.BytesIO(dados),
-                        sep=sep,
-                        encoding=enc,
-                        dtype=str,
-                        keep_default_na=False,
-                        encoding_errors='strict'
-                    )
-            except Exception:
-                continue
-        try:
-            df_test = _read_csv_safe(
-                io.BytesIO(dados),
-                sep=None,
-                engine='python',
-                encoding=enc,
-                nrows=5,
-                dtype=str,
-                keep_default_na=False,
-                encoding_errors='strict'
-            )
-            if len(df_test.columns) >= 2:
-                return _read_csv_safe(
-                    io.BytesIO(dados),
-                    sep=None,
-                    engine='python',
-                    encoding=enc,
-                    dtype=str,
-                    keep_default_na=False,
-                    encoding_errors='strict'
-                )
-        except Exception:
-            continue
-    return None
+    return ler_csv(arquivo, formato, keep_default_na=False)
 
 
 def processar_cbo(arquivo):
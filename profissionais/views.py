@@ -3,17 +3,16 @@ from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from usuarios.authentication import CachedJWTAuthentication
 from .models import Especialidade, Profissional, ProfissionalEspecialidade
 from .serializers import EspecialidadeSerializer, ProfissionalSerializer
-from .utils.cbo_processing import processar_cbo
-from .services.cbo_import import importar_cbo
+from configuracoes.views import enfileirar_importacao
 from clinica_core.filters import AccentInsensitiveSearchFilter
 
 class EspecialidadeViewSet(viewsets.ModelViewSet):
     queryset = Especialidade.objects.all().order_by('nome')
     serializer_class = EspecialidadeSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [AccentInsensitiveSearchFilter]
     search_fields = ['nome', 'codigo', 'codigo_visual', 'search_text']
@@ -83,7 +82,7 @@ class EspecialidadeViewSet(viewsets.ModelViewSet):
 class ProfissionalViewSet(viewsets.ModelViewSet):
     queryset = Profissional.objects.all().order_by('nome')
     serializer_class = ProfissionalSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [AccentInsensitiveSearchFilter]
     search_fields = ['nome', 'cpf']
@@ -104,7 +103,7 @@ class ProfissionalViewSet(viewsets.ModelViewSet):
 
 
 class CboImportView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
 
@@ -113,21 +112,4 @@ class CboImportView(APIView):
         if not arquivo:
             return Response({'error': 'Arquivo nao informado.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            registros = processar_cbo(arquivo)
-            if not registros:
-                return Response(
-                    {'error': 'Nenhum registro CBO encontrado no arquivo.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            resultado = importar_cbo(registros)
-        except Exception as exc:
-            return Response(
-                {'error': 'Falha ao importar CBO.', 'detalhe': str(exc)},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        return Response({
-            'status': 'sucesso',
-            'resultado': resultado
-        })
+        return enfileirar_importacao(request, 'especialidades_cbo', arquivo)
@@ -0,0 +1,32 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from . import autorizacao
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que monta o request.user a partir do retrato de autorizacao
+    em memoria (usuarios.autorizacao), sem buscar o Operador no banco a cada requisicao.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != 'id':
+            # A revogacao compara o hash da senha, que fica fora do retrato.
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        dados = autorizacao.retrato(user_id)
+        if dados is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        user = autorizacao.operador(dados)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -0,0 +1,86 @@
+"""
+Retrato de autorizacao por operador: campos do Operador (sem a senha), flags
+acesso_*, profissional_id e rotas liberadas.
+
+Cada worker guarda o retrato em memoria com a versao de clinica_core.cache_versao;
+qualquer alteracao em operadores, privilegios ou no vinculo com profissionais
+troca a versao (ver signals) e o retrato e recalculado na proxima requisicao.
+Assim a autenticacao JWT e o MeView nao consultam o banco a cada chamada.
+"""
+import threading
+
+from clinica_core import cache_versao
+
+from .models import Operador, Privilegio
+
+
+VERSAO = 'autorizacao'
+
+# Modulos liberados pelas flags quando o operador nao tem privilegios individuais.
+MODULOS_POR_ACESSO = {
+    'agenda': 'acesso_agendamento',
+    'atendimento': 'acesso_atendimento',
+    'cadastros': 'acesso_cadastros',
+    'sistema': 'acesso_configuracoes',
+}
+
+# A senha fica fora do retrato; se alguem a ler, o Django busca o campo no banco.
+_CAMPOS = [field.attname for field in Operador._meta.concrete_fields if field.attname != 'password']
+
+_retratos = {}
+_lock = threading.Lock()
+
+
+def calcular_rotas(user):
+    if user.is_superuser:
+        rotas = list(Privilegio.objects.filter(active=True).values_list('path', flat=True))
+        return sorted(set(rotas))
+
+    rotas = list(user.privilegios.filter(active=True).values_list('path', flat=True))
+    if not rotas:
+        modulos = [modulo for modulo, campo in MODULOS_POR_ACESSO.items() if getattr(user, campo, False)]
+        if modulos:
+            rotas = list(
+                Privilegio.objects.filter(active=True, module_key__in=modulos).values_list('path', flat=True)
+            )
+        if getattr(user, 'acesso_configuracoes', False):
+            rotas.extend(Privilegio.objects.filter(active=True, path='/configuracoes').values_list('path', flat=True))
+    return sorted(set(rotas))
+
+
+def _montar(user_id):
+    user = Operador.objects.filter(pk=user_id).first()
+    if user is None:
+        return None
+    return {
+        'valores': tuple(getattr(user, campo) for campo in _CAMPOS),
+        'rotas': calcular_rotas(user),
+    }
+
+
+def retrato(user_id):
+    """Retrato do operador (dict com 'valores' e 'rotas'), ou None se ele nao existe."""
+    versao = cache_versao.atual(VERSAO)
+    atual = _retratos.get(user_id)
+    if versao is not None and atual and atual[0] == versao:
+        return atual[1]
+
+    dados = _montar(user_id)
+    if versao is not None and dados is not None:
+        with _lock:
+            _retratos[user_id] = (versao, dados)
+    return dados
+
+
+def operador(dados):
+    """Operador novo a cada chamada (pode ser alterado e salvo) a partir do retrato."""
+    return Operador.from_db('default', _CAMPOS, dados['valores'])
+
+
+def rotas_permitidas(user):
+    dados = retrato(user.pk)
+    return dados['rotas'] if dados else calcular_rotas(user)
+
+
+def invalidar():
+    cache_versao.trocar(VERSAO, ao_trocar=_retratos.clear)
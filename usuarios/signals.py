@@ -0,0 +1,18 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .autorizacao import invalidar
+from .models import Operador, Privilegio
+
+
+def _invalidar_autorizacao(sender, **kwargs):
+    invalidar()
+
+
+for _model in (Operador, Privilegio):
+    post_save.connect(_invalidar_autorizacao, sender=_model, dispatch_uid=f'autorizacao_save_{_model.__name__}')
+    post_delete.connect(_invalidar_autorizacao, sender=_model, dispatch_uid=f'autorizacao_delete_{_model.__name__}')
+
+m2m_changed.connect(_invalidar_autorizacao, sender=Operador.privilegios.through, dispatch_uid='autorizacao_privilegios')
+
+# Excluir um profissional desvincula os operadores por UPDATE (SET_NULL), sem post_save no Operador.
+post_delete.connect(_invalidar_autorizacao, sender='profissionais.Profissional', dispatch_uid='autorizacao_profissional')
@@ -3,6 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
+from .autorizacao import invalidar as invalidar_autorizacao, rotas_permitidas
 from .models import Operador, Privilegio
 from .serializers import OperadorSerializer, PrivilegioSerializer, MinhaContaSerializer
 from clinica_core.filters import AccentInsensitiveSearchFilter
@@ -63,13 +64,16 @@ class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        
+        return Response(self.montar_dados(request.user))
+
+    @staticmethod
+    def montar_dados(user):
+        """Dados do operador logado (tambem enviados na secao 'me' do /api/bootstrap/)."""
         # 1. Tenta carregar o ID do profissional com segurana moxima
         prof_id = None
         try:
             # Verifica se o atributo existe E se tem valor associado
-            if hasattr(user, 'profissional') and user.profissional_id:
+            if getattr(user, 'profissional_id', None):
                 prof_id = user.profissional_id
         except Exception as e:
             print(f"Aviso: Erro ao ler profissional do usuorio {user.id}: {e}")
@@ -84,31 +88,8 @@ class MeView(APIView):
             print(f"Aviso: Erro ao ler force_password_change: {e}")
             force_change = False
 
-        # 3. Monta a resposta
-        allowed_routes = []
-        if user.is_superuser:
-            allowed_routes = list(Privilegio.objects.filter(active=True).values_list('path', flat=True))
-        else:
-            allowed_routes = list(user.privilegios.filter(active=True).values_list('path', flat=True))
-
-            if not allowed_routes:
-                module_map = {
-                    'agenda': getattr(user, 'acesso_agendamento', False),
-                    'atendimento': getattr(user, 'acesso_atendimento', False),
-                    'cadastros': getattr(user, 'acesso_cadastros', False),
-                    'sistema': getattr(user, 'acesso_configuracoes', False),
-                }
-                fallback_modules = [k for k, v in module_map.items() if v]
-                if fallback_modules:
-                    allowed_routes = list(
-                        Privilegio.objects.filter(active=True, module_key__in=fallback_modules).values_list('path', flat=True)
-                    )
-                if getattr(user, 'acesso_configuracoes', False):
-                    allowed_routes.extend(
-                        list(Privilegio.objects.filter(active=True, path='/configuracoes').values_list('path', flat=True))
-                    )
-
-        allowed_routes = sorted(set(allowed_routes))
+        # 3. Monta a resposta (rotas do retrato de autorizacao em memoria)
+        allowed_routes = rotas_permitidas(user)
 
         data = {
             "id": user.id,
@@ -129,7 +110,7 @@ class MeView(APIView):
             "acesso_configuracoes": getattr(user, 'acesso_configuracoes', False),
             "acesso_whatsapp": getattr(user, 'acesso_whatsapp', False),
         }
-        return Response(data)
+        return data
 
 class TrocarSenhaView(APIView):
     permission_classes = [IsAuthenticated]
@@ -245,6 +226,8 @@ class PrivilegioSyncView(APIView):
 
             if seen_paths:
                 Privilegio.objects.exclude(path__in=seen_paths).update(active=False)
+                # update() nao dispara post_save.
+                invalidar_autorizacao()
 
         return Response({'updated': len(seen_paths)})
 
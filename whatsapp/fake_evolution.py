@@ -0,0 +1,186 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+
+# Servidor local que imita as rotas da Evolution API usadas pelo sistema
+# (sendText, findContacts, connectionState e QR code), para testes de carga e
+# integracao sem depender da instancia real. Configuravel com latencia,
+# taxa de erro e envio de webhooks de volta para /api/webhooks/whatsapp/<instancia>/.
+
+# PNG 1x1 transparente, suficiente para as telas de QR code.
+FAKE_QR_BASE64 = (
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII='
+)
+
+_ROUTE = re.compile(r'^/(?P<group>message|chat|instance)/(?P<action>[A-Za-z]+)/(?P<instance>[^/]+)(?P<suffix>/image)?/?$')
+
+
+class FakeEvolutionServer:
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 error_status=500, webhook_url='', emit_status=True, state='open', webhook_sink=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.webhook_url = webhook_url.rstrip('/')
+        self.emit_status = emit_status
+        self.state = state
+        # webhook_sink(instance_name, payload) substitui o POST HTTP (uso em processo).
+        self.webhook_sink = webhook_sink
+        self.contacts = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset(self):
+        with self._lock:
+            self.requests = []
+
+    def _record(self, method, path, body, status_code):
+        with self._lock:
+            self.requests.append({
+                'method': method,
+                'path': path,
+                'body': body,
+                'status_code': status_code,
+                'at': time.time(),
+            })
+
+    def _sleep(self):
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay += random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def _should_fail(self):
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+    def emit_webhook(self, instance_name, payload):
+        if self.webhook_sink:
+            self.webhook_sink(instance_name, payload)
+            return
+        if not self.webhook_url:
+            return
+        try:
+            requests.post(f'{self.webhook_url}/api/webhooks/whatsapp/{instance_name}/', json=payload, timeout=10)
+        except requests.RequestException:
+            pass
+
+    def _emit_send_events(self, instance_name, message):
+        self.emit_webhook(instance_name, {'event': 'messages.upsert', 'instance': instance_name, 'data': message})
+        if not self.emit_status:
+            return
+        for status_value in ('DELIVERED', 'READ'):
+            self.emit_webhook(instance_name, {
+                'event': 'messages.update',
+                'instance': instance_name,
+                'data': [{'key': message['key'], 'update': {'status': status_value}}],
+            })
+
+    def handle(self, method, path, body):
+        """Retorna (status_code, payload) para a rota pedida."""
+        match = _ROUTE.match(path.split('?', 1)[0])
+        if not match:
+            return 404, {'error': 'rota nao simulada', 'path': path}
+        group, action, instance_name = match.group('group'), match.group('action'), match.group('instance')
+
+        if group == 'message' and action == 'sendText' and method == 'POST':
+            numero = str((body or {}).get('number') or '')
+            texto = ((body or {}).get('textMessage') or {}).get('text') or (body or {}).get('text') or ''
+            message = {
+                'key': {
+                    'remoteJid': f'{numero}@s.whatsapp.net',
+                    'fromMe': True,
+                    'id': f'FAKE{uuid.uuid4().hex[:16].upper()}',
+                },
+                'message': {'conversation': texto},
+                'messageTimestamp': int(time.time()),
+                'status': 'SENT',
+            }
+            threading.Thread(target=self._emit_send_events, args=(instance_name, message), daemon=True).start()
+            return 201, message
+
+        if group == 'chat' and action == 'findContacts' and method == 'POST':
+            lid = (((body or {}).get('where') or {}).get('id')) or ''
+            contact = self.contacts.get(lid)
+            return 200, [contact] if contact else []
+
+        if group == 'instance' and action == 'connectionState':
+            return 200, {'instance': {'instanceName': instance_name, 'state': self.state}}
+
+        if group == 'instance' and action in ('qrcode', 'qr', 'connect'):
+            return 200, {'base64': f'data:image/png;base64,{FAKE_QR_BASE64}', 'code': 'fake'}
+
+        return 404, {'error': 'rota nao simulada', 'path': path}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _dispatch(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    body = json.loads(raw.decode('utf-8')) if raw else None
+                except ValueError:
+                    body = None
+
+                server._sleep()
+                if server._should_fail():
+                    status_code, payload = server.error_status, {'error': 'falha simulada'}
+                else:
+                    status_code, payload = server.handle(method, self.path, body)
+                server._record(method, self.path, body, status_code)
+
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status_code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,133 @@
+import logging
+import math
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from agendamento.whatsapp import _disparar_api
+from whatsapp.fake_evolution import FakeEvolutionServer
+from whatsapp.services import get_or_create_conversa, send_text_message
+
+
+CENARIOS = ['lembretes', 'envio', 'webhooks']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark do envio e da ingestao de WhatsApp contra a Evolution API simulada '
+        '(whatsapp.fake_evolution). As alteracoes no banco sao desfeitas ao final.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mensagens', type=int, default=200, help='Mensagens por cenario de envio')
+        parser.add_argument('--cenarios', default=','.join(CENARIOS), help=f'Lista separada por virgula: {", ".join(CENARIOS)}')
+        parser.add_argument('--instance', default='benchmark')
+        parser.add_argument('--latencia-ms', type=int, default=0)
+        parser.add_argument('--jitter-ms', type=int, default=0)
+        parser.add_argument('--taxa-erro', type=float, default=0.0)
+        parser.add_argument('--sem-status', action='store_true', help='Nao gera messages.update (entregue/lida)')
+
+    def handle(self, *args, **options):
+        cenarios = [c.strip() for c in options['cenarios'].split(',') if c.strip() in CENARIOS]
+        instance = options['instance']
+        webhooks = []
+        server = FakeEvolutionServer(
+            latency_ms=options['latencia_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['taxa_erro'],
+            emit_status=not options['sem_status'],
+            # Os webhooks gerados sao coletados e enviados depois, na thread principal,
+            # para que a ingestao rode dentro da transacao do benchmark.
+            webhook_sink=lambda instance_name, payload: webhooks.append((instance_name, payload)),
+        )
+
+        # O log INFO de cada disparo encobriria o relatorio.
+        logging.getLogger('agendamento.whatsapp').setLevel(logging.WARNING)
+
+        with server, override_settings(EVOLUTION_API_URL=server.url, EVOLUTION_INSTANCE_NAME=instance):
+            self.stdout.write(f'Evolution API simulada em {server.url}')
+            try:
+                with transaction.atomic():
+                    if 'lembretes' in cenarios:
+                        self._lembretes(options['mensagens'])
+                    if 'envio' in cenarios:
+                        self._envio(instance, options['mensagens'])
+                    if 'webhooks' in cenarios:
+                        self._webhooks(webhooks, server)
+                    raise _Rollback()
+            except _Rollback:
+                pass
+            self.stdout.write(f'Requisicoes recebidas pela API simulada: {len(server.requests)}')
+
+    def _medir(self, nome, chamadas):
+        tempos, queries, falhas = [], [], 0
+        inicio = time.perf_counter()
+        for chamada in chamadas:
+            with CaptureQueriesContext(connection) as ctx:
+                t0 = time.perf_counter()
+                try:
+                    ok = chamada()
+                except Exception as exc:
+                    self.stderr.write(f'{nome}: {exc}')
+                    ok = False
+                tempos.append(time.perf_counter() - t0)
+            queries.append(len(ctx.captured_queries))
+            if not ok:
+                falhas += 1
+        self._relatorio(nome, tempos, queries, falhas, time.perf_counter() - inicio)
+
+    def _lembretes(self, total):
+        # Mesmo caminho do comando enviar_lembretes: um POST sendText por paciente.
+        chamadas = [
+            (lambda i=i: _disparar_api(f'5515{990000000 + i}', f'Lembrete de consulta {i}'))
+            for i in range(total)
+        ]
+        self._medir('lembretes', chamadas)
+
+    def _envio(self, instance, total):
+        conversa = get_or_create_conversa(instance, '5515988887777@s.whatsapp.net', 'Benchmark', '5515988887777')
+
+        def enviar(i):
+            response = send_text_message(conversa, f'Mensagem de teste {i}')
+            return response.status_code in [200, 201]
+
+        self._medir('envio', [(lambda i=i: enviar(i)) for i in range(total)])
+
+    def _webhooks(self, webhooks, server):
+        esperados = sum(1 for r in server.requests if r['status_code'] in [200, 201] and '/sendText/' in r['path'])
+        esperados *= 3 if server.emit_status else 1
+        limite = time.monotonic() + 10
+        while len(webhooks) < esperados and time.monotonic() < limite:
+            time.sleep(0.05)
+
+        client = Client()
+
+        def postar(instance_name, payload):
+            response = client.post(
+                f'/api/webhooks/whatsapp/{instance_name}/', data=payload, content_type='application/json'
+            )
+            return response.status_code == 200
+
+        eventos = list(webhooks)
+        self._medir('webhooks', [(lambda i=i, p=p: postar(i, p)) for i, p in eventos])
+
+    def _relatorio(self, nome, tempos, queries, falhas, total_s):
+        total = len(tempos)
+        if not total:
+            self.stdout.write(f'[{nome}] nenhum item.')
+            return
+        ordenados = sorted(tempos)
+        p95 = ordenados[max(math.ceil(0.95 * total) - 1, 0)]
+        self.stdout.write(
+            f'[{nome}] {total} itens ({falhas} falhas) em {total_s:.2f}s | '
+            f'{total / total_s if total_s else 0:.1f}/s | '
+            f'p95 {p95 * 1000:.1f}ms | max {ordenados[-1] * 1000:.1f}ms | '
+            f'queries/item {sum(queries) / total:.1f}'
+        )
@@ -0,0 +1,166 @@
+import json
+import math
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.dateparse import parse_date
+
+from auditoria.models import WebhookEvent
+from whatsapp.services import process_webhook_event
+
+
+class _StubResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class _DryRunRollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Reprocessa eventos do webhook (WebhookEvent ou fixture JSONL) pelo pipeline '
+        'de ingestao, com a Evolution API simulada, e mede eventos/s, queries por '
+        'evento e latencia p95.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--arquivo', help='Fixture JSONL: {"instance_name": ..., "payload": {...}} ou o payload puro por linha')
+        parser.add_argument('--exportar', help='Grava os eventos selecionados do banco como fixture JSONL e encerra')
+        parser.add_argument('--instance', help='Filtra por instancia (ou instancia padrao para payloads puros da fixture)')
+        parser.add_argument('--event-type', help='Filtra por tipo de evento (ex.: messages.upsert)')
+        parser.add_argument('--desde', help='Data inicial (AAAA-MM-DD) dos eventos do banco')
+        parser.add_argument('--ate', help='Data final (AAAA-MM-DD) dos eventos do banco')
+        parser.add_argument('--limite', type=int, default=0, help='Maximo de eventos (0 = todos)')
+        parser.add_argument('--stub-latencia-ms', type=int, default=0, help='Atraso simulado em cada chamada a Evolution API')
+        parser.add_argument('--dry-run', action='store_true', help='Processa tudo em uma transacao desfeita ao final')
+
+    def handle(self, *args, **options):
+        if options['arquivo']:
+            eventos = self._eventos_da_fixture(options)
+        else:
+            eventos = self._eventos_do_banco(options)
+
+        if options['exportar']:
+            total = self._exportar(eventos, options['exportar'])
+            self.stdout.write(self.style.SUCCESS(f'{total} eventos exportados para {options["exportar"]}.'))
+            return
+
+        latencia = max(options['stub_latencia_ms'], 0) / 1000.0
+
+        def evolution_stub(*args, **kwargs):
+            if latencia:
+                time.sleep(latencia)
+            # findContacts vazio: o pipeline segue sem resolver @lid, como em falha da API.
+            return _StubResponse([])
+
+        tempos, queries, erros = [], [], 0
+        inicio = time.perf_counter()
+        try:
+            with mock.patch('whatsapp.services.requests.post', side_effect=evolution_stub):
+                with transaction.atomic():
+                    for instance_name, payload in eventos:
+                        with CaptureQueriesContext(connection) as ctx:
+                            t0 = time.perf_counter()
+                            try:
+                                with transaction.atomic():
+                                    process_webhook_event(payload, instance_name)
+                            except Exception as exc:
+                                erros += 1
+                                self.stderr.write(f'Erro ao processar evento de {instance_name}: {exc}')
+                            tempos.append(time.perf_counter() - t0)
+                        queries.append(len(ctx.captured_queries))
+                    if options['dry_run']:
+                        raise _DryRunRollback()
+        except _DryRunRollback:
+            pass
+        total_s = time.perf_counter() - inicio
+
+        self._relatorio(tempos, queries, erros, total_s, options['dry_run'])
+
+    def _eventos_do_banco(self, options):
+        qs = WebhookEvent.objects.order_by('received_at', 'id')
+        if options['instance']:
+            qs = qs.filter(instance_name=options['instance'])
+        if options['event_type']:
+            qs = qs.filter(event_type=options['event_type'])
+        if options['desde']:
+            qs = qs.filter(received_at__date__gte=self._data(options['desde']))
+        if options['ate']:
+            qs = qs.filter(received_at__date__lte=self._data(options['ate']))
+        if options['limite']:
+            qs = qs[:options['limite']]
+        eventos = []
+        for event in qs.iterator(chunk_size=500):
+            payload = event.get_payload()
+            if isinstance(payload, dict) and 'raw' not in payload:
+                eventos.append((event.instance_name, payload))
+        return eventos
+
+    def _eventos_da_fixture(self, options):
+        padrao = options['instance'] or getattr(settings, 'EVOLUTION_INSTANCE_NAME', '')
+        eventos = []
+        try:
+            with open(options['arquivo'], 'r', encoding='utf-8') as fp:
+                for numero, line in enumerate(fp, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        raise CommandError(f'Linha {numero} invalida na fixture.')
+                    if isinstance(data, dict) and isinstance(data.get('payload'), dict):
+                        eventos.append((data.get('instance_name') or padrao, data['payload']))
+                    elif isinstance(data, dict):
+                        eventos.append((padrao, data))
+        except OSError as exc:
+            raise CommandError(f'Nao foi possivel ler a fixture: {exc}')
+        if options['event_type']:
+            eventos = [
+                (instance_name, payload) for instance_name, payload in eventos
+                if (payload.get('event') or payload.get('type')) == options['event_type']
+            ]
+        if options['limite']:
+            eventos = eventos[:options['limite']]
+        return eventos
+
+    def _exportar(self, eventos, caminho):
+        with open(caminho, 'w', encoding='utf-8') as fp:
+            for instance_name, payload in eventos:
+                fp.write(json.dumps({'instance_name': instance_name, 'payload': payload}, ensure_ascii=False))
+                fp.write('\n')
+        return len(eventos)
+
+    def _data(self, value):
+        try:
+            dia = parse_date(value)
+        except ValueError:
+            dia = None
+        if not dia:
+            raise CommandError(f'Data invalida: {value}')
+        return dia
+
+    def _relatorio(self, tempos, queries, erros, total_s, dry_run):
+        total = len(tempos)
+        if not total:
+            self.stdout.write('Nenhum evento para reprocessar.')
+            return
+        ordenados = sorted(tempos)
+        p95 = ordenados[max(math.ceil(0.95 * total) - 1, 0)]
+        self.stdout.write(f'Eventos: {total} ({erros} com erro)' + (' [dry-run, alteracoes desfeitas]' if dry_run else ''))
+        self.stdout.write(f'Tempo total: {total_s:.2f}s | {total / total_s if total_s else 0:.1f} eventos/s')
+        self.stdout.write(f'Queries por evento: media {sum(queries) / total:.1f} | max {max(queries)}')
+        self.stdout.write(
+            f'Latencia: media {sum(tempos) / total * 1000:.1f}ms | p95 {p95 * 1000:.1f}ms | max {ordenados[-1] * 1000:.1f}ms'
+        )
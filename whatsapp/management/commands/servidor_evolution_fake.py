@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from whatsapp.fake_evolution import FakeEvolutionServer
+
+
+class Command(BaseCommand):
+    help = (
+        'Sobe um servidor local que imita a Evolution API. Aponte EVOLUTION_API_URL '
+        'para ele (variavel de ambiente) para testar envios e webhooks sem a instancia real.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--porta', type=int, default=8081)
+        parser.add_argument('--latencia-ms', type=int, default=0, help='Atraso fixo por requisicao')
+        parser.add_argument('--jitter-ms', type=int, default=0, help='Atraso aleatorio adicional (0 a N ms)')
+        parser.add_argument('--taxa-erro', type=float, default=0.0, help='Fracao das requisicoes respondidas com erro (0.0 a 1.0)')
+        parser.add_argument('--status-erro', type=int, default=500, help='Status HTTP das falhas simuladas')
+        parser.add_argument(
+            '--webhook-url', default='',
+            help='Base do backend (ex.: http://127.0.0.1:8000) para receber os webhooks de volta'
+        )
+        parser.add_argument('--sem-status', action='store_true', help='Nao emite messages.update (entregue/lida)')
+        parser.add_argument('--estado', default='open', help='Estado retornado em connectionState')
+
+    def handle(self, *args, **options):
+        server = FakeEvolutionServer(
+            host=options['host'],
+            port=options['porta'],
+            latency_ms=options['latencia_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['taxa_erro'],
+            error_status=options['status_erro'],
+            webhook_url=options['webhook_url'],
+            emit_status=not options['sem_status'],
+            state=options['estado'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Evolution API simulada em {server.url}'))
+        if options['webhook_url']:
+            self.stdout.write(f'Webhooks enviados para {options["webhook_url"]}/api/webhooks/whatsapp/<instancia>/')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+            self.stdout.write(f'{len(server.requests)} requisicoes recebidas.')
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+
+def preencher_instance_name(apps, schema_editor):
+    WhatsappMensagem = apps.get_model('whatsapp', 'WhatsappMensagem')
+    WhatsappConversa = apps.get_model('whatsapp', 'WhatsappConversa')
+    WhatsappMensagem.objects.update(
+        instance_name=models.Subquery(
+            WhatsappConversa.objects.filter(pk=models.OuterRef('conversa_id')).values('instance_name')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('whatsapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='whatsappmensagem',
+            name='instance_name',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.RunPython(preencher_instance_name, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='whatsappmensagem',
+            index=models.Index(fields=['instance_name', 'message_id'], name='wa_msg_instance_msgid_idx'),
+        ),
+    ]
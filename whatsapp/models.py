@@ -57,6 +57,7 @@ class WhatsappMensagem(models.Model):
     ]
 
     conversa = models.ForeignKey(WhatsappConversa, on_delete=models.CASCADE, related_name='mensagens')
+    instance_name = models.CharField(max_length=100, blank=True, default='')
     message_id = models.CharField(max_length=200, blank=True, default='', db_index=True)
     direction = models.CharField(max_length=10, choices=DIRECTION_CHOICES, default='in')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='sent')
@@ -71,6 +72,9 @@ class WhatsappMensagem(models.Model):
 
     class Meta:
         ordering = ['-sent_at', '-created_at']
+        indexes = [
+            models.Index(fields=['instance_name', 'message_id'], name='wa_msg_instance_msgid_idx'),
+        ]
 
     def __str__(self):
         return f"{self.conversa} ({self.direction})"
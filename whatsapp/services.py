@@ -233,6 +233,17 @@ def _parse_timestamp(value):
         return None
 
 
+# Ordem de progressao do status: uma atualizacao nunca retrocede
+# (ex.: "read" seguido de um "delivered" atrasado).
+STATUS_ORDER = {
+    'pending': 0,
+    'sent': 1,
+    'failed': 2,
+    'delivered': 3,
+    'read': 4,
+}
+
+
 def _status_from_payload(value):
     if not value:
         return ''
@@ -360,6 +371,7 @@ def process_webhook_event(payload, instance_name):
 
             WhatsappMensagem.objects.create(
                 conversa=conversa,
+                instance_name=instance_name,
                 message_id=message_id or '',
                 direction=direction,
                 status='sent',
@@ -458,7 +470,9 @@ def _process_message_updates(payload, instance_name):
     if not updates:
         return 0
 
-    updated = 0
+    # Recibos chegam em rajadas: guarda apenas o status mais avancado de cada
+    # mensagem e aplica um UPDATE por status de destino.
+    target_by_message = {}
     for item in updates:
         if not isinstance(item, dict):
             continue
@@ -473,9 +487,23 @@ def _process_message_updates(payload, instance_name):
         if not message_id or not status_value:
             continue
 
+        current = target_by_message.get(message_id)
+        if current is None or STATUS_ORDER[status_value] > STATUS_ORDER[current]:
+            target_by_message[message_id] = status_value
+
+    ids_by_status = {}
+    for message_id, status_value in target_by_message.items():
+        ids_by_status.setdefault(status_value, []).append(message_id)
+
+    updated = 0
+    for status_value, message_ids in ids_by_status.items():
+        previous = [s for s, order in STATUS_ORDER.items() if order < STATUS_ORDER[status_value]]
+        if not previous:
+            continue
         updated += WhatsappMensagem.objects.filter(
-            message_id=message_id,
-            conversa__instance_name=instance_name
+            instance_name=instance_name,
+            message_id__in=message_ids,
+            status__in=previous
         ).update(status=status_value)
 
     return updated
@@ -1,7 +1,7 @@
 ﻿from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from usuarios.authentication import CachedJWTAuthentication
 from django.conf import settings
 from django.utils import timezone
 
@@ -23,7 +23,7 @@ def _has_whatsapp_access(user):
 
 class WhatsappConversaViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = WhatsappConversaSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [AccentInsensitiveSearchFilter]
     search_fields = ['contato__nome', 'contato__wa_id', 'contato__telefone']
@@ -98,7 +98,7 @@ class WhatsappConversaViewSet(viewsets.ReadOnlyModelViewSet):
         serializer.is_valid(raise_exception=True)
         texto = serializer.validated_data['texto']
 
-        config = ConfiguracaoSistema.load()
+        config = ConfiguracaoSistema.cached()
         if not config.enviar_whatsapp_global:
             return Response({'error': 'WhatsApp global desativado.'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -119,6 +119,7 @@ class WhatsappConversaViewSet(viewsets.ReadOnlyModelViewSet):
         sent_at = timezone.now()
         WhatsappMensagem.objects.create(
             conversa=conversa,
+            instance_name=conversa.instance_name,
             message_id='',
             direction='out',
             status='sent',